@@ -10,6 +10,8 @@ from typing import Optional, Dict, Any
 from fastapi import HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
+from src.agent.http_transport import get_transport
+
 logger = logging.getLogger(__name__)
 
 # JWT Configuration
@@ -25,6 +27,9 @@ DATABASE_FILE = "users.db"
 
 security = HTTPBearer()
 
+# Google cert fetches reuse pooled keep-alive connections instead of a new session per call
+GOOGLE_AUTH_REQUEST = requests.Request(session=get_transport().session())
+
 def init_database():
     """Initialize the user database"""
     conn = sqlite3.connect(DATABASE_FILE)
@@ -207,7 +212,7 @@ class GoogleAuth:
         try:
             # Verify the token
             idinfo = id_token.verify_oauth2_token(
-                token, requests.Request(), GOOGLE_CLIENT_ID
+                token, GOOGLE_AUTH_REQUEST, GOOGLE_CLIENT_ID
             )
             
             # Verify issuer
@@ -641,9 +641,11 @@
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
+import asyncio
+import json
 import sys
 import os
 import uvicorn
@@ -652,7 +654,11 @@ import uvicorn
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 try:
-    from src.agent.workflow import run_workflow
+    from src.agent.workflow import run_workflow, arun_workflow, greeting_pool, verification_auditor
+    from tools.product_suggestion import prewarm_recommendation_cache
+    from tools.user_profile import PROFILE_STORE
+    from src.agent.metrics import METRICS
+    from src.agent.http_transport import get_transport
 except ImportError as e:
     print(f"Import error: {e}")
     print("Make sure all dependencies are installed: pip install -r requirements.txt")
@@ -688,6 +694,20 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
         }
     )
 
+@app.on_event("startup")
+async def warm_caches():
+    """Prewarm in-process caches so early requests don't pay for them"""
+    try:
+        prewarm_recommendation_cache()
+    except Exception as e:
+        print(f"Cache prewarm failed: {e}")
+    # TLS handshakes to OpenAI, Tavily and Google happen now rather than on the first requests
+    transport = get_transport()
+    transport.warm_up_in_background()
+    asyncio.create_task(transport.warm_up_async())
+    # Generates in the background; greetings use the LLM until the pool is filled
+    greeting_pool.start()
+
 # Request/Response models
 class ChatMessage(BaseModel):
     role: str  # "user" or "assistant"
@@ -775,8 +795,117 @@ async def health_check():
         }
     )
 
+@app.get("/metrics")
+async def metrics():
+    """In-process counters, latency percentiles and cache statistics"""
+    return METRICS.snapshot()
+
+@app.get("/verification/flagged")
+async def flagged_conversations():
+    """Conversations whose replies the async verification audit disagreed with"""
+    return {"flagged": verification_auditor.flagged()}
+
+def convert_chat_history(raw_history: Optional[List[Any]]) -> List[Dict[str, str]]:
+    """Convert client chat history (role/content or from/text messages) to workflow exchanges"""
+    chat_history = []
+    if raw_history:
+        print(f"\n📨 INCOMING CHAT HISTORY: {len(raw_history)} messages")
+        print(f"📨 RAW CHAT HISTORY: {raw_history}")
+        
+        for i, msg in enumerate(raw_history):
+            print(f"\n📨 Message {i+1}: {msg}")
+            print(f"📨 Message type: {type(msg)}")
+            
+            # Handle multiple formats
+            if isinstance(msg, dict):
+                # Support multiple formats:
+                # Format 1: {"role": "user", "content": "text"}
+                # Format 2: {"from": "user", "text": "text"} 
+                role = ""
+                content = ""
+                
+                if "role" in msg:
+                    role = msg["role"] or ""
+                elif "from" in msg:
+                    role = msg["from"] or ""
+                
+                if "content" in msg:
+                    content = msg["content"] or ""
+                elif "text" in msg:
+                    content = msg["text"] or ""
+                
+                print(f"📨 Dict format - role: '{role}', content: '{content[:50]}...'")
+            else:
+                role = ""
+                content = ""
+                
+                if hasattr(msg, "role") and msg.role:
+                    role = str(msg.role)
+                elif hasattr(msg, "from") and msg.from_:
+                    role = str(msg.from_)
+                
+                if hasattr(msg, "content") and msg.content:
+                    content = str(msg.content)
+                elif hasattr(msg, "text") and msg.text:
+                    content = str(msg.text)
+                
+                print(f"📨 Object format - role: '{role}', content: '{content[:50]}...'")
+            
+            # Normalize role names
+            if role.lower() in ["user", "human"]:
+                role = "user"
+            elif role.lower() in ["assistant", "aAara", "Aara", "bot", "ai"]:
+                role = "assistant"
+            
+            print(f"  - {role}: {content[:50]}...")
+            
+            if role == "user":
+                chat_history.append({"user": content, "Aara": ""})
+                print(f"✅ Added user message to chat_history")
+            elif role == "assistant" and chat_history:
+                chat_history[-1]["Aara"] = content
+                print(f"✅ Added assistant response to last exchange")
+            elif role == "assistant" and not chat_history:
+                # First message is assistant - create empty user entry
+                chat_history.append({"user": "", "Aara": content})
+                print(f"✅ Added assistant-first message to chat_history")
+            else:
+                print(f"❌ Skipped message - role: '{role}', has_previous_exchange: {len(chat_history) > 0}")
+    
+    print(f"\n📤 CONVERTED CHAT HISTORY FOR WORKFLOW: {len(chat_history)} exchanges")
+    for i, exchange in enumerate(chat_history[-2:]):  # Show last 2 exchanges
+        print(f"  {i+1}. User: {exchange.get('user', '')[:40]}...")
+        print(f"     Aara: {exchange.get('Aara', '')[:40]}...")
+    
+    return chat_history
+
+def remember_exchange(conversation_id: Optional[str], message: str, response: str):
+    """Store an exchange if the client supplied a conversation_id"""
+    if conversation_id:
+        if conversation_id not in conversations:
+            conversations[conversation_id] = []
+        conversations[conversation_id].append({
+            "user": message,
+            "Aara": response
+        })
+
+DISCONNECT_POLL_SECONDS = 0.5
+
+async def run_until_disconnect(http_request: Request, coro):
+    """Await coro, cancelling it if the client goes away so no worker is held by a dead request."""
+    task = asyncio.ensure_future(coro)
+    while True:
+        done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_SECONDS)
+        if done:
+            return task.result()
+        if await http_request.is_disconnected():
+            print("🔌 Client disconnected - cancelling workflow")
+            METRICS.increment('chat.cancelled_on_disconnect')
+            task.cancel()
+            raise HTTPException(status_code=499, detail="Client closed request")
+
 @app.post("/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest):
+async def chat(request: ChatRequest, http_request: Request):
     """Main chat endpoint"""
     try:
         print(f"\n🔍 FULL REQUEST DEBUG:")
@@ -784,88 +913,16 @@ async def chat(request: ChatRequest):
         print(f"📨 Conversation ID: '{request.conversation_id}'")
         print(f"📨 Chat History Type: {type(request.chat_history)}")
         print(f"📨 Chat History Length: {len(request.chat_history) if request.chat_history else 0}")
-        # Convert chat history to the format expected by the workflow
-        chat_history = []
-        if request.chat_history:
-            print(f"\n📨 INCOMING CHAT HISTORY: {len(request.chat_history)} messages")
-            print(f"📨 RAW CHAT HISTORY: {request.chat_history}")
-            
-            for i, msg in enumerate(request.chat_history):
-                print(f"\n📨 Message {i+1}: {msg}")
-                print(f"📨 Message type: {type(msg)}")
-                
-                # Handle multiple formats
-                if isinstance(msg, dict):
-                    # Support multiple formats:
-                    # Format 1: {"role": "user", "content": "text"}
-                    # Format 2: {"from": "user", "text": "text"} 
-                    role = ""
-                    content = ""
-                    
-                    if "role" in msg:
-                        role = msg["role"] or ""
-                    elif "from" in msg:
-                        role = msg["from"] or ""
-                    
-                    if "content" in msg:
-                        content = msg["content"] or ""
-                    elif "text" in msg:
-                        content = msg["text"] or ""
-                    
-                    print(f"📨 Dict format - role: '{role}', content: '{content[:50]}...'")
-                else:
-                    role = ""
-                    content = ""
-                    
-                    if hasattr(msg, "role") and msg.role:
-                        role = str(msg.role)
-                    elif hasattr(msg, "from") and msg.from_:
-                        role = str(msg.from_)
-                    
-                    if hasattr(msg, "content") and msg.content:
-                        content = str(msg.content)
-                    elif hasattr(msg, "text") and msg.text:
-                        content = str(msg.text)
-                    
-                    print(f"📨 Object format - role: '{role}', content: '{content[:50]}...'")
-                
-                # Normalize role names
-                if role.lower() in ["user", "human"]:
-                    role = "user"
-                elif role.lower() in ["assistant", "aAara", "Aara", "bot", "ai"]:
-                    role = "assistant"
-                
-                print(f"  - {role}: {content[:50]}...")
-                
-                if role == "user":
-                    chat_history.append({"user": content, "Aara": ""})
-                    print(f"✅ Added user message to chat_history")
-                elif role == "assistant" and chat_history:
-                    chat_history[-1]["Aara"] = content
-                    print(f"✅ Added assistant response to last exchange")
-                elif role == "assistant" and not chat_history:
-                    # First message is assistant - create empty user entry
-                    chat_history.append({"user": "", "Aara": content})
-                    print(f"✅ Added assistant-first message to chat_history")
-                else:
-                    print(f"❌ Skipped message - role: '{role}', has_previous_exchange: {len(chat_history) > 0}")
+        chat_history = convert_chat_history(request.chat_history)
         
-        print(f"\n📤 CONVERTED CHAT HISTORY FOR WORKFLOW: {len(chat_history)} exchanges")
-        for i, exchange in enumerate(chat_history[-2:]):  # Show last 2 exchanges
-            print(f"  {i+1}. User: {exchange.get('user', '')[:40]}...")
-            print(f"     Aara: {exchange.get('Aara', '')[:40]}...")
-        
-        # Run the workflow
-        response = run_workflow(request.message, chat_history)
+        # Run the workflow off the event loop; abandon it if the client disconnects
+        response = await run_until_disconnect(
+            http_request,
+            arun_workflow(request.message, chat_history, conversation_id=request.conversation_id)
+        )
         
         # Store conversation if conversation_id is provided
-        if request.conversation_id:
-            if request.conversation_id not in conversations:
-                conversations[request.conversation_id] = []
-            conversations[request.conversation_id].append({
-                "user": request.message,
-                "Aara": response
-            })
+        remember_exchange(request.conversation_id, request.message, response)
         
         return ChatResponse(
             response=response,
@@ -877,6 +934,8 @@ async def chat(request: ChatRequest):
             }
         )
     
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error in chat endpoint: {e}")
         print(f"Request data: {request}")
@@ -900,14 +959,53 @@ async def delete_conversation(conversation_id: str):
         raise HTTPException(status_code=404, detail="Conversation not found")
     
     del conversations[conversation_id]
+    PROFILE_STORE.drop(conversation_id)
     return {"message": "Conversation deleted successfully"}
 
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
 @app.post("/chat/stream")
 async def chat_stream(request: ChatRequest):
-    """Streaming chat endpoint (for future implementation)"""
-    # Placeholder for streaming functionality
-    response = await chat(request)
-    return response
+    """
+    Server-sent events chat endpoint. Early blocks are sent as soon as the graph emits them
+    (crisis turns get the static crisis resources before any model call), then the answer.
+    """
+    chat_history = convert_chat_history(request.chat_history)
+    loop = asyncio.get_running_loop()
+    events: asyncio.Queue = asyncio.Queue()
+    
+    def on_event(event: str, data: Any):
+        # Called from workflow threads
+        loop.call_soon_threadsafe(events.put_nowait, (event, data))
+    
+    async def stream():
+        task = asyncio.ensure_future(
+            arun_workflow(request.message, chat_history, conversation_id=request.conversation_id, on_event=on_event)
+        )
+        try:
+            while not task.done() or not events.empty():
+                getter = asyncio.ensure_future(events.get())
+                done, _ = await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+                if getter in done:
+                    event, data = getter.result()
+                    yield sse_event(event, {"content": data})
+                else:
+                    getter.cancel()
+            
+            response = task.result()
+            remember_exchange(request.conversation_id, request.message, response)
+            yield sse_event("message", {"response": response, "conversation_id": request.conversation_id})
+            yield sse_event("done", {"status": "success"})
+        except Exception as e:
+            print(f"Error in chat stream: {e}")
+            yield sse_event("error", {"detail": str(e)})
+        finally:
+            # Client went away mid-stream: stop the workflow instead of finishing for nobody
+            if not task.done():
+                task.cancel()
+    
+    return StreamingResponse(stream(), media_type="text/event-stream")
 
 if __name__ == "__main__":
     import argparse
@@ -1,5 +1,6 @@
 import json
 import os
+import re
 from typing import Dict, List, Any, Optional
 
 RULES_DIR = os.path.dirname(__file__)
@@ -96,6 +97,13 @@ def is_crisis_situation(user_input: str) -> bool:
     
     return False
 
+def is_safety_concern(user_input: str) -> bool:
+    """Check if user input hits an emergency or safety-check trigger"""
+    user_input_lower = user_input.lower().strip()
+    triggers = (safety_rules.get("emergencies", []) + safety_rules.get("general_safety", [])
+                + health_rules.get("safety_checks", []) + skincare_rules.get("safety_checks", []))
+    return any(rule["trigger"].lower() in user_input_lower for rule in triggers)
+
 health_rules, skincare_rules, safety_rules, general_rules = load_rules()
 
 def rule_engine_node(state: Dict[str, Any]) -> Dict[str, Any]:
@@ -126,24 +134,28 @@ def rule_engine_node(state: Dict[str, Any]) -> Dict[str, Any]:
                 continue
             if emergency["trigger"].lower() in user_input:
                 state["final_response"] = emergency["response"]
+                state["rule_category"] = "emergencies"
                 return state
         
         # Check crisis resources (but allow specific crisis patterns to go to LLM)
         for crisis in safety_rules.get("crisis_resources", []):
             if crisis["trigger"].lower() in user_input:
                 state["final_response"] = crisis["response"]
+                state["rule_category"] = "crisis_resources"
                 return state
         
         # Check general safety
         for safety in safety_rules.get("general_safety", []):
             if safety["trigger"].lower() in user_input:
                 state["final_response"] = safety["response"]
+                state["rule_category"] = "general_safety"
                 return state
         
         # 2. CRISIS SITUATIONS (Enhanced LLM Response)
         if is_crisis_situation(state.get("user_input", "")):
             state["response_type"] = "crisis"
             state["use_llm"] = True
+            state["rule_category"] = "crisis"
             return state
         
         # 3. GREETINGS (Dynamic LLM Response)
@@ -157,30 +169,35 @@ def rule_engine_node(state: Dict[str, Any]) -> Dict[str, Any]:
         for info in general_rules.get("agent_info", []):
             if info["trigger"].lower() in user_input:
                 state["final_response"] = info["response"]
+                state["rule_category"] = "agent_info"
                 return state
         
         # Check platform info
         for platform in general_rules.get("platform_info", []):
             if platform["trigger"].lower() in user_input:
                 state["final_response"] = platform["response"]
+                state["rule_category"] = "platform_info"
                 return state
         
         # Check capabilities
         for capability in general_rules.get("capabilities", []):
             if capability["trigger"].lower() in user_input:
                 state["final_response"] = capability["response"]
+                state["rule_category"] = "capabilities"
                 return state
         
         # Check casual conversation
         for casual in general_rules.get("casual_conversation", []):
             if casual["trigger"].lower() in user_input:
                 state["final_response"] = casual["response"]
+                state["rule_category"] = "casual_conversation"
                 return state
         
         # Check conversation starters
         for starter in general_rules.get("conversation_starters", []):
             if starter["trigger"].lower() in user_input:
                 state["final_response"] = starter["response"]
+                state["rule_category"] = "conversation_starters"
                 return state
         
         # 5. HEALTH/SKINCARE ROUTING (Lower Priority)
@@ -188,12 +205,14 @@ def rule_engine_node(state: Dict[str, Any]) -> Dict[str, Any]:
         for safety_check in health_rules.get("safety_checks", []):
             if safety_check["trigger"].lower() in user_input:
                 state["final_response"] = safety_check["response"]
+                state["rule_category"] = "health_safety_checks"
                 return state
         
         # Check skincare safety
         for safety_check in skincare_rules.get("safety_checks", []):
             if safety_check["trigger"].lower() in user_input:
                 state["final_response"] = safety_check["response"]
+                state["rule_category"] = "skincare_safety_checks"
                 return state
         
         # Route to appropriate tools
@@ -216,4 +235,40 @@ def rule_engine_node(state: Dict[str, Any]) -> Dict[str, Any]:
         print(f"❌ Error in rule engine: {e}")
         # Fallback response
         state["final_response"] = "I'm here to help with your health and skincare questions. How can I assist you today?"
-        return state 
\ No newline at end of file
+        state["rule_category"] = "error"
+        return state 
+
+# Rule outcomes that stand on their own: when one matches, the intent classification is moot
+PREEMPTING_RULE_CATEGORIES = {
+    "crisis", "crisis_resources", "general_safety", "health_safety_checks", "skincare_safety_checks",
+    # Set by the workflow: pooled greetings and precomputed answer-bank replies
+    "greeting", "answer_bank"
+}
+# Broad triggers ('help', 'okay', 'thanks') and general-info FAQ answers ('what can you do')
+# only preempt messages this short
+SHORT_MESSAGE_WORDS = 4
+
+def is_specific_emergency(user_input: str) -> bool:
+    """
+    Check if an emergency trigger matches as whole words and is specific enough to skip
+    intent classification: a phrase ('chest pain'), or a single word in a short message.
+    """
+    user_input_lower = user_input.lower().strip()
+    short = len(user_input_lower.split()) <= SHORT_MESSAGE_WORDS
+    for emergency in safety_rules.get("emergencies", []):
+        trigger = emergency["trigger"].lower()
+        if (' ' in trigger or short) and re.search(rf"\b{re.escape(trigger)}\b", user_input_lower):
+            return True
+    return False
+
+def rule_preempts_intent(user_input: str, rule_result: Dict[str, Any]) -> bool:
+    """True if the rule engine's outcome should be used without waiting for intent classification."""
+    category = rule_result.get("rule_category")
+    if category in PREEMPTING_RULE_CATEGORIES:
+        return True
+    if category == "emergencies":
+        return is_specific_emergency(user_input)
+    if category == "error":
+        # The rule engine failed; its generic fallback must not replace the model's answer
+        return False
+    return bool(rule_result.get("final_response")) and len(user_input.split()) <= SHORT_MESSAGE_WORDS
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmark the SQLite catalog store against a synthetic product catalog.
+
+Reports import time, cold open time and p50/p99 lookup latency for
+context-scored recommendations from the vectorized feature index,
+plus batch scoring throughput.
+
+Usage:
+    python scripts/benchmark_catalog.py --products 100000 --lookups 2000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from tools.catalog_store import Product, ProductCatalogStore
+from tools.product_scoring import ProductFeatureIndex
+
+SKIN_TYPES = ['oily', 'dry', 'combination', 'sensitive', 'normal', 'acne-prone']
+SKIN_CONCERNS = ['acne', 'wrinkles', 'fine lines', 'dark spots', 'blackheads', 'enlarged pores', 'redness', 'dryness', 'oiliness', 'sensitivity']
+HEALTH_CONCERNS = ['pcos', 'irregular periods', 'heavy periods', 'cramps', 'pms', 'iron deficiency', 'fatigue', 'hormonal imbalance']
+SUBCATEGORIES = {
+    'skincare': ['cleansers', 'moisturizers', 'toners', 'serums', 'sunscreens', 'exfoliants'],
+    'health_supplements': ['iron', 'hormonal_support', 'vitamins'],
+    'period_care': ['menstrual_cups', 'comfort'],
+}
+MENTIONS = ['cleanser', 'moisturizer', 'serum', 'sunscreen', 'supplement', 'vitamin', 'toner', 'exfoliant']
+FILLER_KEYWORDS = ['gentle', 'lightweight', 'hydrating', 'fragrance-free', 'vegan', 'non-comedogenic', 'ceramides', 'niacinamide']
+
+def synthetic_products(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    categories = list(SUBCATEGORIES)
+    for i in range(count):
+        category = rng.choice(categories)
+        subcategory = rng.choice(SUBCATEGORIES[category])
+        concerns = SKIN_CONCERNS if category == 'skincare' else HEALTH_CONCERNS
+        low = rng.randint(5, 60)
+        yield Product(
+            name=f"Synthetic {subcategory} #{i}",
+            description=f"Synthetic {subcategory} for {rng.choice(concerns)} with {rng.choice(FILLER_KEYWORDS)} formula",
+            category=category,
+            subcategory=subcategory,
+            price_range=f"${low}-{low + rng.randint(2, 15)}",
+            affiliate_link=f"https://example.com/p/{i}",
+            keywords=rng.sample(concerns, 2) + rng.sample(FILLER_KEYWORDS, 2),
+            recommended_for=rng.sample(SKIN_TYPES, 2),
+            why_recommended="Synthetic benchmark product",
+        )
+
+def random_context(rng: random.Random):
+    return {
+        'skin_type': rng.choice(SKIN_TYPES + ['']),
+        'skin_concerns': [c.replace(' ', '_') for c in rng.sample(SKIN_CONCERNS, rng.randint(0, 2))],
+        'health_concerns': [c.replace(' ', '_') for c in rng.sample(HEALTH_CONCERNS, rng.randint(0, 1))],
+        'mentioned_products': rng.sample(MENTIONS, rng.randint(0, 1)),
+    }
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def report(label, samples_ms):
+    print(f"  {label:<28} p50={percentile(samples_ms, 50):7.2f}ms  "
+          f"p99={percentile(samples_ms, 99):7.2f}ms  max={max(samples_ms):7.2f}ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the product catalog store")
+    parser.add_argument("--products", type=int, default=100000)
+    parser.add_argument("--lookups", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'catalog.db')
+
+        print(f"📦 Importing {args.products} synthetic products...")
+        start = time.perf_counter()
+        store = ProductCatalogStore(db_path)
+        store.import_products(synthetic_products(args.products, args.seed), replace=True)
+        store.close()
+        print(f"  import: {time.perf_counter() - start:.2f}s ({os.path.getsize(db_path) / 1e6:.1f} MB on disk)")
+
+        start = time.perf_counter()
+        store = ProductCatalogStore(db_path)
+        print(f"  cold open: {(time.perf_counter() - start) * 1000:.1f}ms ({store.count()} products)")
+
+        start = time.perf_counter()
+        index = ProductFeatureIndex(store=store)
+        print(f"  feature index build: {time.perf_counter() - start:.2f}s "
+              f"({len(index.feature_ids)} features, {len(index.indices)} non-zeros)")
+
+        rng = random.Random(args.seed)
+        vector_ms, vector_filtered_ms = [], []
+        for _ in range(args.lookups):
+            context = random_context(rng)
+
+            start = time.perf_counter()
+            index.top_k(context, k=3)
+            vector_ms.append((time.perf_counter() - start) * 1000)
+
+            start = time.perf_counter()
+            index.top_k(context, k=3, category='skincare', max_price=20)
+            vector_filtered_ms.append((time.perf_counter() - start) * 1000)
+
+        print(f"⏱️  {args.lookups} lookups:")
+        report("vectorized top_k", vector_ms)
+        report("vectorized top_k (filtered)", vector_filtered_ms)
+
+        contexts = [random_context(rng) for _ in range(args.lookups)]
+        start = time.perf_counter()
+        index.score_batch(contexts)
+        elapsed = time.perf_counter() - start
+        print(f"  batch scoring: {len(contexts)} contexts in {elapsed * 1000:.1f}ms "
+              f"({elapsed / len(contexts) * 1e6:.0f}µs per context)")
+        store.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Precompute verified answers for every rule redirect trigger into the answer bank.
+
+Each trigger is asked in a few canonical phrasings; the routed tool answers it, the
+response node's disclaimer step is applied, and each distinct output is verified once.
+Outputs without a verdict (verifier errors or inconclusive replies) are left out.
+
+Usage:
+    python scripts/build_answer_bank.py
+    python scripts/build_answer_bank.py --out data/answer_bank.json --workers 8
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from dotenv import load_dotenv
+
+from src.agent.answer_bank import AnswerBank, BANK_FORMAT, QUESTION_TEMPLATES, current_versions, output_key
+from src.agent.config import get_section, load_settings, resolve_path
+from src.agent.llm_factory import LLMFactory
+from src.agent.response import verification_outcome, with_disclaimer
+from src.agent.verification_cache import APPROVED
+from rules.rules_engine import load_rules, rule_engine_node
+from tools.health_advice import health_advice_tool
+from tools.search_cache import normalize_query
+from tools.skincare import skincare_tool
+
+TOOLS = {'health_advice_tool': health_advice_tool, 'skincare_tool': skincare_tool}
+
+def canonical_questions():
+    """(question, tool) pairs the rule engine itself routes to a redirect tool."""
+    health_rules, skincare_rules, _, _ = load_rules()
+    seen = set()
+    for redirect in health_rules.get('redirects', []) + skincare_rules.get('redirects', []):
+        for template in QUESTION_TEMPLATES:
+            question = template.format(trigger=redirect['trigger'].lower())
+            key = normalize_query(question)
+            if key in seen:
+                continue
+            seen.add(key)
+            # Only bank phrasings the live rule engine routes the same way
+            routed = rule_engine_node({'user_input': question, 'intermediate_steps': []}) or {}
+            if not routed.get('final_response') and routed.get('route_to'):
+                yield question, routed['route_to'], redirect['trigger']
+
+def main():
+    settings = get_section('answer_bank')
+    parser = argparse.ArgumentParser(description="Build the verified answer bank for rule redirects")
+    parser.add_argument("--out", default=settings.get('path', 'data/answer_bank.json'), help="Answer bank path")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent verification calls")
+    args = parser.parse_args()
+
+    load_dotenv()
+    factory = LLMFactory(load_settings().get('llm', {}), os.getenv('OPENAI_API_KEY'))
+    llm = factory.get('verifier')
+    model_name = factory.tier('verifier')['model']
+
+    start = time.perf_counter()
+    entries, outputs = [], {}
+    for question, tool_name, trigger in canonical_questions():
+        state = TOOLS[tool_name]({'user_input': question, 'chat_history': [], 'intermediate_steps': []})
+        text = with_disclaimer(state['final_response'])
+        entries.append((question, tool_name, trigger, text))
+        outputs.setdefault(output_key(text), (question, text))
+
+    print(f"🧮 {len(entries)} canonical questions -> {len(outputs)} distinct tool outputs to verify")
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        outcomes = dict(zip(outputs, executor.map(lambda item: verification_outcome(llm, *item), outputs.values())))
+
+    # APPROVED keeps the tool output, an improved response replaces it, no verdict drops it
+    verified = {key: text if outcomes[key] == APPROVED else outcomes[key]
+                for key, (question, text) in outputs.items() if outcomes[key] is not None}
+    if len(verified) < len(outputs):
+        print(f"⚠️ {len(outputs) - len(verified)} outputs could not be verified; their questions are left out of the bank")
+
+    bank = AnswerBank(metadata={
+        'format': BANK_FORMAT,
+        'built_at': time.time(),
+        'model': model_name,
+        'versions': current_versions(),
+    })
+    bank.verified_outputs = verified
+    for question, tool_name, trigger, text in entries:
+        if output_key(text) not in verified:
+            continue
+        bank.answers[normalize_query(question)] = {
+            'answer': verified[output_key(text)],
+            'tool': tool_name,
+            'trigger': trigger,
+        }
+
+    out_path = resolve_path(args.out)
+    bank.save(out_path)
+    print(f"📚 Wrote {len(bank.answers)} answers in {time.perf_counter() - start:.1f}s ({out_path})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Import affiliate products from YAML or CSV into the SQLite catalog store.
+
+Usage:
+    python scripts/import_catalog.py config/affiliate_links.yaml
+    python scripts/import_catalog.py products.csv --db data/catalog.db --append
+"""
+import argparse
+import os
+import sys
+import time
+
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.agent.config import get_section, resolve_path
+from tools.catalog_store import ProductCatalogStore
+
+def main():
+    default_db = get_section('catalog').get('path', 'data/catalog.db')
+
+    parser = argparse.ArgumentParser(description="Import products into the catalog store")
+    parser.add_argument("source", help="Path to a .yaml/.yml or .csv product file")
+    parser.add_argument("--db", default=default_db, help=f"Catalog database path (default: {default_db})")
+    parser.add_argument("--append", action="store_true", help="Add to the existing catalog instead of replacing it")
+    args = parser.parse_args()
+
+    db_path = resolve_path(args.db)
+    os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+    store = ProductCatalogStore(db_path)
+
+    start = time.perf_counter()
+    extension = os.path.splitext(args.source)[1].lower()
+    if extension in ('.yaml', '.yml'):
+        count = store.import_yaml(args.source, replace=not args.append)
+    elif extension == '.csv':
+        count = store.import_csv(args.source, replace=not args.append)
+    else:
+        print(f"❌ Unsupported catalog format: {extension}")
+        sys.exit(1)
+    elapsed = time.perf_counter() - start
+
+    print(f"📦 Imported {count} products in {elapsed:.2f}s")
+    print(f"🗂️  Catalog now holds {store.count()} products ({db_path})")
+    store.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Load-test the whole graph offline against the stand-in LLM.
+
+Runs --turns conversations' first turns through arun_workflow with --concurrency in
+flight, then reports turn latency percentiles, throughput and LLM calls per turn next
+to the simulated provider time. With --median-ms 0 every millisecond of a turn is the
+graph's own overhead (routing, rules, tools, caches, limiters).
+
+Usage:
+    python scripts/load_test.py --turns 500 --concurrency 50
+    python scripts/load_test.py --median-ms 400 --p99-ms 3000 --error-rate 0.02
+    python scripts/load_test.py --backend standin_http   # needs scripts/run_llm_standin.py
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+MESSAGES = [
+    'What is a good routine for oily skin?',
+    'I have missed my period',
+    'what are the latest research findings on pcos',
+    'suggest products for dry skin',
+    'I feel tired all the time lately',
+    'how do I deal with stress before exams',
+    'hi',
+    'who are you',
+]
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--turns', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--backend', default='standin', choices=['standin', 'standin_http'])
+    parser.add_argument('--median-ms', type=float, default=0)
+    parser.add_argument('--p99-ms', type=float, default=0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0)
+    return parser.parse_args()
+
+async def run(turns: int, concurrency: int):
+    from src.agent.workflow import arun_workflow
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def turn(i: int):
+        async with semaphore:
+            start = time.perf_counter()
+            await arun_workflow(f'{MESSAGES[i % len(MESSAGES)]} ({i})', [], f'load-{i}')
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(turn(i) for i in range(turns)))
+    return latencies, time.perf_counter() - start
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+def main():
+    args = parse_args()
+    os.environ['LLM_BACKEND'] = args.backend
+
+    from src.agent.config import load_settings
+    standin = load_settings().setdefault('standin', {})
+    standin['latency_ms'] = {'median': args.median_ms, 'p99': args.p99_ms}
+    standin['error_rate'] = args.error_rate
+    standin['rate_limit_rate'] = args.rate_limit_rate
+    if args.backend == 'standin_http':
+        print("ℹ️ standin_http: provider time and errors come from the server's own settings")
+
+    from src.agent.metrics import METRICS
+    latencies, elapsed = asyncio.run(run(args.turns, args.concurrency))
+
+    counters = METRICS.counters('')
+    llm_calls = sum(value for name, value in counters.items() if name.startswith('llm.') and name.endswith('.calls'))
+    provider_seconds = counters.get('standin.provider_seconds', 0)
+    print("\n📊 Load test results")
+    print(f"  turns: {args.turns} at concurrency {args.concurrency} in {elapsed:.2f}s "
+          f"({args.turns / elapsed:.1f} turns/s)")
+    print(f"  turn latency ms: p50 {percentile(latencies, 50) * 1000:.1f}, "
+          f"p95 {percentile(latencies, 95) * 1000:.1f}, p99 {percentile(latencies, 99) * 1000:.1f}")
+    print(f"  LLM calls per turn: {llm_calls / args.turns:.2f}")
+    if args.backend == 'standin':
+        print(f"  simulated provider time per turn: {provider_seconds / args.turns * 1000:.1f} ms "
+              f"(summed over the turn's calls, including parallel ones)")
+        print(f"  stand-in errors: {counters.get('standin.server_error', 0):.0f} x 500, "
+              f"{counters.get('standin.rate_limit', 0):.0f} x 429")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Run the deterministic OpenAI-compatible stand-in server for the standin_http backend.
+
+Latency and error rates come from the standin section of config/settings.yaml.
+
+Usage:
+    python scripts/run_llm_standin.py --port 8790
+    LLM_BACKEND=standin_http python scripts/run_api.py
+"""
+import argparse
+import os
+import sys
+
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.agent.llm_standin import serve_standin
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8790)
+    args = parser.parse_args()
+    try:
+        serve_standin(args.host, args.port, background=False)
+    except KeyboardInterrupt:
+        print("\n🧪 LLM stand-in stopped")
+
+if __name__ == "__main__":
+    main()
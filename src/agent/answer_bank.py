@@ -0,0 +1,120 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+from src.agent.config import PROJECT_ROOT, get_section, resolve_path
+from src.agent.llm_factory import LLMFactory
+from src.agent.metrics import METRICS
+from tools.search_cache import normalize_query
+
+BANK_FORMAT = 1
+
+# Inputs that shape banked answers; a change to any of them (or to the verifier model) makes the bank stale
+VERSIONED_SOURCES = {
+    'prompts': ['prompts/verification_prompt.txt'],
+    'rules': ['rules/health_rules.json', 'rules/skincare_rules.json'],
+    'tools': ['tools/health_advice.py', 'tools/skincare.py', 'tools/user_profile.py'],
+}
+
+# Phrasings precomputed for every redirect trigger
+QUESTION_TEMPLATES = ['{trigger}', 'what is {trigger}', 'tell me about {trigger}']
+
+def content_version(paths: List[str]) -> str:
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(os.path.join(PROJECT_ROOT, path), 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+def current_versions() -> Dict[str, str]:
+    versions = {name: content_version(paths) for name, paths in VERSIONED_SOURCES.items()}
+    versions['verifier_model'] = LLMFactory(get_section('llm')).tier('verifier')['model']
+    return versions
+
+def output_key(text: str) -> str:
+    return hashlib.sha256(text.strip().encode('utf-8')).hexdigest()
+
+class AnswerBank:
+    """
+    Offline-built, verified answers: canonical redirect questions (served before any LLM
+    call) and verified versions of common tool outputs (which skip runtime verification).
+    """
+
+    def __init__(self, answers: Dict[str, Dict[str, Any]] = None, verified_outputs: Dict[str, str] = None,
+                 metadata: Dict[str, Any] = None):
+        self.answers = answers or {}
+        self.verified_outputs = verified_outputs or {}
+        self.metadata = metadata or {}
+
+    @classmethod
+    def load(cls, path: str, max_age_days: Optional[float] = None) -> 'AnswerBank':
+        """Load a bank file, returning an empty bank if it is missing or stale."""
+        if not os.path.exists(path):
+            return cls()
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        metadata = data.get('metadata', {})
+        reason = stale_reason(metadata, max_age_days)
+        if reason:
+            print(f"⚠️ Answer bank at {path} is stale ({reason}); rebuild with scripts/build_answer_bank.py")
+            METRICS.increment('answer_bank.stale')
+            return cls(metadata=dict(metadata, stale=reason))
+        return cls(data.get('answers', {}), data.get('verified_outputs', {}), metadata)
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'metadata': self.metadata, 'answers': self.answers,
+                       'verified_outputs': self.verified_outputs}, f, indent=2, ensure_ascii=False)
+
+    def lookup(self, user_input: str) -> Optional[Dict[str, Any]]:
+        """Banked answer for a canonical question ({'answer', 'tool', 'trigger'}), if any."""
+        entry = self.answers.get(normalize_query(user_input))
+        METRICS.increment('answer_bank.hit' if entry else 'answer_bank.miss')
+        return entry
+
+    def verified(self, text: str) -> Optional[str]:
+        """Verified version of a tool output, if it was verified offline."""
+        verified = self.verified_outputs.get(output_key(text))
+        if verified is not None:
+            METRICS.increment('answer_bank.verified_output_hit')
+        return verified
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'answers': len(self.answers),
+            'verified_outputs': len(self.verified_outputs),
+            'built_at': self.metadata.get('built_at'),
+            'stale': self.metadata.get('stale'),
+        }
+
+def stale_reason(metadata: Dict[str, Any], max_age_days: Optional[float] = None) -> Optional[str]:
+    if metadata.get('format') != BANK_FORMAT:
+        return 'format changed'
+    built_versions = metadata.get('versions', {})
+    for name, version in current_versions().items():
+        if built_versions.get(name) != version:
+            return f'{name} changed'
+    if max_age_days is not None and time.time() - metadata.get('built_at', 0) > max_age_days * 86400:
+        return f'older than {max_age_days} days'
+    return None
+
+_bank: Optional[AnswerBank] = None
+_bank_lock = threading.Lock()
+
+def get_answer_bank() -> AnswerBank:
+    global _bank
+    with _bank_lock:
+        if _bank is None:
+            settings = get_section('answer_bank')
+            if settings.get('enabled', True):
+                _bank = AnswerBank.load(resolve_path(settings.get('path', 'data/answer_bank.json')),
+                                        settings.get('max_age_days'))
+            else:
+                _bank = AnswerBank()
+            METRICS.register_gauge('answer_bank', _bank.stats)
+        return _bank
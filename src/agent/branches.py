@@ -0,0 +1,51 @@
+import time
+from typing import Dict, Any, Callable, Optional
+
+from langchain_core.runnables import RunnableLambda
+
+from src.agent.metrics import METRICS
+
+def merge_dicts(left: Optional[Dict[str, Any]], right: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """State reducer for keys that parallel branches each contribute entries to."""
+    return {**(left or {}), **(right or {})}
+
+def _state_update(name: str, before: Dict[str, Any], after: Dict[str, Any], elapsed: float) -> Dict[str, Any]:
+    """Only the keys a node changed, so branches running in the same step don't collide."""
+    update = {
+        key: value for key, value in after.items()
+        if key != 'intermediate_steps' and (key not in before or before[key] is not value and before[key] != value)
+    }
+    # intermediate_steps is append-only (operator.add reducer): return just the new entries
+    seen = len(before.get('intermediate_steps') or [])
+    update['intermediate_steps'] = list(after.get('intermediate_steps') or [])[seen:]
+    update['branch_timings'] = {name: round(elapsed * 1000, 2)}
+    METRICS.observe(f'workflow.node.{name}', elapsed)
+    return update
+
+def branch(name: str, node: Callable, anode: Optional[Callable] = None):
+    """
+    Adapt a node written as "mutate state and return it" for a graph with parallel
+    branches: it runs on a private copy of the state and returns a timed diff.
+    Pass `anode` to keep a native async implementation for app.ainvoke.
+    """
+    def prepare(state: Dict[str, Any]) -> Dict[str, Any]:
+        local = dict(state)
+        local['intermediate_steps'] = list(state.get('intermediate_steps') or [])
+        return local
+
+    def run(state: Dict[str, Any]) -> Dict[str, Any]:
+        local = prepare(state)
+        start = time.perf_counter()
+        result = node(local)
+        return _state_update(name, state, result if result is not None else local, time.perf_counter() - start)
+
+    if anode is None:
+        return run
+
+    async def arun(state: Dict[str, Any]) -> Dict[str, Any]:
+        local = prepare(state)
+        start = time.perf_counter()
+        result = await anode(local)
+        return _state_update(name, state, result if result is not None else local, time.perf_counter() - start)
+
+    return RunnableLambda(run, afunc=arun, name=name)
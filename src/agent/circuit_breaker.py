@@ -0,0 +1,169 @@
+import asyncio
+import threading
+import time
+from typing import Dict, Any, Callable, Optional
+
+import httpx
+import openai
+from langchain_core.callbacks import BaseCallbackHandler
+
+from src.agent.config import get_section
+from src.agent.metrics import METRICS
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling an upstream whose breaker is open."""
+
+class CircuitBreaker:
+    """
+    Per-upstream breaker: `failure_threshold` consecutive failures open it, calls are then
+    rejected immediately for `recovery_seconds`, after which a single probe is let through
+    (half-open). A successful probe closes the breaker, a failed one re-opens it.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_seconds: float = 30):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.recovery_seconds:
+            self._state = HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def is_open(self) -> bool:
+        """True while calls are being rejected (open and not yet due for a probe)."""
+        return self.state == OPEN
+
+    def accepting_calls(self) -> bool:
+        """True if a call made now would be let through: closed, or half-open with the probe slot free."""
+        with self._lock:
+            state = self._current_state()
+            return state == CLOSED or (state == HALF_OPEN and not self._probe_in_flight)
+
+    def allow(self) -> bool:
+        """Whether a call may go out now; in half-open state only one probe at a time."""
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                METRICS.increment(f'circuit.{self.name}.probe')
+                return True
+        METRICS.increment(f'circuit.{self.name}.rejected')
+        return False
+
+    def record_success(self):
+        with self._lock:
+            if self._state != CLOSED:
+                print(f"✅ Circuit '{self.name}' closed - upstream recovered")
+                METRICS.increment(f'circuit.{self.name}.closed')
+            self._state = CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._current_state() == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    print(f"🔌 Circuit '{self.name}' opened after {self._failures} failures")
+                    METRICS.increment(f'circuit.{self.name}.opened')
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+    def release(self):
+        """A call ended without telling us anything (e.g. cancelled): free the probe slot."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def call(self, func: Callable, *args, is_failure: Callable[[BaseException], bool] = lambda e: True, **kwargs):
+        if not self.allow():
+            raise CircuitOpenError(f"Circuit '{self.name}' is open")
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            if is_failure(e):
+                self.record_failure()
+            else:
+                self.record_success()
+            raise
+        self.record_success()
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'state': self._current_state(), 'consecutive_failures': self._failures}
+
+def is_llm_outage(error: BaseException) -> bool:
+    """Errors that say the model API is down or overloaded (not a bad request of ours)."""
+    return isinstance(error, (openai.APIConnectionError, openai.InternalServerError, openai.RateLimitError,
+                              httpx.TransportError, TimeoutError))
+
+class CircuitBreakerCallback(BaseCallbackHandler):
+    """Guards every call of the chat clients it is attached to with a breaker."""
+
+    raise_error = True  # the CircuitOpenError must reach the caller
+    run_inline = True
+
+    def __init__(self, breaker: CircuitBreaker):
+        self.breaker = breaker
+
+    def _check(self):
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"Circuit '{self.breaker.name}' is open")
+
+    def on_chat_model_start(self, serialized, messages, **kwargs: Any) -> None:
+        self._check()
+
+    def on_llm_start(self, serialized, prompts, **kwargs: Any) -> None:
+        self._check()
+
+    def on_llm_end(self, response, **kwargs: Any) -> None:
+        self.breaker.record_success()
+
+    def on_llm_error(self, error: BaseException, **kwargs: Any) -> None:
+        if isinstance(error, asyncio.CancelledError):
+            self.breaker.release()
+        elif is_llm_outage(error):
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """Shared breaker for an upstream ('llm', 'tavily'), configured under circuit_breakers."""
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            settings = get_section('circuit_breakers').get(name) or {}
+            breaker = CircuitBreaker(name, failure_threshold=settings.get('failure_threshold', 5),
+                                     recovery_seconds=settings.get('recovery_seconds', 30))
+            _breakers[name] = breaker
+            METRICS.register_gauge(f'circuit.{name}', breaker.stats)
+        return breaker
+
+def llm_available() -> bool:
+    """
+    False while the LLM breaker would reject calls (open, or half-open with its probe in
+    flight): the graph runs in degraded, rule-only mode.
+    """
+    return get_breaker('llm').accepting_calls()
@@ -0,0 +1,207 @@
+import asyncio
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Optional
+
+from src.agent.config import get_section
+from src.agent.metrics import METRICS
+
+# Queue order for LLM calls, most urgent first; set per turn with llm_priority()
+PRIORITIES = ('crisis', 'safety', 'normal')
+
+LLM_PRIORITY = contextvars.ContextVar('llm_priority', default='normal')
+
+@contextmanager
+def llm_priority(priority: str):
+    """LLM calls made in this context (and threads started with its copy) queue at `priority`."""
+    token = LLM_PRIORITY.set(priority if priority in PRIORITIES else 'normal')
+    try:
+        yield
+    finally:
+        LLM_PRIORITY.reset(token)
+
+class LimiterTimeout(RuntimeError):
+    """An LLM call waited longer than queue_timeout_seconds for a concurrency slot."""
+
+class _Waiter:
+    def __init__(self, priority: int, notify):
+        self.priority = priority
+        self.notify = notify
+        self.granted = False
+        self.cancelled = False
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limit for one model. Each completed call while the limit is in use
+    adds about one slot per round of `limit` calls; a rate limit (429), or recent latency
+    rising past `latency_tolerance` x its long-run average, multiplies the limit by
+    `backoff` (at most once per round trip). Calls over the limit queue by priority.
+    """
+
+    def __init__(self, name: str, initial_limit: float = 16, min_limit: float = 2, max_limit: float = 64,
+                 backoff: float = 0.7, latency_tolerance: float = 2.0, queue_timeout_seconds: float = 30,
+                 enabled: bool = True):
+        self.name = name
+        self.enabled = enabled
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self._inflight = 0
+        self._queue = []
+        self._sequence = itertools.count()
+        self._short_latency: Optional[float] = None  # last few calls
+        self._long_latency: Optional[float] = None  # long-run baseline
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, model: str) -> 'AdaptiveLimiter':
+        settings = get_section('llm_concurrency')
+        config = {**settings, **((settings.get('models') or {}).get(model) or {})}
+        return cls(
+            model,
+            initial_limit=config.get('initial_limit', 16),
+            min_limit=config.get('min_limit', 2),
+            max_limit=config.get('max_limit', 64),
+            backoff=config.get('backoff', 0.7),
+            latency_tolerance=config.get('latency_tolerance', 2.0),
+            queue_timeout_seconds=config.get('queue_timeout_seconds', 30),
+            enabled=settings.get('enabled', True),
+        )
+
+    def _capacity(self) -> int:
+        return max(1, int(self.limit))
+
+    def _try_enter(self, notify) -> Optional[_Waiter]:
+        """Take a slot now (returns None) or join the queue (returns the waiter)."""
+        with self._lock:
+            if self._inflight < self._capacity() and not self._queue:
+                self._inflight += 1
+                return None
+            priority = PRIORITIES.index(LLM_PRIORITY.get())
+            waiter = _Waiter(priority, notify)
+            heapq.heappush(self._queue, (priority, next(self._sequence), waiter))
+        METRICS.increment(f'llm_limit.{self.name}.queued')
+        return waiter
+
+    def _dispatch(self):
+        """Hand free slots to the most urgent waiters (called with the lock held)."""
+        while self._queue and self._inflight < self._capacity():
+            _, _, waiter = heapq.heappop(self._queue)
+            if waiter.cancelled:
+                continue
+            waiter.granted = True
+            self._inflight += 1
+            waiter.notify()
+
+    def _abandon(self, waiter: _Waiter) -> bool:
+        """A waiter gave up; True if a slot was granted meanwhile (and is now its to release)."""
+        with self._lock:
+            if waiter.granted:
+                return True
+            waiter.cancelled = True
+            return False
+
+    def _timed_out(self):
+        METRICS.increment(f'llm_limit.{self.name}.timeout')
+        raise LimiterTimeout(f"No '{self.name}' concurrency slot within {self.queue_timeout_seconds}s")
+
+    def acquire(self):
+        if not self.enabled:
+            return
+        event = threading.Event()
+        waiter = self._try_enter(event.set)
+        if waiter is None:
+            return
+        start = time.perf_counter()
+        if not event.wait(self.queue_timeout_seconds) and not self._abandon(waiter):
+            self._timed_out()
+        METRICS.observe(f'llm_limit.{self.name}.wait', time.perf_counter() - start)
+
+    async def aacquire(self):
+        if not self.enabled:
+            return
+        loop = asyncio.get_running_loop()
+        granted = loop.create_future()
+        notify = lambda: loop.call_soon_threadsafe(lambda: granted.done() or granted.set_result(True))
+        waiter = self._try_enter(notify)
+        if waiter is None:
+            return
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(granted, self.queue_timeout_seconds)
+        except asyncio.TimeoutError:
+            if not self._abandon(waiter):
+                self._timed_out()
+        except asyncio.CancelledError:
+            if self._abandon(waiter):
+                self.release()
+            raise
+        METRICS.observe(f'llm_limit.{self.name}.wait', time.perf_counter() - start)
+
+    def release(self, latency: Optional[float] = None, rate_limited: bool = False):
+        """Free a slot and adapt the limit: latency of a completed call, or a 429."""
+        if not self.enabled:
+            return
+        with self._lock:
+            if rate_limited:
+                METRICS.increment(f'llm_limit.{self.name}.rate_limited')
+                self._decrease()
+            elif latency is not None:
+                self._observe(latency)
+            self._inflight -= 1
+            self._dispatch()
+
+    def _observe(self, latency: float):
+        saturated = self._inflight >= self._capacity() or bool(self._queue)
+        if self._long_latency is None:
+            self._short_latency = self._long_latency = latency
+            return
+        self._short_latency = 0.7 * self._short_latency + 0.3 * latency
+        self._long_latency = 0.95 * self._long_latency + 0.05 * latency
+        if self._short_latency > self.latency_tolerance * self._long_latency:
+            self._decrease()
+        elif saturated:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def _decrease(self):
+        now = time.monotonic()
+        if now - self._last_decrease < (self._short_latency or 0):
+            return  # already cut for this round trip
+        self._last_decrease = now
+        self.limit = max(self.min_limit, self.limit * self.backoff)
+        METRICS.increment(f'llm_limit.{self.name}.decreased')
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            queued = [0] * len(PRIORITIES)
+            for priority, _, waiter in self._queue:
+                if not waiter.cancelled:
+                    queued[priority] += 1
+            return {
+                'limit': round(self.limit, 2),
+                'inflight': self._inflight,
+                'queued': dict(zip(PRIORITIES, queued)),
+                'latency_ms': round(self._short_latency * 1000, 1) if self._short_latency is not None else None,
+                'baseline_ms': round(self._long_latency * 1000, 1) if self._long_latency is not None else None,
+            }
+
+_limiters: Dict[str, AdaptiveLimiter] = {}
+_limiters_lock = threading.Lock()
+
+def get_limiter(model: str) -> AdaptiveLimiter:
+    """Shared limiter for a model, configured under llm_concurrency (models: per-model overrides)."""
+    with _limiters_lock:
+        limiter = _limiters.get(model)
+        if limiter is None:
+            limiter = AdaptiveLimiter.from_settings(model)
+            _limiters[model] = limiter
+            METRICS.register_gauge(f'llm_limit.{model}', limiter.stats)
+        return limiter
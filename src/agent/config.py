@@ -0,0 +1,33 @@
+import os
+import yaml
+from typing import Any, Dict
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+SETTINGS_PATH = os.path.join(PROJECT_ROOT, 'config', 'settings.yaml')
+
+_settings_cache: Dict[str, Any] = {}
+
+def load_settings(reload: bool = False) -> Dict[str, Any]:
+    """Load config/settings.yaml once and share it across modules."""
+    if _settings_cache and not reload:
+        return _settings_cache
+    try:
+        with open(SETTINGS_PATH, 'r', encoding='utf-8') as f:
+            loaded = yaml.safe_load(f) or {}
+    except Exception as e:
+        print(f"❌ Error loading settings: {e}")
+        loaded = {}
+    _settings_cache.clear()
+    _settings_cache.update(loaded)
+    return _settings_cache
+
+def get_section(name: str) -> Dict[str, Any]:
+    """Return a top-level settings section, or an empty dict if it is missing."""
+    section = load_settings().get(name)
+    return section if isinstance(section, dict) else {}
+
+def resolve_path(path: str) -> str:
+    """Resolve a settings path relative to the project root."""
+    if os.path.isabs(path) or path == ':memory:':
+        return path
+    return os.path.join(PROJECT_ROOT, path)
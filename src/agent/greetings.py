@@ -0,0 +1,148 @@
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+
+from src.agent.circuit_breaker import llm_available
+from src.agent.config import get_section
+from src.agent.metrics import METRICS
+from src.agent.response import generate_text, load_prompt, verification_outcome
+from src.agent.verification_cache import APPROVED
+
+DEFAULT_SEEDS = ['hello', 'hi', 'hey', 'good morning', 'good afternoon', 'good evening', 'namaste', 'hola']
+
+def _clean(text: str) -> str:
+    return ' '.join(''.join(c for c in text.lower() if c.isalpha() or c.isspace()).split())
+
+class GreetingPool:
+    """
+    Pre-generated, verified greeting variants per seed greeting ('hi', 'good morning', ...),
+    served round-robin and regenerated in the background with greeting_prompt.txt.
+    """
+
+    def __init__(self, llm, seeds: List[str] = None, variants_per_seed: int = 4,
+                 refresh_seconds: float = 6 * 3600, retry_seconds: float = 60, enabled: bool = True,
+                 verifier_llm=None):
+        self.llm = llm
+        self.verifier_llm = verifier_llm or llm
+        self.seeds = seeds or DEFAULT_SEEDS
+        self.variants_per_seed = variants_per_seed
+        self.refresh_seconds = refresh_seconds
+        self.retry_seconds = retry_seconds
+        self.enabled = enabled
+        self._variants: Dict[str, List[str]] = {}
+        self._rotation: Dict[str, itertools.count] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.last_refresh: Optional[float] = None
+
+    @classmethod
+    def from_settings(cls, llm, verifier_llm=None) -> 'GreetingPool':
+        settings = get_section('greetings')
+        return cls(
+            llm,
+            seeds=settings.get('seeds'),
+            variants_per_seed=settings.get('variants_per_seed', 4),
+            refresh_seconds=settings.get('refresh_seconds', 6 * 3600),
+            retry_seconds=settings.get('retry_seconds', 60),
+            enabled=settings.get('pool_enabled', True),
+            verifier_llm=verifier_llm,
+        )
+
+    def _generate(self, seed: str) -> Optional[str]:
+        # Same context the response node builds for a first-message greeting
+        context = f"""
+                {load_prompt('greeting_prompt.txt')}
+
+                User's greeting: {seed}
+                Chat history: []
+
+                Generate a personalized, warm greeting response.
+                """
+        try:
+            text = generate_text(self.llm, context, 'greeting').strip()
+            if not text:
+                return None
+            # Only variants the verifier approved as written; rewrites and unknown verdicts are dropped
+            if verification_outcome(self.verifier_llm, seed, text) == APPROVED:
+                return text
+            METRICS.increment('greetings.unapproved')
+            return None
+        except Exception as e:
+            print(f"Greeting generation failed for '{seed}': {e}")
+            return None
+
+    def refresh(self) -> int:
+        """Regenerate every variant; the old pool keeps serving until the new one is ready."""
+        if not llm_available():
+            print("👋 Greeting pool refresh skipped - LLM unavailable")
+            return 0
+        jobs = [seed for seed in self.seeds for _ in range(self.variants_per_seed)]
+        with METRICS.timer('greetings.refresh'), ThreadPoolExecutor(max_workers=8) as executor:
+            generated = list(executor.map(self._generate, jobs))
+
+        variants: Dict[str, List[str]] = {}
+        for seed, text in zip(jobs, generated):
+            if text and text not in variants.get(seed, []):
+                variants.setdefault(seed, []).append(text)
+
+        if variants:
+            with self._lock:
+                # Seeds whose generation failed keep their previous variants
+                self._variants = dict(self._variants, **variants)
+                self._rotation = {seed: self._rotation.get(seed, itertools.count()) for seed in self._variants}
+            self.last_refresh = time.time()
+        total = sum(len(v) for v in variants.values())
+        print(f"👋 Greeting pool refreshed: {total} variants for {len(variants)} greetings")
+        return total
+
+    def start(self):
+        """Fill the pool and keep it fresh on a daemon thread (idempotent)."""
+        with self._lock:
+            if not self.enabled or self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._refresh_loop, name='greeting-pool', daemon=True)
+        self._thread.start()
+
+    def _refresh_loop(self):
+        failures = 0
+        while True:
+            try:
+                refreshed = self.refresh()
+            except Exception as e:
+                print(f"Greeting pool refresh failed: {e}")
+                refreshed = 0
+            # A failed or empty refresh retries soon (doubling up to refresh_seconds), not hours later
+            failures = 0 if refreshed else failures + 1
+            time.sleep(min(self.retry_seconds * 2 ** (failures - 1), self.refresh_seconds) if failures
+                       else self.refresh_seconds)
+
+    def _seed_for(self, user_input: str) -> str:
+        cleaned = _clean(user_input)
+        # Longest seed the greeting starts with ('hiii' -> 'hi', 'good morning aara' -> 'good morning')
+        matches = [seed for seed in self._variants if cleaned.startswith(seed)]
+        return max(matches, key=len) if matches else next(iter(self._variants))
+
+    def take(self, user_input: str) -> Optional[str]:
+        """A ready greeting for user_input, or None while the pool is still empty."""
+        if not self.enabled:
+            return None
+        self.start()
+        with self._lock:
+            if not self._variants:
+                METRICS.increment('greetings.pool_empty')
+                return None
+            seed = self._seed_for(user_input)
+            variants = self._variants[seed]
+            text = variants[next(self._rotation[seed]) % len(variants)]
+        METRICS.increment('greetings.served_from_pool')
+        return text
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'greetings': len(self._variants),
+                'variants': sum(len(v) for v in self._variants.values()),
+                'last_refresh': self.last_refresh,
+            }
@@ -0,0 +1,194 @@
+import asyncio
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Dict, Any, Callable, List, Optional
+
+from src.agent.config import get_section
+from src.agent.metrics import METRICS
+
+# Short, idempotent calls that may be hedged (hedging.calls in settings.yaml)
+HEDGEABLE_CALLS = ('intent', 'verification')
+
+HEDGE_EXECUTOR = ThreadPoolExecutor(max_workers=32, thread_name_prefix='hedge')
+
+class Hedger:
+    """
+    Hedged requests for one call type: if the first request hasn't returned by the
+    recent p95 latency, a duplicate is sent and whichever succeeds first wins.
+    Duplicates are capped at `max_extra_load` of the requests seen in the last
+    `budget_window_seconds`, so a slow upstream can't be hit with twice the load.
+    """
+
+    def __init__(self, name: str, enabled: bool = False, percentile: float = 95, min_samples: int = 20,
+                 window: int = 200, max_extra_load: float = 0.05, budget_window_seconds: float = 60):
+        self.name = name
+        self.enabled = enabled
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.max_extra_load = max_extra_load
+        self.budget_window_seconds = budget_window_seconds
+        self._latencies = deque(maxlen=window)
+        self._requests = deque()
+        self._hedges = deque()
+        self._counts = {'requests': 0, 'hedged': 0, 'hedge_won': 0, 'budget_denied': 0}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, name: str) -> 'Hedger':
+        settings = get_section('hedging')
+        return cls(
+            name,
+            enabled=settings.get('enabled', False) and name in settings.get('calls', HEDGEABLE_CALLS),
+            percentile=settings.get('percentile', 95),
+            min_samples=settings.get('min_samples', 20),
+            window=settings.get('window', 200),
+            max_extra_load=settings.get('max_extra_load', 0.05),
+            budget_window_seconds=settings.get('budget_window_seconds', 60),
+        )
+
+    def delay(self) -> Optional[float]:
+        """Seconds to wait before hedging; None until enough latencies are known."""
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            ordered = sorted(self._latencies)
+        index = min(len(ordered) - 1, int(len(ordered) * self.percentile / 100))
+        return ordered[index]
+
+    def record_latency(self, seconds: float):
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def _expire(self, now: float):
+        for times in (self._requests, self._hedges):
+            while times and now - times[0] > self.budget_window_seconds:
+                times.popleft()
+
+    def _begin(self):
+        with self._lock:
+            self._requests.append(time.monotonic())
+            self._counts['requests'] += 1
+        METRICS.increment(f'hedging.{self.name}.requests')
+
+    def _take_hedge(self) -> bool:
+        """Whether the extra-load budget allows one more duplicate request."""
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            if len(self._hedges) >= self.max_extra_load * len(self._requests):
+                self._counts['budget_denied'] += 1
+                METRICS.increment(f'hedging.{self.name}.budget_denied')
+                return False
+            self._hedges.append(now)
+            self._counts['hedged'] += 1
+        METRICS.increment(f'hedging.{self.name}.hedged')
+        return True
+
+    def _won(self, attempt: int):
+        if attempt == 0:
+            return
+        with self._lock:
+            self._counts['hedge_won'] += 1
+        METRICS.increment(f'hedging.{self.name}.hedge_won')
+
+    def _timed(self, func: Callable, args, kwargs):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        self.record_latency(time.perf_counter() - start)
+        return result
+
+    async def _atimed(self, func: Callable, args, kwargs):
+        start = time.perf_counter()
+        result = await func(*args, **kwargs)
+        self.record_latency(time.perf_counter() - start)
+        return result
+
+    def _submit(self, func: Callable, args, kwargs) -> Future:
+        # Each attempt runs in a copy of the caller's context (e.g. its LLM queue priority)
+        return HEDGE_EXECUTOR.submit(contextvars.copy_context().run, self._timed, func, args, kwargs)
+
+    def call(self, func: Callable, *args, abandoned: Optional[threading.Event] = None, **kwargs):
+        """
+        Run func(*args, **kwargs), hedging it once if it is slower than usual. No duplicate
+        is sent once `abandoned` is set (the caller stopped waiting for the result).
+        """
+        if not self.enabled:
+            return func(*args, **kwargs)
+        self._begin()
+        delay = self.delay()
+        attempts: List[Future] = [self._submit(func, args, kwargs)]
+        if delay is not None:
+            done, _ = wait(attempts, timeout=delay)
+            if not done and not (abandoned and abandoned.is_set()) and self._take_hedge():
+                attempts.append(self._submit(func, args, kwargs))
+
+        pending = set(attempts)
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    # The loser can't be interrupted mid-request in a thread; it is dropped
+                    for loser in pending:
+                        loser.cancel()
+                    self._won(attempts.index(future))
+                    return future.result()
+                error = error or future.exception()
+        raise error
+
+    async def acall(self, func: Callable, *args, **kwargs):
+        """Async call(): the losing request is cancelled, closing its connection."""
+        if not self.enabled:
+            return await func(*args, **kwargs)
+        self._begin()
+        delay = self.delay()
+        attempts = [asyncio.ensure_future(self._atimed(func, args, kwargs))]
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait(attempts, timeout=delay)
+                if not done and self._take_hedge():
+                    attempts.append(asyncio.ensure_future(self._atimed(func, args, kwargs)))
+
+            pending = set(attempts)
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        self._won(attempts.index(task))
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            # Losers, and everything when the caller itself is cancelled (preemption)
+            for task in attempts:
+                if not task.done():
+                    task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        delay = self.delay()
+        with self._lock:
+            counts = dict(self._counts)
+        return {
+            **counts,
+            'enabled': self.enabled,
+            'hedge_after_ms': round(delay * 1000, 1) if delay is not None else None,
+            'hedge_rate': round(counts['hedged'] / counts['requests'], 4) if counts['requests'] else 0.0,
+            'win_rate': round(counts['hedge_won'] / counts['hedged'], 4) if counts['hedged'] else 0.0,
+        }
+
+_hedgers: Dict[str, Hedger] = {}
+_hedgers_lock = threading.Lock()
+
+def get_hedger(name: str) -> Hedger:
+    """Shared hedging policy for a call type ('intent', 'verification'), configured under hedging."""
+    with _hedgers_lock:
+        hedger = _hedgers.get(name)
+        if hedger is None:
+            hedger = Hedger.from_settings(name)
+            _hedgers[name] = hedger
+            METRICS.register_gauge(f'hedging.{name}', hedger.stats)
+        return hedger
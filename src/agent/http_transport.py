@@ -0,0 +1,115 @@
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.agent.config import get_section
+from src.agent.metrics import METRICS
+
+# Upstream hosts whose TLS connections are opened at startup
+DEFAULT_WARM_UP_URLS = [
+    'https://api.openai.com/v1/models',
+    'https://api.tavily.com',
+    'https://www.googleapis.com/oauth2/v1/certs',
+]
+
+def _http2_enabled(wanted: bool) -> bool:
+    if not wanted:
+        return False
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        print("⚠️ http.http2 is on but the h2 package is not installed; using HTTP/1.1")
+        return False
+
+class HTTPTransport:
+    """
+    Pooled keep-alive connections shared by every upstream API: one httpx client pair for
+    the OpenAI clients, and one urllib3 pool for requests-based clients (Tavily, Google
+    certs). Each requests consumer gets its own Session (headers, auth) on the shared pool.
+    """
+
+    def __init__(self, max_connections: int = 100, max_keepalive_connections: int = 20,
+                 keepalive_expiry: float = 60, per_host_connections: int = 20,
+                 connect_timeout: float = 5, http2: bool = False, warm_up_urls: List[str] = None):
+        self.http2 = _http2_enabled(http2)
+        self.warm_up_urls = DEFAULT_WARM_UP_URLS if warm_up_urls is None else warm_up_urls
+        limits = httpx.Limits(max_connections=max_connections,
+                              max_keepalive_connections=max_keepalive_connections,
+                              keepalive_expiry=keepalive_expiry)
+        # Per-call read timeouts come from the callers (e.g. llm.roles timeouts)
+        timeout = httpx.Timeout(60, connect=connect_timeout)
+        self.client = httpx.Client(limits=limits, timeout=timeout, http2=self.http2)
+        self.async_client = httpx.AsyncClient(limits=limits, timeout=timeout, http2=self.http2)
+        self.adapter = HTTPAdapter(pool_connections=max_connections, pool_maxsize=per_host_connections)
+        self.last_warm_up: Dict[str, Any] = {}
+
+    @classmethod
+    def from_settings(cls) -> 'HTTPTransport':
+        settings = get_section('http')
+        return cls(
+            max_connections=settings.get('max_connections', 100),
+            max_keepalive_connections=settings.get('max_keepalive_connections', 20),
+            keepalive_expiry=settings.get('keepalive_expiry', 60),
+            per_host_connections=settings.get('per_host_connections', 20),
+            connect_timeout=settings.get('connect_timeout', 5),
+            http2=settings.get('http2', False),
+            warm_up_urls=settings.get('warm_up_urls'),
+        )
+
+    def session(self) -> requests.Session:
+        """A requests Session of its own whose connections come from the shared pool."""
+        session = requests.Session()
+        session.mount('https://', self.adapter)
+        session.mount('http://', self.adapter)
+        return session
+
+    def warm_up(self) -> Dict[str, Any]:
+        """Open a TLS connection to every upstream host so the first real call reuses it."""
+        session = self.session()
+        results = {}
+        for url in self.warm_up_urls:
+            start = time.perf_counter()
+            try:
+                # Any status will do: the point is the handshake, kept alive in the pool
+                if 'openai.com' in url:
+                    self.client.head(url)
+                else:
+                    session.head(url, timeout=5)
+                results[url] = round((time.perf_counter() - start) * 1000, 1)
+            except Exception as e:
+                results[url] = f'failed: {e.__class__.__name__}'
+                METRICS.increment('http.warm_up_failed')
+        self.last_warm_up = results
+        print(f"🔌 Upstream connections warmed (ms): {results}")
+        return results
+
+    async def warm_up_async(self):
+        """Warm the async client's pool too (it serves the event loop's OpenAI calls)."""
+        for url in self.warm_up_urls:
+            if 'openai.com' in url:
+                try:
+                    await self.async_client.head(url)
+                except Exception:
+                    METRICS.increment('http.warm_up_failed')
+
+    def warm_up_in_background(self):
+        threading.Thread(target=self.warm_up, name='http-warm-up', daemon=True).start()
+
+    def stats(self) -> Dict[str, Any]:
+        return {'http2': self.http2, 'warm_up_ms': self.last_warm_up}
+
+_transport: Optional[HTTPTransport] = None
+_transport_lock = threading.Lock()
+
+def get_transport() -> HTTPTransport:
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = HTTPTransport.from_settings()
+            METRICS.register_gauge('http', _transport.stats)
+        return _transport
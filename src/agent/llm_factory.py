@@ -0,0 +1,158 @@
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+import openai
+from langchain_openai import ChatOpenAI
+
+from src.agent.concurrency_limit import get_limiter
+from src.agent.config import get_section
+from src.agent.llm_standin import (BACKENDS, DEFAULT_STANDIN_URL, OPENAI_BACKEND, STANDIN_BACKEND,
+                                   STANDIN_HTTP_BACKEND, StandInChatModel)
+from src.agent.rate_limit import estimate_message_tokens, get_quota
+
+# Node roles with their own model tier (llm.roles in settings.yaml)
+ROLES = ('router', 'generator', 'verifier', 'summarizer')
+
+TIER_KEYS = ('model', 'timeout', 'max_tokens', 'temperature')
+
+# Output tokens assumed for quota shaping when a call sets no max_tokens
+DEFAULT_OUTPUT_TOKENS = 256
+
+def _total_tokens(result) -> Optional[int]:
+    """Tokens the provider reports for a ChatResult, if any."""
+    usage = (result.llm_output or {}).get('token_usage') or {}
+    if usage.get('total_tokens'):
+        return usage['total_tokens']
+    for generation in result.generations:
+        metadata = getattr(generation.message, 'usage_metadata', None)
+        if metadata:
+            return metadata.get('total_tokens')
+    return None
+
+class LimitedClientMixin:
+    """
+    Chat model requests shaped to the OpenAI quota (rate_limits) that then go through the
+    model's adaptive concurrency limiter (llm_concurrency).
+    """
+
+    def _estimate(self, messages, kwargs) -> int:
+        # Providers count the requested output budget against the token quota
+        output = kwargs.get('max_tokens') or self.max_tokens or DEFAULT_OUTPUT_TOKENS
+        return estimate_message_tokens(messages, self.model_name) + output
+
+    def _generate(self, messages, *args, **kwargs):
+        quota, limiter = get_quota('openai'), get_limiter(self.model_name)
+        estimate = self._estimate(messages, kwargs)
+        quota.acquire(estimate)
+        # A call that never went out (LimiterTimeout) or failed gives its reserved tokens back
+        actual = 0
+        try:
+            limiter.acquire()
+            start = time.perf_counter()
+            try:
+                result = super()._generate(messages, *args, **kwargs)
+            except openai.RateLimitError:
+                limiter.release(rate_limited=True)
+                raise
+            except BaseException:
+                limiter.release()
+                raise
+            limiter.release(time.perf_counter() - start)
+            actual = _total_tokens(result)
+            return result
+        finally:
+            quota.settle(estimate, actual)
+
+    async def _agenerate(self, messages, *args, **kwargs):
+        quota, limiter = get_quota('openai'), get_limiter(self.model_name)
+        estimate = self._estimate(messages, kwargs)
+        await quota.aacquire(estimate)
+        actual = 0
+        try:
+            await limiter.aacquire()
+            start = time.perf_counter()
+            try:
+                result = await super()._agenerate(messages, *args, **kwargs)
+            except openai.RateLimitError:
+                limiter.release(rate_limited=True)
+                raise
+            except BaseException:
+                limiter.release()
+                raise
+            limiter.release(time.perf_counter() - start)
+            actual = _total_tokens(result)
+            return result
+        finally:
+            await quota.asettle(estimate, actual)
+
+class LimitedChatOpenAI(LimitedClientMixin, ChatOpenAI):
+    """ChatOpenAI behind the quota and concurrency limits."""
+
+class LimitedStandInChatModel(LimitedClientMixin, StandInChatModel):
+    """The in-process stand-in behind the same limits, so load tests include their overhead."""
+
+class LLMFactory:
+    """
+    Builds chat clients per node role from llm.roles. Roles whose tier settings are
+    identical share one client (and its connection pool). llm.backend picks OpenAI, the
+    in-process stand-in, or the real client pointed at the stand-in server.
+    """
+
+    def __init__(self, llm_settings: Dict[str, Any], api_key: Optional[str] = None, callbacks: List = None,
+                 transport=None, limited: bool = False):
+        self.default_model = llm_settings.get('model_name', 'gpt-4o')
+        self.backend = llm_settings.get('backend', OPENAI_BACKEND)
+        if self.backend not in BACKENDS:
+            raise ValueError(f"Unknown LLM backend '{self.backend}', expected one of {BACKENDS}")
+        self.roles = llm_settings.get('roles') or {}
+        self.api_key = api_key
+        self.callbacks = callbacks or []
+        # Shared pooled HTTP clients (src.agent.http_transport); None lets each client own its pool
+        self.transport = transport
+        # OpenAI quota shaping (rate_limits) and per-model AIMD concurrency limits (llm_concurrency)
+        if self.backend == STANDIN_BACKEND:
+            self.client_class = LimitedStandInChatModel if limited else StandInChatModel
+        else:
+            self.client_class = LimitedChatOpenAI if limited else ChatOpenAI
+        self._clients: Dict[Tuple, ChatOpenAI] = {}
+        self._lock = threading.Lock()
+
+    def tier(self, role: str) -> Dict[str, Any]:
+        """Settings for a role; unset fields fall back to llm.model_name and the client defaults."""
+        if role not in ROLES:
+            raise ValueError(f"Unknown LLM role '{role}', expected one of {ROLES}")
+        config = self.roles.get(role) or {}
+        return {
+            'model': config.get('model', self.default_model),
+            'timeout': config.get('timeout'),
+            'max_tokens': config.get('max_tokens'),
+            'temperature': config.get('temperature'),
+        }
+
+    def _build(self, tier: Dict[str, Any]):
+        if self.backend == STANDIN_BACKEND:
+            return self.client_class(model_name=tier['model'], max_tokens=tier['max_tokens'], callbacks=self.callbacks)
+        kwargs = {name: value for name, value in tier.items() if value is not None}
+        api_key = self.api_key
+        if self.backend == STANDIN_HTTP_BACKEND:
+            kwargs['base_url'] = get_section('standin').get('url', DEFAULT_STANDIN_URL)
+            api_key = api_key or 'standin'
+        if self.transport is not None:
+            kwargs['http_client'] = self.transport.client
+            kwargs['http_async_client'] = self.transport.async_client
+        return self.client_class(api_key=api_key, callbacks=self.callbacks, **kwargs)
+
+    def get(self, role: str) -> ChatOpenAI:
+        tier = self.tier(role)
+        key = tuple(tier[name] for name in TIER_KEYS)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = self._build(tier)
+                self._clients[key] = client
+            return client
+
+    def describe(self) -> Dict[str, str]:
+        """Model per role, for logs and /metrics."""
+        return {role: self.tier(role)['model'] for role in ROLES}
@@ -0,0 +1,257 @@
+import asyncio
+import json
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List, Optional, Tuple
+
+import httpx
+import openai
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from src.agent.config import get_section
+from src.agent.metrics import METRICS
+
+# LLM backends (llm.backend, or the LLM_BACKEND environment variable)
+OPENAI_BACKEND = 'openai'
+STANDIN_BACKEND = 'standin'  # in-process chat model, no network
+STANDIN_HTTP_BACKEND = 'standin_http'  # real OpenAI client against serve_standin()
+BACKENDS = (OPENAI_BACKEND, STANDIN_BACKEND, STANDIN_HTTP_BACKEND)
+
+DEFAULT_STANDIN_URL = 'http://127.0.0.1:8790/v1'
+
+# Keyword intent classification, in the order the reasoning node checks its routes
+INTENT_KEYWORDS = [
+    ('4', ['suggest product', 'recommend product', 'product', 'buy', 'shopping']),
+    ('1', ['skin', 'acne', 'routine', 'moisturizer', 'sunscreen', 'pimple']),
+    ('2', ['period', 'menstrual', 'pcos', 'health', 'cramp', 'pregnan', 'symptom']),
+    ('3', ['search', 'latest', 'recent', 'research']),
+]
+
+USER_MESSAGE_PATTERNS = [
+    r"USER'S ORIGINAL QUESTION\*\*: \"(.*?)\"\s*\n",
+    r"User's message: (.*)",
+    r"User input: (.*)",
+    r'The user said: "(.*?)"',
+]
+
+GENERATED_RESPONSE_PATTERN = r'\*\*GENERATED RESPONSE\*\*: "(.*)"\s*\*\*YOUR VERIFICATION\*\*'
+DISCLAIMER = "_Consult a doctor for medical advice._"
+
+GENERAL_REPLIES = [
+    "That's a really good question about {topic}. Small, consistent habits usually help most - "
+    "regular sleep, water, balanced meals and gentle movement. Keep an eye on how things change over a few weeks.",
+    "Thanks for sharing that about {topic}. It's common and there are simple things that can help: "
+    "track what you notice, keep a steady routine and be kind to yourself while you figure out what works.",
+    "I hear you on {topic}. A good first step is noting when it happens and what makes it better or worse, "
+    "so you have a clear picture to work from.",
+]
+
+def user_message(prompt: str) -> str:
+    """The user's message inside one of the graph's prompts (the whole prompt if none is found)."""
+    for pattern in USER_MESSAGE_PATTERNS:
+        match = re.search(pattern, prompt)
+        if match and match.group(1).strip():
+            return match.group(1).strip()
+    return prompt.strip().splitlines()[-1] if prompt.strip() else ''
+
+def classify_intent(message: str) -> str:
+    lowered = message.lower()
+    for intent, keywords in INTENT_KEYWORDS:
+        if any(keyword in lowered for keyword in keywords):
+            return intent
+    return '5'
+
+def verification_reply(prompt: str) -> str:
+    """
+    Verdict like the real verifier's: skincare and health answers without a disclaimer
+    come back with one added, everything else is approved.
+    """
+    match = re.search(GENERATED_RESPONSE_PATTERN, prompt, re.DOTALL)
+    response = match.group(1).strip() if match else ''
+    if (response and classify_intent(user_message(prompt)) in ('1', '2')
+            and 'consult a doctor' not in response.lower()):
+        return f"VERIFICATION: NEEDS_IMPROVEMENT\nIMPROVED_RESPONSE: {response}\n\n{DISCLAIMER}"
+    return 'VERIFICATION: APPROVED'
+
+def standin_reply(prompt: str, json_mode: bool = False) -> str:
+    """Deterministic reply for any of the graph's prompts: same prompt, same answer."""
+    message = user_message(prompt)
+    topic = ' '.join(message.split()[:8]) or 'that'
+    general = GENERAL_REPLIES[sum(map(ord, message)) % len(GENERAL_REPLIES)].format(topic=topic)
+    if '**YOUR VERIFICATION**' in prompt:
+        return verification_reply(prompt)
+    if json_mode or 'Routing, Answer and Self-Check in One Step' in prompt:
+        return json.dumps({'intent': classify_intent(message), 'answer': general, 'self_check': 'pass'})
+    if 'Respond with just the category number' in prompt:
+        return classify_intent(message)
+    if 'CRISIS SITUATION' in prompt:
+        return ("I'm really glad you told me, and I'm so sorry you're carrying this. You matter. "
+                "Please reach out right now: call or text 988 (Suicide & Crisis Lifeline), or text HOME to 741741. "
+                "Is there someone you trust who can be with you?")
+    if 'personalized greeting' in prompt:
+        return "Hey there! So lovely to hear from you. How are you feeling today - anything on your mind?"
+    return general
+
+class StandInProvider:
+    """
+    Simulated provider time and failures: lognormal latencies with the given median and
+    p99, a share of 5xx errors and of 429s. Seeded, so a run is reproducible.
+    """
+
+    def __init__(self, median_ms: float = 0, p99_ms: float = 0, error_rate: float = 0.0,
+                 rate_limit_rate: float = 0.0, seed: int = 7):
+        self.median = median_ms / 1000
+        # p99 of a lognormal is median * exp(2.326 sigma)
+        self.sigma = math.log(p99_ms / median_ms) / 2.326 if median_ms and p99_ms > median_ms else 0.0
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> 'StandInProvider':
+        settings = get_section('standin')
+        latency = settings.get('latency_ms') or {}
+        return cls(median_ms=latency.get('median', 0), p99_ms=latency.get('p99', 0),
+                   error_rate=settings.get('error_rate', 0.0), rate_limit_rate=settings.get('rate_limit_rate', 0.0),
+                   seed=settings.get('seed', 7))
+
+    def next_call(self) -> Tuple[float, Optional[str]]:
+        """(seconds the provider takes, None | 'server_error' | 'rate_limit') for the next call."""
+        with self._lock:
+            delay = self.median * math.exp(self.sigma * self._random.gauss(0, 1)) if self.median else 0.0
+            roll = self._random.random()
+        error = ('rate_limit' if roll < self.rate_limit_rate
+                 else 'server_error' if roll < self.rate_limit_rate + self.error_rate else None)
+        METRICS.increment('standin.calls')
+        METRICS.observe('standin.provider', delay)
+        METRICS.increment('standin.provider_seconds', delay)
+        if error:
+            METRICS.increment(f'standin.{error}')
+        return delay, error
+
+_provider: Optional[StandInProvider] = None
+_provider_lock = threading.Lock()
+
+def get_provider() -> StandInProvider:
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            _provider = StandInProvider.from_settings()
+        return _provider
+
+def _complete(prompt: str, json_mode: bool, max_tokens: Optional[int], model: str) -> Dict[str, Any]:
+    """Reply text, finish reason and token usage, cut to max_tokens (~4 characters per token)."""
+    text = standin_reply(prompt, json_mode)
+    finish_reason = 'stop'
+    if max_tokens and len(text) > max_tokens * 4 and not json_mode:
+        text, finish_reason = text[:max_tokens * 4], 'length'
+    usage = {'prompt_tokens': len(prompt) // 4 + 1, 'completion_tokens': len(text) // 4 + 1}
+    usage['total_tokens'] = usage['prompt_tokens'] + usage['completion_tokens']
+    return {'text': text, 'finish_reason': finish_reason, 'usage': usage, 'model': model}
+
+def _openai_error(kind: str) -> openai.APIStatusError:
+    """The error the OpenAI client raises for the same failure, so breakers and limiters react alike."""
+    status, error_class = (429, openai.RateLimitError) if kind == 'rate_limit' else (500, openai.InternalServerError)
+    request = httpx.Request('POST', f'{DEFAULT_STANDIN_URL}/chat/completions')
+    return error_class(f'Stand-in {kind}', response=httpx.Response(status, request=request), body=None)
+
+class StandInChatModel(BaseChatModel):
+    """In-process chat model answering from standin_reply() after the simulated provider time."""
+
+    model_name: str = 'standin'
+    max_tokens: Optional[int] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return 'standin'
+
+    def _result(self, messages: List[BaseMessage], kwargs: Dict[str, Any]) -> ChatResult:
+        prompt = '\n'.join(str(message.content) for message in messages)
+        json_mode = (kwargs.get('response_format') or {}).get('type') == 'json_object'
+        completion = _complete(prompt, json_mode, kwargs.get('max_tokens') or self.max_tokens, self.model_name)
+        usage = completion['usage']
+        message = AIMessage(
+            content=completion['text'],
+            response_metadata={'finish_reason': completion['finish_reason'], 'model_name': self.model_name},
+            usage_metadata={'input_tokens': usage['prompt_tokens'], 'output_tokens': usage['completion_tokens'],
+                            'total_tokens': usage['total_tokens']},
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)], llm_output={'token_usage': usage})
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        delay, error = get_provider().next_call()
+        time.sleep(delay)
+        if error:
+            raise _openai_error(error)
+        return self._result(messages, kwargs)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        delay, error = get_provider().next_call()
+        await asyncio.sleep(delay)
+        if error:
+            raise _openai_error(error)
+        return self._result(messages, kwargs)
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    """The slice of the OpenAI API the graph uses: POST /v1/chat/completions, GET /v1/models."""
+
+    def _send(self, status: int, body: Dict[str, Any]):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self._send(200, {'object': 'list', 'data': [{'id': 'standin', 'object': 'model'}]})
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.end_headers()
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        if not self.path.endswith('/chat/completions'):
+            self._send(404, {'error': {'message': f'Unknown path {self.path}'}})
+            return
+        delay, error = get_provider().next_call()
+        time.sleep(delay)
+        if error:
+            status = 429 if error == 'rate_limit' else 500
+            self._send(status, {'error': {'message': f'Stand-in {error}', 'type': error}})
+            return
+        prompt = '\n'.join(str(message.get('content', '')) for message in body.get('messages', []))
+        json_mode = (body.get('response_format') or {}).get('type') == 'json_object'
+        max_tokens = body.get('max_tokens') or body.get('max_completion_tokens')
+        completion = _complete(prompt, json_mode, max_tokens, body.get('model', 'standin'))
+        self._send(200, {
+            'id': f'standin-{int(time.time() * 1000)}',
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': completion['model'],
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': completion['text']},
+                         'finish_reason': completion['finish_reason']}],
+            'usage': completion['usage'],
+        })
+
+    def log_message(self, format, *args):
+        pass
+
+def serve_standin(host: str = '127.0.0.1', port: int = 8790, background: bool = True) -> ThreadingHTTPServer:
+    """Start the OpenAI-compatible stand-in server (in a daemon thread unless background is False)."""
+    server = ThreadingHTTPServer((host, port), _StandInHandler)
+    server.daemon_threads = True
+    print(f"🧪 LLM stand-in serving on http://{host}:{server.server_address[1]}/v1")
+    if background:
+        threading.Thread(target=server.serve_forever, name='llm-standin', daemon=True).start()
+    else:
+        server.serve_forever()
+    return server
@@ -0,0 +1,43 @@
+from typing import Dict, Any
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from src.agent.metrics import METRICS
+
+def _token_usage(response: LLMResult) -> Dict[str, int]:
+    """Input/output token counts from a chat model result (usage metadata or the OpenAI llm_output)."""
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, 'message', None), 'usage_metadata', None)
+            if usage:
+                return {'input': usage.get('input_tokens', 0), 'output': usage.get('output_tokens', 0)}
+    usage = (response.llm_output or {}).get('token_usage') or {}
+    return {'input': usage.get('prompt_tokens', 0), 'output': usage.get('completion_tokens', 0)}
+
+class LLMUsageTracker(BaseCallbackHandler):
+    """Counts model calls and tokens under llm.<label>.*, e.g. per graph mode."""
+
+    def __init__(self, label: str):
+        self.label = label
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        usage = _token_usage(response)
+        METRICS.increment(f'llm.{self.label}.calls')
+        METRICS.increment(f'llm.{self.label}.input_tokens', usage['input'])
+        METRICS.increment(f'llm.{self.label}.output_tokens', usage['output'])
+
+    def on_llm_error(self, error: BaseException, **kwargs: Any) -> None:
+        METRICS.increment(f'llm.{self.label}.errors')
+
+def usage_per_turn(label: str, turns: float) -> Dict[str, Any]:
+    """Average calls and tokens per turn for one label, for comparing graph modes."""
+    counters = METRICS.counters(f'llm.{label}.')
+    if not turns:
+        return {'turns': 0}
+    return {
+        'turns': turns,
+        'calls_per_turn': round(counters.get(f'llm.{label}.calls', 0) / turns, 3),
+        'input_tokens_per_turn': round(counters.get(f'llm.{label}.input_tokens', 0) / turns, 1),
+        'output_tokens_per_turn': round(counters.get(f'llm.{label}.output_tokens', 0) / turns, 1),
+    }
@@ -0,0 +1,91 @@
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Dict, Any, Callable, Deque
+
+class MetricsRegistry:
+    """In-process counters, gauges and latency samples, exposed by the /metrics endpoint."""
+
+    def __init__(self, max_samples: int = 1000):
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = defaultdict(float)
+        self._timings: Dict[str, Deque[float]] = {}
+        self._gauges: Dict[str, Callable[[], Any]] = {}
+
+    def increment(self, name: str, value: float = 1):
+        with self._lock:
+            self._counters[name] += value
+
+    def observe(self, name: str, seconds: float):
+        """Record one latency sample (kept in a bounded window per metric)."""
+        with self._lock:
+            samples = self._timings.get(name)
+            if samples is None:
+                samples = self._timings[name] = deque(maxlen=self.max_samples)
+            samples.append(seconds)
+
+    @contextmanager
+    def timer(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def register_gauge(self, name: str, func: Callable[[], Any]):
+        """Register a callable evaluated on every snapshot (e.g. cache stats)."""
+        with self._lock:
+            self._gauges[name] = func
+
+    def counter(self, name: str) -> float:
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def counters(self, prefix: str = '') -> Dict[str, float]:
+        """Counter values without evaluating gauges (safe to call from a gauge)."""
+        with self._lock:
+            return {name: value for name, value in self._counters.items() if name.startswith(prefix)}
+
+    def percentile(self, name: str, pct: float) -> float:
+        with self._lock:
+            samples = sorted(self._timings.get(name, ()))
+        if not samples:
+            return 0.0
+        index = min(len(samples) - 1, int(round(pct / 100 * (len(samples) - 1))))
+        return samples[index]
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            timings = {name: sorted(samples) for name, samples in self._timings.items()}
+            gauges = dict(self._gauges)
+
+        latency = {}
+        for name, samples in timings.items():
+            if not samples:
+                continue
+            pick = lambda pct: samples[min(len(samples) - 1, int(round(pct / 100 * (len(samples) - 1))))]
+            latency[name] = {
+                'count': len(samples),
+                'p50_ms': round(pick(50) * 1000, 2),
+                'p95_ms': round(pick(95) * 1000, 2),
+                'p99_ms': round(pick(99) * 1000, 2),
+            }
+
+        gauge_values = {}
+        for name, func in gauges.items():
+            try:
+                gauge_values[name] = func()
+            except Exception as e:
+                gauge_values[name] = {'error': str(e)}
+
+        return {'counters': counters, 'latency': latency, 'gauges': gauge_values}
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._timings.clear()
+
+METRICS = MetricsRegistry()
@@ -0,0 +1,201 @@
+import asyncio
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+from src.agent.config import get_section, resolve_path
+from src.agent.metrics import METRICS
+
+# Rough size of a chat message's role/formatting overhead, in tokens
+MESSAGE_OVERHEAD_TOKENS = 4
+
+class RateLimitExceeded(RuntimeError):
+    """A call would have to wait longer than max_wait_seconds for its upstream quota."""
+
+class MemoryBucketStore:
+    """Token buckets for this process."""
+
+    blocking = False
+
+    def __init__(self):
+        self._buckets: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, name: str, amount: float, capacity: float, per_second: float) -> float:
+        """
+        Take `amount` from the bucket (a negative amount gives it back) and return the
+        seconds until the bucket is out of debt, i.e. how long the caller should wait.
+        """
+        now = time.time()
+        with self._lock:
+            level, updated = self._buckets.get(name, (capacity, now))
+            level = min(capacity, level + (now - updated) * per_second) - amount
+            self._buckets[name] = [min(capacity, level), now]
+        return max(0.0, -level / per_second)
+
+class SQLiteBucketStore:
+    """Token buckets in a local SQLite file, shared by every worker process on the host."""
+
+    # Reservations wait on the file lock; async callers run them in a thread
+    blocking = True
+
+    def __init__(self, path: str):
+        self.path = resolve_path(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS buckets (name TEXT PRIMARY KEY, level REAL NOT NULL, updated REAL NOT NULL)')
+
+    def reserve(self, name: str, amount: float, capacity: float, per_second: float) -> float:
+        with self._lock:
+            # IMMEDIATE takes the write lock up front, so workers can't interleave read and write
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                now = time.time()
+                row = self._conn.execute('SELECT level, updated FROM buckets WHERE name = ?', (name,)).fetchone()
+                level, updated = row if row else (capacity, now)
+                level = min(capacity, level + (now - updated) * per_second) - amount
+                self._conn.execute('INSERT OR REPLACE INTO buckets (name, level, updated) VALUES (?, ?, ?)',
+                                   (name, min(capacity, level), now))
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+        return max(0.0, -level / per_second)
+
+class QuotaLimiter:
+    """
+    Requests-per-minute and tokens-per-minute buckets for one upstream key. Each call
+    reserves its estimated tokens up front and sleeps off any debt, so traffic is shaped
+    to the quota before the provider answers with a 429. Actual usage settles the estimate.
+    """
+
+    def __init__(self, name: str, store, requests_per_minute: Optional[float] = None,
+                 tokens_per_minute: Optional[float] = None, max_wait_seconds: float = 20, enabled: bool = True):
+        self.name = name
+        self.store = store
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_wait_seconds = max_wait_seconds
+        self.enabled = enabled and bool(requests_per_minute or tokens_per_minute)
+
+    def _take(self, suffix: str, amount: float, per_minute: Optional[float]) -> float:
+        if not per_minute or not amount:
+            return 0.0
+        # A single call larger than the whole bucket could never fit; charge it a full minute
+        amount = min(amount, per_minute)
+        return self.store.reserve(f'{self.name}.{suffix}', amount, per_minute, per_minute / 60)
+
+    def reserve(self, tokens: int = 0) -> float:
+        """Reserve one request and `tokens`; returns the seconds to wait before sending it."""
+        wait = max(self._take('requests', 1, self.requests_per_minute),
+                   self._take('tokens', tokens, self.tokens_per_minute))
+        METRICS.increment(f'rate_limit.{self.name}.requests')
+        METRICS.increment(f'rate_limit.{self.name}.estimated_tokens', tokens)
+        if wait > self.max_wait_seconds:
+            self._take('requests', -1, self.requests_per_minute)
+            self._take('tokens', -tokens, self.tokens_per_minute)
+            METRICS.increment(f'rate_limit.{self.name}.rejected')
+            raise RateLimitExceeded(f"'{self.name}' quota needs a {wait:.1f}s wait (max {self.max_wait_seconds}s)")
+        if wait:
+            METRICS.increment(f'rate_limit.{self.name}.delayed')
+            METRICS.observe(f'rate_limit.{self.name}.wait', wait)
+        return wait
+
+    def acquire(self, tokens: int = 0):
+        if self.enabled:
+            wait = self.reserve(tokens)
+            if wait:
+                time.sleep(wait)
+
+    async def aacquire(self, tokens: int = 0):
+        if self.enabled:
+            wait = await asyncio.to_thread(self.reserve, tokens) if self.store.blocking else self.reserve(tokens)
+            if wait:
+                await asyncio.sleep(wait)
+
+    def settle(self, estimated: int, actual: Optional[int]):
+        """Correct the token bucket once the provider reports what the call really used."""
+        if not self.enabled or actual is None:
+            return
+        METRICS.increment(f'rate_limit.{self.name}.actual_tokens', actual)
+        self._take('tokens', actual - estimated, self.tokens_per_minute)
+
+    async def asettle(self, estimated: int, actual: Optional[int]):
+        if self.store.blocking and self.enabled and actual is not None:
+            await asyncio.to_thread(self.settle, estimated, actual)
+        else:
+            self.settle(estimated, actual)
+
+    def stats(self) -> Dict[str, Any]:
+        counters = METRICS.counters(f'rate_limit.{self.name}.')
+        estimated = counters.get(f'rate_limit.{self.name}.estimated_tokens', 0)
+        actual = counters.get(f'rate_limit.{self.name}.actual_tokens', 0)
+        return {
+            'enabled': self.enabled,
+            'requests_per_minute': self.requests_per_minute,
+            'tokens_per_minute': self.tokens_per_minute,
+            'estimate_ratio': round(actual / estimated, 3) if estimated and actual else None,
+        }
+
+_encoders: Dict[str, Any] = {}
+_encoders_lock = threading.Lock()
+
+def _encoder(model: str):
+    """tiktoken encoding for a model; None (character estimate) if tiktoken or its data is unavailable."""
+    with _encoders_lock:
+        if model not in _encoders:
+            try:
+                import tiktoken
+                try:
+                    _encoders[model] = tiktoken.encoding_for_model(model)
+                except KeyError:
+                    _encoders[model] = tiktoken.get_encoding('o200k_base')
+            except Exception as e:
+                print(f"⚠️ tiktoken unavailable for {model} ({e.__class__.__name__}); estimating tokens from characters")
+                _encoders[model] = None
+        return _encoders[model]
+
+def estimate_tokens(text: str, model: str = 'gpt-4o') -> int:
+    """Prompt tokens for text, counted with tiktoken when possible (else ~4 characters per token)."""
+    if get_section('rate_limits').get('token_estimator', 'tiktoken') == 'tiktoken':
+        encoder = _encoder(model)
+        if encoder is not None:
+            return len(encoder.encode(text))
+    return len(text) // 4 + 1
+
+def estimate_message_tokens(messages, model: str = 'gpt-4o') -> int:
+    """Prompt tokens for a list of chat messages."""
+    return sum(estimate_tokens(message.content if isinstance(message.content, str) else str(message.content), model)
+               + MESSAGE_OVERHEAD_TOKENS for message in messages)
+
+_store = None
+_quotas: Dict[str, QuotaLimiter] = {}
+_quotas_lock = threading.Lock()
+
+def _bucket_store():
+    global _store
+    if _store is None:
+        settings = get_section('rate_limits')
+        if settings.get('store', 'memory') == 'sqlite':
+            _store = SQLiteBucketStore(settings.get('path', 'data/rate_limits.db'))
+        else:
+            _store = MemoryBucketStore()
+    return _store
+
+def get_quota(upstream: str) -> QuotaLimiter:
+    """Shared quota for an upstream key ('openai', 'tavily'), configured under rate_limits.upstreams."""
+    with _quotas_lock:
+        quota = _quotas.get(upstream)
+        if quota is None:
+            settings = get_section('rate_limits')
+            config = (settings.get('upstreams') or {}).get(upstream) or {}
+            quota = QuotaLimiter(upstream, _bucket_store(),
+                                 requests_per_minute=config.get('requests_per_minute'),
+                                 tokens_per_minute=config.get('tokens_per_minute'),
+                                 max_wait_seconds=config.get('max_wait_seconds', settings.get('max_wait_seconds', 20)),
+                                 enabled=settings.get('enabled', True))
+            _quotas[upstream] = quota
+            METRICS.register_gauge(f'rate_limit.{upstream}', quota.stats)
+        return quota
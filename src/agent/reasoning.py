@@ -1,19 +1,35 @@
-from typing import Dict, Any
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Dict, Any, Optional
 
-def reasoning_node(llm):
-    """Node that analyzes user input and determines the next step."""
-    def node(state: Dict[str, Any]) -> Dict[str, Any]:
-        user_input = state['user_input']
-        chat_history = state.get('chat_history', [])
-        
-        print(f"\n📋 CHAT HISTORY IN REASONING: {len(chat_history)} messages")
-        if chat_history:
-            for i, msg in enumerate(chat_history[-3:]):  # Show last 3 messages
-                print(f"  {i+1}. User: {msg.get('user', '')[:50]}...")
-                print(f"     Aara: {msg.get('Aara', '')[:50]}...")
-        
-        # Use LLM to determine intent and next step
-        prompt = f"""
+from src.agent.circuit_breaker import llm_available
+from src.agent.hedging import get_hedger
+from src.agent.metrics import METRICS
+from src.agent.response import response_budget
+from src.agent.single_call import MULTI_CALL, SINGLE_CALL, single_call_prompt, parse_single_call
+from src.agent.turn_control import get_turn
+
+# Phrases that signal an explicit request for product recommendations
+PRODUCT_REQUEST_KEYWORDS = [
+    'suggest product', 'recommend product', 'suggest some product', 
+    'product suggestion', 'product recommendation', 'based on this',
+    'show me product', 'what product', 'which product', 'product for',
+    'suggest something', 'recommend something', 'shopping', 'buy'
+]
+
+# Words that route a message to web search (and start a speculative search prefetch)
+SEARCH_MARKERS = ['search', 'latest', 'recent', 'research']
+
+INTENT_EXECUTOR = ThreadPoolExecutor(max_workers=16, thread_name_prefix='intent')
+
+# Only the short intent call is hedged; a single-call request also drafts the answer
+INTENT_HEDGER = get_hedger('intent')
+
+def _intent_prompt(user_input: str, chat_history) -> str:
+    return f"""
         User input: {user_input}
         Chat history: {chat_history}
         
@@ -26,39 +42,156 @@ def reasoning_node(llm):
         
         Respond with just the category number.
         """
+
+def _request(llm, state: Dict[str, Any], mode: str):
+    """The (runnable, prompt) for this turn's routing call."""
+    chat_history = state.get('chat_history', [])
+    if mode == SINGLE_CALL:
+        budget = {'max_tokens': response_budget('single_call')} if response_budget('single_call') else {}
+        runnable = llm.bind(response_format={'type': 'json_object'}, **budget)
+        return runnable, single_call_prompt(state['user_input'], chat_history)
+    return llm, _intent_prompt(state['user_input'], chat_history)
+
+def _single_call_intent(state: Dict[str, Any], content: str) -> Optional[str]:
+    """Intent from a single-call reply, keeping a general draft for the response node; None if unparseable."""
+    parsed = parse_single_call(content)
+    if parsed is None:
+        print("⚠️ Single-call reply could not be parsed - falling back to the intent call")
+        METRICS.increment('single_call.parse_failure')
+        return None
+    METRICS.increment('single_call.parsed')
+    if parsed['intent'] == '5':
+        state['draft'] = {'answer': parsed['answer'], 'self_check': parsed['self_check']}
+    return parsed['intent']
+
+def _degraded(state: Dict[str, Any]) -> Dict[str, Any]:
+    """LLM circuit open: route on keywords alone (anything else goes to the rule engine)."""
+    print("🔌 LLM unavailable - keyword routing")
+    METRICS.increment('degraded.reasoning')
+    return _route(state, '')
+
+def _log_history(chat_history):
+    print(f"\n📋 CHAT HISTORY IN REASONING: {len(chat_history)} messages")
+    if chat_history:
+        for i, msg in enumerate(chat_history[-3:]):  # Show last 3 messages
+            print(f"  {i+1}. User: {msg.get('user', '')[:50]}...")
+            print(f"     Aara: {msg.get('Aara', '')[:50]}...")
+
+def _preempted(state: Dict[str, Any], cancelled: bool = True) -> Dict[str, Any]:
+    """
+    The rule engine answered first: skip classification and let the join apply the rule.
+    `cancelled` is False when the request could not be stopped and runs on unused.
+    """
+    outcome = 'cancelled' if cancelled else 'abandoned'
+    print(f"⚡ Rule engine answered - intent classification {outcome}")
+    METRICS.increment(f'reasoning.intent_{outcome}')
+    state['intermediate_steps'].append({'reasoning': 'preempted_by_rules'})
+    state['next_node'] = 'rule_engine'
+    return state
+
+def _route(state: Dict[str, Any], intent: str) -> Dict[str, Any]:
+    # Add reasoning to intermediate steps
+    state['intermediate_steps'].append({'reasoning': intent})
+    
+    # Enhanced routing logic with product suggestion detection
+    user_input_lower = state['user_input'].lower()
+    
+    # Check for explicit product requests first
+    if any(keyword in user_input_lower for keyword in PRODUCT_REQUEST_KEYWORDS) or '4' in intent:
+        state['next_node'] = 'product_suggestion'
+    elif 'skin' in user_input_lower or 'skincare' in user_input_lower or '1' in intent:
+        state['next_node'] = 'skincare_tool'
+    elif any(word in user_input_lower for word in ['period', 'menstrual', 'pcos', 'health']) or '2' in intent:
+        state['next_node'] = 'health_advice_tool'
+    elif any(word in user_input_lower for word in SEARCH_MARKERS) or '3' in intent:
+        state['next_node'] = 'search_tool'
+    else:
+        state['next_node'] = 'rule_engine'
+    
+    return state
+
+def reasoning_node(llm, mode: str = MULTI_CALL):
+    """
+    Node that analyzes user input and determines the next step.
+    In single-call mode the same request also drafts and self-checks a general answer.
+    """
+    def node(state: Dict[str, Any]) -> Dict[str, Any]:
+        chat_history = state.get('chat_history', [])
+        _log_history(chat_history)
+        control = get_turn(state.get('turn_id'))
+        if not llm_available():
+            return _degraded(state)
+        
+        # Use LLM to determine intent and next step, unless the rule engine answers first
+        runnable, prompt = _request(llm, state, mode)
+        preempted = threading.Event()
+        control.on_preempt(preempted.set)
+        # The copied context carries the turn's LLM queue priority into the worker thread
+        if mode == SINGLE_CALL:
+            call = (runnable.invoke,)
+        else:
+            call = (partial(INTENT_HEDGER.call, abandoned=preempted), runnable.invoke)
+        future = INTENT_EXECUTOR.submit(contextvars.copy_context().run, *call, prompt)
+        settled = threading.Event()
+        future.add_done_callback(lambda f: settled.set())
+        control.on_preempt(settled.set)
+        settled.wait()
+        
+        if not future.done():
+            # Only a call still queued for a worker can be dropped. One already sent can't be
+            # interrupted in a thread: it completes unused, spending its quota and limiter slot
+            # (just without a hedge). async_reasoning_node cancels the request itself.
+            return _preempted(state, cancelled=future.cancel())
         
         try:
-            intent_response = llm.invoke(prompt)
+            intent_response = future.result()
             intent = intent_response.content if hasattr(intent_response, 'content') else str(intent_response)
+            if mode == SINGLE_CALL:
+                intent = _single_call_intent(state, intent)
+                if intent is None:
+                    intent_response = llm.invoke(_intent_prompt(state['user_input'], chat_history))
+                    intent = intent_response.content if hasattr(intent_response, 'content') else str(intent_response)
         except Exception as e:
             print(f"Error in reasoning: {e}")
             intent = "5"  # Default to rule engine
         
-        # Add reasoning to intermediate steps
-        state['intermediate_steps'].append({'reasoning': intent})
-        
-        # Enhanced routing logic with product suggestion detection
-        user_input_lower = user_input.lower()
-        
-        # Check for explicit product requests first
-        product_keywords = [
-            'suggest product', 'recommend product', 'suggest some product', 
-            'product suggestion', 'product recommendation', 'based on this',
-            'show me product', 'what product', 'which product', 'product for',
-            'suggest something', 'recommend something', 'shopping', 'buy'
-        ]
+        return _route(state, intent)
+    
+    return node
+
+def async_reasoning_node(llm, mode: str = MULTI_CALL):
+    """Async variant for app.ainvoke: preemption cancels the in-flight intent request."""
+    async def node(state: Dict[str, Any]) -> Dict[str, Any]:
+        chat_history = state.get('chat_history', [])
+        _log_history(chat_history)
+        control = get_turn(state.get('turn_id'))
+        if not llm_available():
+            return _degraded(state)
         
-        if any(keyword in user_input_lower for keyword in product_keywords) or '4' in intent:
-            state['next_node'] = 'product_suggestion'
-        elif 'skin' in user_input_lower or 'skincare' in user_input_lower or '1' in intent:
-            state['next_node'] = 'skincare_tool'
-        elif any(word in user_input_lower for word in ['period', 'menstrual', 'pcos', 'health']) or '2' in intent:
-            state['next_node'] = 'health_advice_tool'
-        elif any(word in user_input_lower for word in ['search', 'latest', 'recent', 'research']) or '3' in intent:
-            state['next_node'] = 'search_tool'
+        loop = asyncio.get_running_loop()
+        runnable, prompt = _request(llm, state, mode)
+        if mode == SINGLE_CALL:
+            task = asyncio.ensure_future(runnable.ainvoke(prompt))
         else:
-            state['next_node'] = 'rule_engine'
+            task = asyncio.ensure_future(INTENT_HEDGER.acall(runnable.ainvoke, prompt))
+        control.on_preempt(lambda: loop.call_soon_threadsafe(task.cancel))
+        
+        try:
+            intent_response = await task
+            intent = intent_response.content if hasattr(intent_response, 'content') else str(intent_response)
+            if mode == SINGLE_CALL:
+                intent = _single_call_intent(state, intent)
+                if intent is None:
+                    intent_response = await llm.ainvoke(_intent_prompt(state['user_input'], chat_history))
+                    intent = intent_response.content if hasattr(intent_response, 'content') else str(intent_response)
+        except asyncio.CancelledError:
+            if not control.preempted:
+                raise
+            return _preempted(state)
+        except Exception as e:
+            print(f"Error in reasoning: {e}")
+            intent = "5"  # Default to rule engine
         
-        return state
+        return _route(state, intent)
     
-    return node 
\ No newline at end of file
+    return node
@@ -1,6 +1,18 @@
 import os
+import threading
 import yaml
-from typing import Dict, Any
+from functools import partial
+from typing import Dict, Any, Callable, Optional, Tuple
+
+from src.agent.answer_bank import get_answer_bank
+from src.agent.circuit_breaker import llm_available
+from src.agent.hedging import get_hedger
+from src.agent.metrics import METRICS
+from src.agent.semantic_cache import get_semantic_cache, prompt_version
+from src.agent.verification_audit import VerificationAuditor
+from src.agent.verification_cache import APPROVED, VerificationCache, verification_key
+from tools.knowledge_base import knowledge_base_answer
+from tools.user_profile import profile_from_state
 
 # Load settings
 config_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'config', 'settings.yaml')
@@ -10,6 +22,39 @@ try:
 except:
     settings = {'verification': {'enabled': True}}  # Default to enabled if config not found
 
+# Verification outcomes for (prompt, question, response) triples already checked
+VERIFICATION_CACHE = VerificationCache(maxsize=settings.get('verification', {}).get('cache_entries', 4096))
+VERIFICATION_HEDGER = get_hedger('verification')
+METRICS.register_gauge('verification.cache', VERIFICATION_CACHE.stats)
+
+# Background verifier for routes in async mode (see get_auditor)
+_auditor: Optional[VerificationAuditor] = None
+_auditor_lock = threading.Lock()
+
+# Static crisis block: streamed the moment a crisis is detected, and the fallback if generation fails
+CRISIS_RESOURCES = """I'm very concerned about you. Please reach out for help immediately:
+
+🚨 **Crisis Resources (Available 24/7):**
+- **988 Suicide & Crisis Lifeline**: Call or text 988
+- **Crisis Text Line**: Text HOME to 741741
+- **Emergency Services**: Call 911
+
+You are not alone, and help is available. Please reach out right now."""
+
+# Degraded mode (LLM circuit open) reply when the local knowledge base has nothing relevant
+DEGRADED_MESSAGE = """I'm having trouble reaching my full knowledge right now, so my answers are limited for the moment. I can still help with skin types, skincare routines, periods and PCOS - or try me again in a few minutes. 💛"""
+
+DEGRADED_GREETING = """Hi! 💛 I'm Aara. I'm running in a limited mode right now, but I can still help with skin types, skincare routines, periods and PCOS. What's on your mind?"""
+
+def degraded_response(response_type: str, user_input: str) -> str:
+    """Reply without any model call: crisis resources, a local passage, or a short notice."""
+    METRICS.increment('degraded.response')
+    if response_type == 'crisis':
+        return CRISIS_RESOURCES
+    if response_type == 'greeting':
+        return DEGRADED_GREETING
+    return knowledge_base_answer(user_input) or DEGRADED_MESSAGE
+
 def load_prompt(prompt_file: str) -> str:
     """Load a prompt from the prompts directory"""
     prompts_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'prompts')
@@ -23,20 +68,57 @@ def load_prompt(prompt_file: str) -> str:
         print(f"❌ Error loading prompt: {e}")
         return ""
 
-def verify_response(llm, user_question: str, generated_response: str) -> str:
+def response_budget(key: str) -> Optional[int]:
+    """Output token budget for a route or response type (response_budgets in settings)."""
+    return settings.get('response_budgets', {}).get(key)
+
+def budgeted_invoke(llm, prompt: str, budget_key: str, hedger=None) -> Tuple[str, bool]:
+    """Invoke llm within budget_key's output budget; returns (text, truncated)."""
+    budget = response_budget(budget_key)
+    kwargs = {'max_tokens': budget} if budget else {}
+    message = hedger.call(llm.invoke, prompt, **kwargs) if hedger else llm.invoke(prompt, **kwargs)
+    text = message.content if hasattr(message, 'content') else str(message)
+    truncated = getattr(message, 'response_metadata', {}).get('finish_reason') == 'length'
+    METRICS.increment(f'response_budget.{budget_key}.calls')
+    if truncated:
+        METRICS.increment(f'response_budget.{budget_key}.truncated')
+    return text, truncated
+
+def trim_to_sentence(text: str) -> str:
+    """Cut a reply that hit its budget back to the last complete sentence."""
+    end = max(text.rfind(mark) for mark in ('. ', '! ', '? ', '.\n', '!\n', '?\n'))
+    if end >= len(text) // 2:
+        return text[:end + 1]
+    return text.rstrip() + '…'
+
+def generate_text(llm, prompt: str, budget_key: str) -> str:
+    """Generation call bounded by its budget; a cut-off reply ends on a full sentence."""
+    text, truncated = budgeted_invoke(llm, prompt, budget_key)
+    return trim_to_sentence(text) if truncated else text
+
+def verification_outcome(llm, user_question: str, generated_response: str, cached_only: bool = False) -> Optional[str]:
     """
     Verify if the generated response is appropriate for the user's question.
-    Returns improved response if needed, otherwise returns original response.
+    Returns APPROVED, the verifier's improved response, or None if the verdict is unknown
+    (with cached_only, whenever this pair hasn't been verified before).
     """
     # Check if verification is enabled
     if not settings.get('verification', {}).get('enabled', True):
-        return generated_response  # Skip verification if disabled
+        return APPROVED  # Skip verification if disabled
     
     verification_prompt = load_prompt('verification_prompt.txt')
     
     if not verification_prompt:
-        return generated_response  # Fallback if prompt not found
+        return APPROVED  # Fallback if prompt not found
     
+    key = verification_key(verification_prompt, user_question, generated_response)
+    cached = VERIFICATION_CACHE.get(key)
+    if cached is not None or cached_only:
+        return cached
+    if not llm_available():
+        METRICS.increment('degraded.verification_skipped')
+        return None
+
     # Create verification request
     verification_request = f"""
 {verification_prompt}
@@ -52,31 +134,128 @@ def verify_response(llm, user_question: str, generated_response: str) -> str:
     
     try:
         # Get LLM verification
-        verification_result = llm.invoke(verification_request)
-        verification_content = verification_result.content if hasattr(verification_result, 'content') else str(verification_result)
+        verification_content, truncated = budgeted_invoke(llm, verification_request, 'verification',
+                                                          hedger=VERIFICATION_HEDGER)
         
         # Parse verification result
         if "VERIFICATION: APPROVED" in verification_content:
-            return generated_response  # Original response is good
+            VERIFICATION_CACHE.put(key, APPROVED)
+            return APPROVED  # Original response is good
         elif "VERIFICATION: NEEDS_IMPROVEMENT" in verification_content:
             # Extract improved response
-            if "IMPROVED_RESPONSE:" in verification_content:
+            if truncated:
+                # An improvement cut off at the budget is worse than the original
+                METRICS.increment('response_budget.verification.improvement_dropped')
+                return None
+            elif "IMPROVED_RESPONSE:" in verification_content:
                 improved_part = verification_content.split("IMPROVED_RESPONSE:")[1].strip()
                 # Remove any trailing formatting
                 improved_response = improved_part.replace("```", "").strip()
+                VERIFICATION_CACHE.put(key, improved_response)
                 return improved_response
             else:
-                return generated_response  # Fallback
+                return None  # Fallback
         else:
-            return generated_response  # Fallback if parsing fails
+            return None  # Fallback if parsing fails
             
     except Exception as e:
         print(f"Error in response verification: {e}")
-        return generated_response  # Fallback to original response
+        return None  # Fallback to original response
 
-def response_node(llm):
-    """Node that generates the final response with disclaimers."""
-    def node(state: Dict[str, Any]) -> Dict[str, Any]:
+def verify_response(llm, user_question: str, generated_response: str) -> str:
+    """
+    Verify if the generated response is appropriate for the user's question.
+    Returns improved response if needed, otherwise returns original response.
+    """
+    outcome = verification_outcome(llm, user_question, generated_response)
+    return generated_response if outcome in (None, APPROVED) else outcome
+
+def verification_route(state: Dict[str, Any]) -> str:
+    """Route label used to pick the verification mode: crisis, greeting, a tool name, or general."""
+    response_type = state.get('response_type', '')
+    if state.get('use_llm') and response_type in ('crisis', 'greeting'):
+        return response_type
+    if state.get('final_response'):
+        next_node = state.get('next_node', '')
+        return (next_node if next_node not in ('', 'rule_engine') else state.get('route_to', '')) or 'general'
+    return 'general'
+
+def verification_mode(route: str) -> str:
+    """'inline' (block the reply on the verifier) or 'async' (audit it afterwards)."""
+    modes = settings.get('verification', {}).get('modes', {})
+    return modes.get(route, modes.get('default', 'inline'))
+
+def get_auditor(llm) -> VerificationAuditor:
+    global _auditor
+    with _auditor_lock:
+        if _auditor is None:
+            audit_settings = settings.get('verification', {}).get('audit', {})
+            _auditor = VerificationAuditor(
+                partial(verification_outcome, llm),
+                workers=audit_settings.get('workers', 2),
+                queue_size=audit_settings.get('queue_size', 1000),
+                on_disagreement=audit_settings.get('on_disagreement', 'log'),
+            )
+            METRICS.register_gauge('verification.audit', _auditor.stats)
+        return _auditor
+
+# Routes whose answers always carry the disclaimer, whether or not the verifier has seen them yet
+DISCLAIMER_ROUTES = ('skincare_tool', 'health_advice_tool')
+
+def verify_for_route(llm, state: Dict[str, Any], response: str,
+                     on_verified: Optional[Callable[[str], None]] = None) -> str:
+    """
+    Verification step of the response node. Inline routes wait for the verifier; async
+    routes reply at once (or with a cached verdict) and queue the reply for audit, so
+    they get the deterministic disclaimer step first instead of the verifier's.
+    on_verified receives the verified text whenever it becomes known.
+    """
+    user_input = state.get('user_input', '')
+    route = verification_route(state)
+    if verification_mode(route) != 'async':
+        verified = verify_response(llm, user_input, response)
+    else:
+        response = with_disclaimer(response, always=route in DISCLAIMER_ROUTES)
+        outcome = verification_outcome(llm, user_input, response, cached_only=True)
+        if outcome is None:
+            get_auditor(llm).submit(state.get('conversation_id', ''), route, user_input, response, on_verified)
+            METRICS.increment(f'verification.async.{route}')
+            return response
+        verified = response if outcome == APPROVED else outcome
+    if on_verified is not None:
+        on_verified(verified)
+    return verified
+
+def with_disclaimer(response: str, always: bool = False) -> str:
+    """
+    Disclaimer step for rule/tool answers: append it when the answer contains medical
+    advice, or to any answer with always=True (health and skincare routes).
+    """
+    if always or any(keyword in response.lower() for keyword in ['diagnosis', 'treatment', 'medication', 'symptoms', 'condition']):
+        if 'consult a doctor' not in response.lower() and not any(keyword in response.lower() 
+            for keyword in ['crisis', 'emergency', '911', '988', 'suicide']):
+            response += "\n\n_Consult a doctor for medical advice._"
+    return response
+
+def cache_namespace(state: Dict[str, Any], route: str, prompt_file: str) -> Optional[tuple]:
+    """
+    Semantic cache namespace for a generated answer: (route, prompt version, skin type).
+    None when the route is not cached or the turn has chat history: an answer written
+    for one conversation's context is not reused for another's, or stored for reuse.
+    """
+    cache = get_semantic_cache()
+    if not cache.enabled_for(route):
+        return None
+    if state.get('chat_history'):
+        METRICS.increment(f'semantic_cache.{route}.bypass')
+        return None
+    skin_type = profile_from_state(state).context_for(state.get('user_input', ''))['skin_type']
+    return (route, prompt_version(prompt_file, 'verification_prompt.txt'), skin_type)
+
+def response_node(llm, verifier_llm=None):
+    """Node that generates the final response with disclaimers (verified on verifier_llm)."""
+    verifier = verifier_llm or llm
+    def generate(state: Dict[str, Any]) -> Dict[str, Any]:
         user_input = state.get('user_input', '')
         chat_history = state.get('chat_history', [])
         
@@ -89,14 +268,17 @@ def response_node(llm):
         # Check if we already have a final response from rules or tools
         if state.get('final_response'):
             # Only add disclaimer if response contains medical advice
-            response = state['final_response']
-            if any(keyword in response.lower() for keyword in ['diagnosis', 'treatment', 'medication', 'symptoms', 'condition']):
-                if 'consult a doctor' not in response.lower() and not any(keyword in response.lower() 
-                    for keyword in ['crisis', 'emergency', '911', '988', 'suicide']):
-                    response += "\n\n_Consult a doctor for medical advice._"
-            
-            # VERIFICATION STEP: Verify rule-based response
-            verified_response = verify_response(llm, user_input, response)
+            response = with_disclaimer(state['final_response'])
+
+            # Curated rule answers (FAQ, safety) are returned as written - no model on this path
+            if state.get('rule_category'):
+                state['final_response'] = response
+                return state
+
+            # VERIFICATION STEP: Verify rule-based response (tool outputs verified offline skip the call)
+            verified_response = get_answer_bank().verified(response)
+            if verified_response is None:
+                verified_response = verify_for_route(verifier, state, response)
             state['final_response'] = verified_response
             return state
         
@@ -142,20 +324,27 @@ def response_node(llm):
                 Respond naturally as Aara, offering to help with specific topics based on what they mentioned.
                 """
             
+            if not llm_available():
+                state['final_response'] = degraded_response(response_type, user_input)
+                return state
+
+            # Crisis replies are never cached (routes.crisis: false)
+            prompt_file = {'greeting': 'greeting_prompt.txt', 'crisis': 'crisis_prompt.txt'}.get(response_type, 'conversational_prompt.txt')
+            namespace = cache_namespace(state, response_type or 'conversational', prompt_file)
+            if namespace is not None:
+                cached = get_semantic_cache().lookup(namespace, user_input)
+                if cached is not None:
+                    print("⚡ Served from semantic cache")
+                    state['final_response'] = cached
+                    return state
+
             try:
-                response = llm.invoke(context)
-                response_text = response.content if hasattr(response, 'content') else str(response)
+                response_text = generate_text(llm, context, response_type or 'conversational')
             except Exception as e:
+                namespace = None  # don't cache the apology
                 print(f"Error generating response: {e}")
                 if response_type == 'crisis':
-                    response_text = """I'm very concerned about you. Please reach out for help immediately:
-
-                    🚨 **Crisis Resources (Available 24/7):**
-                    - **988 Suicide & Crisis Lifeline**: Call or text 988
-                    - **Crisis Text Line**: Text HOME to 741741
-                    - **Emergency Services**: Call 911
-
-                    You are not alone, and help is available. Please reach out right now."""
+                    response_text = CRISIS_RESOURCES
                 else:
                     response_text = "I apologize, but I'm having trouble processing your request right now. Please try again."
             
@@ -173,7 +362,9 @@ def response_node(llm):
                         response_text += "\n\n_Consult a doctor for medical advice._"
             
             # VERIFICATION STEP: Verify LLM-based response
-            verified_response = verify_response(llm, user_input, response_text)
+            # Only verified answers enter the semantic cache (async routes store once the audit is done)
+            store = partial(get_semantic_cache().store, namespace, user_input) if namespace is not None else None
+            verified_response = verify_for_route(verifier, state, response_text, on_verified=store)
             state['final_response'] = verified_response
             return state
         
@@ -194,10 +385,34 @@ def response_node(llm):
         Respond naturally as Aara, offering to help with specific topics based on what they mentioned.
         """
         
+        if not llm_available():
+            state['final_response'] = degraded_response('', user_input)
+            return state
+
+        # Single-call mode: the routing call already drafted and self-checked this answer
+        draft = state.get('draft')
+        if draft:
+            response_text = with_disclaimer(draft['answer'])
+            if draft['self_check']:
+                METRICS.increment('single_call.served')
+                state['final_response'] = response_text
+            else:
+                METRICS.increment('single_call.self_check_failed')
+                state['final_response'] = verify_for_route(verifier, state, response_text)
+            return state
+
+        namespace = cache_namespace(state, 'general', 'conversational_prompt.txt')
+        if namespace is not None:
+            cached = get_semantic_cache().lookup(namespace, user_input)
+            if cached is not None:
+                print("⚡ Served from semantic cache")
+                state['final_response'] = cached
+                return state
+
         try:
-            response = llm.invoke(context)
-            response_text = response.content if hasattr(response, 'content') else str(response)
+            response_text = generate_text(llm, context, 'general')
         except Exception as e:
+            namespace = None  # don't cache the apology
             print(f"Error generating response: {e}")
             response_text = "I apologize, but I'm having trouble processing your request right now. Please try again."
         
@@ -207,8 +422,20 @@ def response_node(llm):
                 response_text += "\n\n_Consult a doctor for medical advice._"
         
         # VERIFICATION STEP: Verify general LLM response
-        verified_response = verify_response(llm, user_input, response_text)
+        # Only verified answers enter the semantic cache (async routes store once the audit is done)
+        store = partial(get_semantic_cache().store, namespace, user_input) if namespace is not None else None
+        verified_response = verify_for_route(verifier, state, response_text, on_verified=store)
         state['final_response'] = verified_response
         return state
+
+    def node(state: Dict[str, Any]) -> Dict[str, Any]:
+        state = generate(state)
+        # An async audit that disagreed with the previous reply amends it now
+        if state.get('response_type') != 'crisis':
+            correction = get_auditor(verifier).take_correction(state.get('conversation_id'))
+            if correction:
+                state['final_response'] = (f"_A correction to my previous answer:_\n\n{correction}"
+                                           f"\n\n---\n\n{state['final_response']}")
+        return state
     
     return node 
\ No newline at end of file
@@ -0,0 +1,233 @@
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from src.agent.config import PROJECT_ROOT, get_section
+from src.agent.metrics import METRICS
+
+# Words that carry no meaning for "is this the same question"
+STOPWORDS = {
+    'a', 'about', 'an', 'and', 'are', 'can', 'could', 'do', 'does', 'i', 'im', 'is', 'it', 'me', 'my', 'of',
+    'please', 's', 'should', 'tell', 'the', 'to', 'what', 'whats', 'you', 'your'
+}
+
+# Words that flip a health question's answer; see question_guard()
+NEGATIONS = {
+    'no', 'not', 'never', 'without', 'cannot', 'cant', 'dont', 'doesnt', 'didnt', 'isnt', 'arent', 'wasnt',
+    'werent', 'shouldnt', 'wont', 'wouldnt', 'couldnt', 'havent', 'hasnt'
+}
+NUMBER_WORDS = {
+    'one', 'two', 'three', 'four', 'five', 'six', 'seven', 'eight', 'nine', 'ten', 'eleven', 'twelve',
+    'once', 'twice', 'half'
+}
+
+def normalize_question(text: str) -> str:
+    return ' '.join(re.sub(r"[^\w\s]", ' ', text.lower().replace("'", '')).split())
+
+def question_guard(text: str) -> Tuple[bool, Tuple[str, ...]]:
+    """
+    Whether a question is negated, and the numbers in it. Embeddings rate "should I take"
+    and "should I not take", or "2 months" and "6 months", as near-identical, so a cached
+    answer is only reused when these match exactly.
+    """
+    normalized = normalize_question(text)
+    words = normalized.split()
+    numbers = set(re.findall(r'\d+', normalized)) | {w for w in words if w in NUMBER_WORDS}
+    return any(w in NEGATIONS for w in words), tuple(sorted(numbers))
+
+class HashingEmbedder:
+    """
+    Dependency-free embedding: signed feature hashing of content words, word bigrams and
+    character trigrams, L2-normalized. Robust to rephrasing, punctuation and small typos.
+    """
+
+    def __init__(self, dim: int = 4096):
+        self.dim = dim
+
+    def _features(self, text: str) -> List[str]:
+        words = [w for w in normalize_question(text).split() if w not in STOPWORDS]
+        features = [f'w:{w}' for w in words]
+        features += [f'b:{a}_{b}' for a, b in zip(words, words[1:])]
+        for word in words:
+            padded = f'#{word}#'
+            features += [f'c:{padded[i:i + 3]}' for i in range(len(padded) - 2)]
+        return features
+
+    def embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature in self._features(text):
+            digest = hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], 'little') % self.dim
+            sign = 1.0 if digest[4] & 1 else -1.0
+            # Whole words and bigrams count more than character trigrams
+            vector[bucket] += sign * (1.0 if feature[0] == 'c' else 2.0)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+class OpenAIEmbedder:
+    """Optional model embeddings (semantic_cache.embedder: openai)."""
+
+    def __init__(self, model: str = 'text-embedding-3-small'):
+        from langchain_openai import OpenAIEmbeddings
+        self._embeddings = OpenAIEmbeddings(model=model)
+
+    def embed(self, text: str) -> np.ndarray:
+        vector = np.asarray(self._embeddings.embed_query(normalize_question(text)), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+def prompt_version(*prompt_files: str) -> str:
+    """Hash of the prompts behind an answer; part of every cache namespace."""
+    digest = hashlib.sha256()
+    for name in prompt_files:
+        try:
+            with open(os.path.join(PROJECT_ROOT, 'prompts', name), 'rb') as f:
+                digest.update(f.read())
+        except OSError:
+            digest.update(name.encode('utf-8'))
+    return digest.hexdigest()[:12]
+
+class _NamespaceMatrix:
+    """
+    One namespace's question vectors in a preallocated matrix (doubled when full), one row
+    per entry. Removing an entry moves the last row into its place, so rows stay dense.
+    """
+
+    def __init__(self, dim: int, capacity: int = 64):
+        self.vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self.expires = np.zeros(capacity, dtype=np.float64)
+        self.keys: List[int] = []
+        self.rows: Dict[int, int] = {}
+
+    def add(self, key: int, vector: np.ndarray, expires_at: float):
+        row = len(self.keys)
+        if row == len(self.vectors):
+            self.vectors = np.concatenate([self.vectors, np.zeros_like(self.vectors)])
+            self.expires = np.concatenate([self.expires, np.zeros_like(self.expires)])
+        self.vectors[row] = vector
+        self.expires[row] = expires_at
+        self.keys.append(key)
+        self.rows[key] = row
+
+    def remove(self, key: int):
+        row, last = self.rows.pop(key), len(self.keys) - 1
+        if row != last:
+            moved = self.keys[last]
+            self.vectors[row] = self.vectors[last]
+            self.expires[row] = self.expires[last]
+            self.keys[row] = moved
+            self.rows[moved] = row
+        self.keys.pop()
+
+class SemanticCache:
+    """
+    Nearest-neighbour cache of generated answers. Entries live in namespaces
+    (route, prompt version, profile signature); a lookup serves the most similar
+    past question in the namespace if its cosine similarity clears the threshold and
+    its negation and numbers match (question_guard).
+    """
+
+    def __init__(self, embedder=None, threshold: float = 0.85, max_entries: int = 2000,
+                 ttl_seconds: float = 24 * 3600, routes: Dict[str, bool] = None, enabled: bool = True):
+        self.embedder = embedder or HashingEmbedder()
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.routes = routes or {}
+        self.enabled = enabled
+        # key -> (namespace, question, answer, guard), in LRU order; vectors live in _namespaces
+        self._entries: "OrderedDict[int, Tuple[tuple, str, str, tuple]]" = OrderedDict()
+        self._namespaces: Dict[tuple, _NamespaceMatrix] = {}
+        self._next_key = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> 'SemanticCache':
+        settings = get_section('semantic_cache')
+        embedder = None
+        if settings.get('embedder') == 'openai':
+            try:
+                embedder = OpenAIEmbedder(settings.get('embedding_model', 'text-embedding-3-small'))
+            except Exception as e:
+                print(f"⚠️ OpenAI embeddings unavailable ({e}); using hashing embedder")
+        return cls(
+            embedder=embedder,
+            threshold=settings.get('similarity_threshold', 0.85),
+            max_entries=settings.get('max_entries', 2000),
+            ttl_seconds=settings.get('ttl_seconds', 24 * 3600),
+            routes=settings.get('routes', {}),
+            enabled=settings.get('enabled', True),
+        )
+
+    def enabled_for(self, route: str) -> bool:
+        return self.enabled and bool(self.routes.get(route, False))
+
+    def _remove(self, key: int):
+        namespace = self._entries.pop(key)[0]
+        matrix = self._namespaces[namespace]
+        matrix.remove(key)
+        if not matrix.keys:
+            del self._namespaces[namespace]
+
+    def lookup(self, namespace: tuple, question: str) -> Optional[str]:
+        vector = self.embedder.embed(question)
+        guard = question_guard(question)
+        now = time.time()
+        with self._lock:
+            matrix = self._namespaces.get(namespace)
+            if matrix is not None:
+                # Highest rows first, so each swap moves in a row that is already known to be live
+                for row in np.flatnonzero(matrix.expires[:len(matrix.keys)] <= now)[::-1]:
+                    self._remove(matrix.keys[row])
+                matrix = self._namespaces.get(namespace)
+            if matrix is not None:
+                similarities = matrix.vectors[:len(matrix.keys)] @ vector
+                candidates = np.flatnonzero(similarities >= self.threshold)
+                for row in candidates[np.argsort(-similarities[candidates], kind='stable')]:
+                    key = matrix.keys[row]
+                    if self._entries[key][3] == guard:
+                        self._entries.move_to_end(key)
+                        METRICS.increment(f'semantic_cache.{namespace[0]}.hit')
+                        return self._entries[key][2]
+        METRICS.increment(f'semantic_cache.{namespace[0]}.miss')
+        return None
+
+    def store(self, namespace: tuple, question: str, answer: str):
+        vector = self.embedder.embed(question)
+        guard = question_guard(question)
+        with self._lock:
+            key = self._next_key
+            self._next_key += 1
+            self._entries[key] = (namespace, question, answer, guard)
+            matrix = self._namespaces.get(namespace)
+            if matrix is None:
+                matrix = self._namespaces[namespace] = _NamespaceMatrix(len(vector))
+            matrix.add(key, vector, time.time() + self.ttl_seconds)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def stats(self) -> Dict[str, Any]:
+        counters = METRICS.counters('semantic_cache.')
+        hits = sum(v for k, v in counters.items() if k.endswith('.hit'))
+        misses = sum(v for k, v in counters.items() if k.endswith('.miss'))
+        with self._lock:
+            entries = len(self._entries)
+        return {'entries': entries, 'hits': hits, 'misses': misses,
+                'hit_rate': round(hits / (hits + misses), 4) if hits + misses else 0.0}
+
+_cache: Optional[SemanticCache] = None
+_cache_lock = threading.Lock()
+
+def get_semantic_cache() -> SemanticCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SemanticCache.from_settings()
+            METRICS.register_gauge('semantic_cache', _cache.stats)
+        return _cache
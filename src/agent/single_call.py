@@ -0,0 +1,48 @@
+import json
+import re
+from typing import Dict, Any, List, Optional
+
+from src.agent.response import load_prompt
+
+# Graph modes (llm.graph_mode): separate intent/generation/verification calls, or one structured call
+MULTI_CALL = 'multi_call'
+SINGLE_CALL = 'single_call'
+
+SELF_CHECK_VALUES = {'pass': True, 'fail': False, True: True, False: False}
+
+def single_call_prompt(user_input: str, chat_history: List[Dict[str, str]]) -> str:
+    """One request that classifies the intent, drafts a general answer and self-checks it."""
+    return f"""
+{load_prompt('conversational_prompt.txt')}
+
+{load_prompt('single_call_prompt.txt')}
+
+User's message: {user_input}
+Chat history: {chat_history}
+"""
+
+def parse_single_call(text: str) -> Optional[Dict[str, Any]]:
+    """
+    Parse the structured reply into {'intent', 'answer', 'self_check'}.
+    Returns None when the reply is not a usable object, so the caller can fall back.
+    """
+    match = re.search(r'\{.*\}', text or '', re.DOTALL)
+    if not match:
+        return None
+    try:
+        data = json.loads(match.group(0))
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(data, dict):
+        return None
+
+    intent = str(data.get('intent', '')).strip()
+    answer = data.get('answer') or ''
+    self_check = data.get('self_check')
+    if isinstance(self_check, str):
+        self_check = self_check.strip().lower()
+    if intent not in {'1', '2', '3', '4', '5'} or not isinstance(answer, str) or self_check not in SELF_CHECK_VALUES:
+        return None
+    if intent == '5' and not answer.strip():
+        return None
+    return {'intent': intent, 'answer': answer.strip(), 'self_check': SELF_CHECK_VALUES[self_check]}
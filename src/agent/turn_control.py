@@ -0,0 +1,70 @@
+import threading
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+class TurnControl:
+    """
+    Signals shared by the parallel branches of one turn: the rule engine preempting the
+    intent call, and early events (e.g. crisis resources) for a streaming client.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._preempted = False
+        self._callbacks: List[Callable[[], None]] = []
+        self._listeners: List[Callable[[str, Any], None]] = []
+
+    def subscribe(self, listener: Callable[[str, Any], None]):
+        with self._lock:
+            self._listeners.append(listener)
+
+    def emit(self, event: str, data: Any):
+        """Deliver an event to the turn's listeners (no-op when nobody is streaming)."""
+        with self._lock:
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener(event, data)
+            except Exception as e:
+                print(f"Turn event listener failed: {e}")
+
+    @property
+    def preempted(self) -> bool:
+        return self._preempted
+
+    def preempt(self):
+        with self._lock:
+            if self._preempted:
+                return
+            self._preempted = True
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def on_preempt(self, callback: Callable[[], None]):
+        """Run callback on preemption (immediately if it already happened)."""
+        with self._lock:
+            if not self._preempted:
+                self._callbacks.append(callback)
+                return
+        callback()
+
+_turns: Dict[str, TurnControl] = {}
+_turns_lock = threading.Lock()
+
+def open_turn() -> str:
+    token = uuid.uuid4().hex
+    with _turns_lock:
+        _turns[token] = TurnControl()
+    return token
+
+def get_turn(token: Optional[str]) -> TurnControl:
+    """The turn's control, or a detached one when the graph is invoked without open_turn()."""
+    with _turns_lock:
+        control = _turns.get(token) if token else None
+    return control if control is not None else TurnControl()
+
+def close_turn(token: Optional[str]):
+    if token:
+        with _turns_lock:
+            _turns.pop(token, None)
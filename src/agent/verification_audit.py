@@ -0,0 +1,124 @@
+import queue
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Callable, List, Optional
+
+from src.agent.metrics import METRICS
+from src.agent.verification_cache import APPROVED
+
+# What a disagreement triggers besides the log line
+AUDIT_ACTIONS = ('log', 'flag', 'correct')
+
+class VerificationAuditor:
+    """
+    Post-hoc verification for routes in async mode: the reply goes out unverified and
+    a worker pool verifies it afterwards. Disagreements are logged and, depending on
+    `on_disagreement`, flagged for review or corrected on the conversation's next turn.
+
+    `verify(question, response)` returns APPROVED, the improved response, or None.
+    """
+
+    def __init__(self, verify: Callable[[str, str], Optional[str]], workers: int = 2,
+                 queue_size: int = 1000, on_disagreement: str = 'log', max_flags: int = 1000):
+        if on_disagreement not in AUDIT_ACTIONS:
+            raise ValueError(f"on_disagreement must be one of {AUDIT_ACTIONS}, got '{on_disagreement}'")
+        self.verify = verify
+        self.workers = workers
+        self.on_disagreement = on_disagreement
+        self.max_flags = max_flags
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=queue_size)
+        self._flags: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._corrections: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+
+    def _start(self):
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f'verification-audit-{i}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, conversation_id: str, route: str, question: str, response: str,
+               on_verified: Optional[Callable[[str], None]] = None) -> bool:
+        """Queue a sent reply for verification; False if the queue is full and it was dropped."""
+        self._start()
+        job = {'conversation_id': conversation_id, 'route': route, 'question': question,
+               'response': response, 'on_verified': on_verified}
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            METRICS.increment('verification.audit.dropped')
+            return False
+        METRICS.increment('verification.audit.queued')
+        return True
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            try:
+                self._audit(job)
+            except Exception as e:
+                print(f"Verification audit failed: {e}")
+                METRICS.increment('verification.audit.error')
+            finally:
+                self._queue.task_done()
+
+    def _audit(self, job: Dict[str, Any]):
+        with METRICS.timer('verification.audit'):
+            outcome = self.verify(job['question'], job['response'])
+        if outcome is None:
+            METRICS.increment('verification.audit.inconclusive')
+            return
+
+        verified = job['response'] if outcome == APPROVED else outcome
+        if job['on_verified'] is not None:
+            job['on_verified'](verified)
+        if outcome == APPROVED:
+            METRICS.increment('verification.audit.approved')
+            return
+
+        METRICS.increment(f"verification.audit.disagreement.{job['route']}")
+        print(f"🔍 Verification audit disagreed with a {job['route']} reply to: {job['question'][:60]}")
+        conversation_id = job['conversation_id']
+        if not conversation_id or self.on_disagreement == 'log':
+            return
+        with self._lock:
+            self._flags[conversation_id] = {
+                'route': job['route'], 'question': job['question'], 'response': job['response'],
+                'improved_response': outcome, 'flagged_at': time.time(),
+            }
+            self._flags.move_to_end(conversation_id)
+            while len(self._flags) > self.max_flags:
+                self._flags.popitem(last=False)
+            if self.on_disagreement == 'correct':
+                self._corrections[conversation_id] = outcome
+
+    def take_correction(self, conversation_id: Optional[str]) -> Optional[str]:
+        """Improved version of this conversation's last audited reply, delivered once."""
+        if not conversation_id:
+            return None
+        with self._lock:
+            correction = self._corrections.pop(conversation_id, None)
+        if correction is not None:
+            METRICS.increment('verification.audit.corrected')
+        return correction
+
+    def flagged(self) -> List[Dict[str, Any]]:
+        """Conversations whose replies the audit disagreed with, most recent last."""
+        with self._lock:
+            return [dict(flag, conversation_id=cid) for cid, flag in self._flags.items()]
+
+    def join(self):
+        """Block until every queued audit has finished."""
+        self._queue.join()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            flags = len(self._flags)
+            corrections = len(self._corrections)
+        return {'queued': self._queue.qsize(), 'flagged': flags, 'pending_corrections': corrections,
+                'on_disagreement': self.on_disagreement}
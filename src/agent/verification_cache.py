@@ -0,0 +1,61 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+from src.agent.metrics import METRICS
+
+# Stored outcome for a response the verifier approved as written
+APPROVED = 'APPROVED'
+
+def verification_key(verification_prompt: str, question: str, response: str) -> str:
+    """Hash of everything the verifier sees; a prompt edit changes every key."""
+    digest = hashlib.sha256()
+    for part in (verification_prompt, question.strip(), response.strip()):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\x00')
+    return digest.hexdigest()
+
+class VerificationCache:
+    """
+    Bounded LRU of verification outcomes: APPROVED, or the verifier's IMPROVED_RESPONSE
+    text. Rule answers are the same strings for every user, so most repeats hit.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            outcome = self._entries.get(key)
+            if outcome is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return outcome
+
+    def put(self, key: str, outcome: str):
+        with self._lock:
+            self._entries[key] = outcome
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / total, 4) if total else 0.0,
+            }
@@ -1,21 +1,36 @@
+import asyncio
+import operator
 import os
 import sys
 import yaml
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
-from langgraph.graph import StateGraph, END
-from typing import TypedDict, List, Dict, Any
+from langgraph.graph import StateGraph, START, END
+from typing import Annotated, TypedDict, List, Dict, Any, Callable, Optional
 
 # Add parent directories to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
-from src.agent.reasoning import reasoning_node
-from src.agent.response import response_node
-from rules.rules_engine import rule_engine_node
+from src.agent.answer_bank import get_answer_bank
+from src.agent.branches import branch, merge_dicts
+from src.agent.greetings import GreetingPool
+from src.agent.circuit_breaker import CircuitBreakerCallback, get_breaker, llm_available
+from src.agent.concurrency_limit import llm_priority
+from src.agent.http_transport import get_transport
+from src.agent.llm_factory import LLMFactory
+from src.agent.llm_standin import OPENAI_BACKEND
+from src.agent.llm_usage import LLMUsageTracker, usage_per_turn
+from src.agent.metrics import METRICS
+from src.agent.reasoning import reasoning_node, async_reasoning_node, SEARCH_MARKERS
+from src.agent.response import response_node, degraded_response, generate_text, get_auditor, CRISIS_RESOURCES
+from src.agent.single_call import MULTI_CALL, SINGLE_CALL
+from src.agent.turn_control import open_turn, get_turn, close_turn
+from rules.rules_engine import rule_engine_node, rule_preempts_intent, is_crisis_situation, is_safety_concern, SHORT_MESSAGE_WORDS
 from tools.skincare import skincare_tool
 from tools.health_advice import health_advice_tool
-from tools.search import search_tool
-from tools.product_suggestion import product_suggestion_tool
+from tools.search import search_tool, async_search_tool, start_search_prefetch, release_search_prefetch
+from tools.product_suggestion import product_suggestion_tool, product_context_node, should_suggest_products
 
 # Load environment variables and config
 load_dotenv()
@@ -25,70 +40,146 @@ config_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__fil
 with open(config_path, 'r') as f:
     settings = yaml.safe_load(f)
 
-MODEL_NAME = settings.get('llm', {}).get('model_name', 'gpt-4o')
+GRAPH_MODE = settings.get('llm', {}).get('graph_mode', MULTI_CALL)
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
+# The stand-ins (src.agent.llm_standin) run the graph offline, e.g. LLM_BACKEND=standin in tests
+LLM_BACKEND = os.getenv('LLM_BACKEND') or settings.get('llm', {}).get('backend', OPENAI_BACKEND)
 
-if not OPENAI_API_KEY:
+if not OPENAI_API_KEY and LLM_BACKEND == OPENAI_BACKEND:
     raise ValueError("OPENAI_API_KEY not found in environment variables")
 
-llm = ChatOpenAI(model=MODEL_NAME, api_key=OPENAI_API_KEY)
+# One client per model tier (llm.roles), all on the shared connection pool, behind the LLM
+# circuit breaker, OpenAI quota shaping and a per-model adaptive concurrency limit; calls
+# and tokens are counted per graph mode so the two modes can be compared on /metrics
+LLM_FACTORY = LLMFactory({**settings.get('llm', {}), 'backend': LLM_BACKEND}, OPENAI_API_KEY,
+                         callbacks=[CircuitBreakerCallback(get_breaker('llm')), LLMUsageTracker(GRAPH_MODE)],
+                         transport=get_transport(),
+                         limited=settings.get('llm_concurrency', {}).get('enabled', True)
+                         or settings.get('rate_limits', {}).get('enabled', True))
+llm = LLM_FACTORY.get('generator')
+router_llm = LLM_FACTORY.get('router')
+verifier_llm = LLM_FACTORY.get('verifier')
+print(f"🤖 Model tiers ({LLM_BACKEND}): {LLM_FACTORY.describe()}")
+METRICS.register_gauge(f'llm.{GRAPH_MODE}', lambda: usage_per_turn(GRAPH_MODE, METRICS.counter(f'workflow.turns.{GRAPH_MODE}')))
+
+greeting_pool = GreetingPool.from_settings(llm, verifier_llm)
+METRICS.register_gauge('greetings.pool', greeting_pool.stats)
+
+# Post-hoc verification for routes in async verification mode
+verification_auditor = get_auditor(verifier_llm)
 
 # Define the state type for the workflow
 class WorkflowState(TypedDict, total=False):
     user_input: str
     chat_history: List[Dict[str, str]]
-    intermediate_steps: List[Dict[str, Any]]
+    # Reducers let parallel branches contribute to the same key in one step
+    intermediate_steps: Annotated[List[Dict[str, Any]], operator.add]
+    branch_timings: Annotated[Dict[str, float], merge_dicts]
     final_response: str
     next_node: str
     use_llm: bool
     response_type: str
     route_to: str
+    rule_category: str
+    rule_result: Dict[str, Any]
+    product_context: Dict[str, Any]
+    conversation_id: str
+    user_profile: Any
+    search_prefetch: str
+    turn_id: str
+    draft: Dict[str, Any]
+
+# Keys the rule engine decides; held in rule_result until the join applies them
+RULE_KEYS = ("final_response", "use_llm", "response_type", "route_to", "rule_category")
+
+def rule_match_node(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run the rule engine as an entry branch, recording its outcome without applying it.
+    A standalone rule answer (FAQ, safety) cancels the pending intent classification.
+    """
+    local = dict(state)
+    rule_engine_node(local)
+    rule_result = {key: local[key] for key in RULE_KEYS if local.get(key) != state.get(key)}
+    
+    # First-message greetings come from the pre-generated pool; with history they stay personalized
+    user_input = state.get("user_input", "")
+    if (rule_result.get("response_type") == "greeting" and not state.get("chat_history")
+            and len(user_input.split()) <= SHORT_MESSAGE_WORDS):
+        greeting = greeting_pool.take(user_input)
+        if greeting:
+            rule_result = {"final_response": greeting, "response_type": "greeting", "rule_category": "greeting"}
+    
+    # Canonical redirect questions ("pcos", "what is acne") have verified answers built offline
+    if rule_result.get("route_to") and not state.get("chat_history"):
+        banked = get_answer_bank().lookup(user_input)
+        if banked:
+            rule_result = {"final_response": banked["answer"], "route_to": banked["tool"], "rule_category": "answer_bank"}
+    
+    state["rule_result"] = rule_result
+    if rule_result.get("rule_category") == "crisis":
+        # Phase one of a crisis reply: hotline numbers go out before any model call
+        get_turn(state.get("turn_id")).emit("crisis_resources", CRISIS_RESOURCES)
+    if rule_preempts_intent(state.get("user_input", ""), state["rule_result"]):
+        get_turn(state.get("turn_id")).preempt()
+    return state
+
+def join_branches(state: WorkflowState) -> Dict[str, Any]:
+    """Wait for every entry branch; apply the rule outcome when it preempts or reasoning deferred to it."""
+    rule_result = dict(state.get("rule_result") or {})
+    if rule_preempts_intent(state.get("user_input", ""), rule_result):
+        # Deterministic even when the intent call finished before the rule engine
+        return dict(rule_result, next_node="rule_engine")
+    if (state.get("next_node") or "rule_engine") == "rule_engine":
+        return rule_result
+    return {}
 
 # Create workflow graph
 workflow = StateGraph(WorkflowState)
 
-# Add nodes
-workflow.add_node("reasoning", reasoning_node(llm))
-workflow.add_node("rule_engine", rule_engine_node)
-workflow.add_node("skincare_tool", skincare_tool)
-workflow.add_node("health_advice_tool", health_advice_tool)
-workflow.add_node("search_tool", search_tool)
-workflow.add_node("product_suggestion", product_suggestion_tool)
-workflow.add_node("response", response_node(llm))
+# Entry branches run in parallel: latency is the slowest branch (the intent LLM call)
+# rather than the sum. The search prefetch starts before the graph, in _initial_state.
+# The single-call request also writes the answer, so it runs on the generator tier
+intent_llm = llm if GRAPH_MODE == SINGLE_CALL else router_llm
+workflow.add_node("reasoning", branch("reasoning", reasoning_node(intent_llm, GRAPH_MODE), async_reasoning_node(intent_llm, GRAPH_MODE)))
+workflow.add_node("rule_engine", branch("rule_engine", rule_match_node))
+workflow.add_node("product_context", branch("product_context", product_context_node))
+workflow.add_node("join", join_branches)
 
-# Set entry point
-workflow.set_entry_point("reasoning")
+# Sequential nodes after the join
+workflow.add_node("skincare_tool", branch("skincare_tool", skincare_tool))
+workflow.add_node("health_advice_tool", branch("health_advice_tool", health_advice_tool))
+# Sync for app.invoke, async (deadline + cancellation) for app.ainvoke
+workflow.add_node("search_tool", branch("search_tool", search_tool, async_search_tool))
+workflow.add_node("product_suggestion", branch("product_suggestion", product_suggestion_tool))
+workflow.add_node("response", branch("response", response_node(llm, verifier_llm)))
 
-# Add conditional edges based on reasoning output
-def route_after_reasoning(state: WorkflowState) -> str:
-    return state.get("next_node", "rule_engine")
+ENTRY_BRANCHES = ["reasoning", "rule_engine", "product_context"]
+for entry_node in ENTRY_BRANCHES:
+    workflow.add_edge(START, entry_node)
+workflow.add_edge(ENTRY_BRANCHES, "join")
 
-def route_after_rules(state: WorkflowState) -> str:
-    if state.get("final_response"):
-        return "response"
-    # Check if LLM should generate response (greeting, crisis, etc.)
-    if state.get("use_llm"):
+# Add conditional edges based on the joined branch outputs
+def route_after_join(state: WorkflowState) -> str:
+    next_node = state.get("next_node") or "rule_engine"
+    if next_node != "rule_engine":
+        return next_node
+    # A banked tool answer still gets the product suggestion gate a live tool answer would
+    if state.get("rule_category") == "answer_bank":
+        return route_after_tool(state)
+    # Reasoning deferred to the rules: a rule answer (or LLM response type) goes straight to response
+    if state.get("final_response") or state.get("use_llm"):
         return "response"
-    next_node = state.get("next_node", "response")
-    return next_node
+    return state.get("route_to") or "response"
 
-# Add edges
-workflow.add_conditional_edges(
-    "reasoning",
-    route_after_reasoning,
-    {
-        "rule_engine": "rule_engine",
-        "skincare_tool": "skincare_tool",
-        "health_advice_tool": "health_advice_tool",
-        "search_tool": "search_tool",
-        "product_suggestion": "product_suggestion",
-        "response": "response"
-    }
-)
+def route_after_tool(state: WorkflowState) -> str:
+    # Only pay for context extraction and catalog scoring when suggestions are wanted
+    if should_suggest_products(state):
+        return "product_suggestion"
+    return "response"
 
 workflow.add_conditional_edges(
-    "rule_engine",
-    route_after_rules,
+    "join",
+    route_after_join,
     {
         "skincare_tool": "skincare_tool",
         "health_advice_tool": "health_advice_tool",
@@ -98,21 +189,40 @@ workflow.add_conditional_edges(
     }
 )
 
-workflow.add_edge("skincare_tool", "product_suggestion")
-workflow.add_edge("health_advice_tool", "product_suggestion")
-workflow.add_edge("search_tool", "product_suggestion")
+for tool_node in ["skincare_tool", "health_advice_tool", "search_tool"]:
+    workflow.add_conditional_edges(
+        tool_node,
+        route_after_tool,
+        {
+            "product_suggestion": "product_suggestion",
+            "response": "response"
+        }
+    )
 workflow.add_edge("product_suggestion", "response")
 workflow.add_edge("response", END)
 
 # Compile the workflow
 app = workflow.compile()
 
-def run_workflow(user_input: str, chat_history: List[Dict[str, str]] = None) -> str:
-    """Run the workflow with user input and return the final response."""
-    if chat_history is None:
-        chat_history = []
-    
-    initial_state = {
+# Turn events (event name, data) for streaming clients, e.g. ("crisis_resources", text)
+EventListener = Callable[[str, Any], None]
+
+# Priority lane: crisis turns run on their own threads instead of queueing behind the
+# event loop's shared executor with every other request
+CRISIS_LANE = ThreadPoolExecutor(max_workers=4, thread_name_prefix='crisis')
+
+def turn_priority(user_input: str) -> str:
+    """Queue priority of the turn's LLM calls: crisis > safety > normal."""
+    if is_crisis_situation(user_input):
+        return "crisis"
+    return "safety" if is_safety_concern(user_input) else "normal"
+
+def _initial_state(user_input: str, chat_history: List[Dict[str, str]],
+                   conversation_id: Optional[str], on_event: Optional[EventListener] = None) -> Dict[str, Any]:
+    turn_id = open_turn()
+    if on_event is not None:
+        get_turn(turn_id).subscribe(on_event)
+    return {
         "user_input": user_input,
         "chat_history": chat_history,
         "intermediate_steps": [],
@@ -120,41 +230,95 @@ def run_workflow(user_input: str, chat_history: List[Dict[str, str]] = None) ->
         "next_node": "",
         "use_llm": False,
         "response_type": "",
-        "route_to": ""
+        "route_to": "",
+        "conversation_id": conversation_id or "",
+        "turn_id": turn_id,
+        # Overlap the search with intent classification and rules; unused results are released
+        "search_prefetch": start_search_prefetch(user_input) if any(
+            marker in user_input.lower() for marker in SEARCH_MARKERS) else ""
     }
+
+def run_workflow(user_input: str, chat_history: List[Dict[str, str]] = None,
+                 conversation_id: Optional[str] = None, on_event: Optional[EventListener] = None) -> str:
+    """Run the workflow with user input and return the final response."""
+    if chat_history is None:
+        chat_history = []
+    
+    initial_state = _initial_state(user_input, chat_history, conversation_id, on_event)
     
     try:
-        result = app.invoke(initial_state)
+        METRICS.increment(f'workflow.turns.{GRAPH_MODE}')
+        with METRICS.timer(f'workflow.turn.{GRAPH_MODE}'), llm_priority(turn_priority(user_input)):
+            result = app.invoke(initial_state)
+        print(f"⏱️ Node timings (ms): {result.get('branch_timings', {})}")
         return result.get('final_response', 'Sorry, I could not process your request.')
     except Exception as e:
         print(f"Error in workflow: {e}")
-        # Fallback to direct LLM response for any errors
-        try:
-            fallback_context = f"""
-            You are Aara, an empathetic AI agent specializing in women's health and skincare.
-            
-            User input: {user_input}
-            Chat history: {chat_history}
-            
-            The user said: "{user_input}"
-            
-            Please provide an appropriate response. If this is:
-            - A casual greeting/conversation: Respond warmly and redirect to health/skincare topics
-            - A health/skincare question: Provide helpful guidance
-            - Something unclear: Ask for clarification in a supportive way
-            
-            Be empathetic and helpful.
-            """
-            
-            fallback_response = llm.invoke(fallback_context)
-            response_text = fallback_response.content if hasattr(fallback_response, 'content') else str(fallback_response)
-            
-            # Add disclaimer if it's health-related
-            if any(word in user_input.lower() for word in ['health', 'skin', 'period', 'symptom', 'pain', 'advice']):
-                if 'consult a doctor' not in response_text.lower():
-                    response_text += "\n\n_Consult a doctor for medical advice._"
-            
-            return response_text
-        except Exception as fallback_error:
-            print(f"Fallback error: {fallback_error}")
-            return "I'm sorry, I'm having some technical difficulties. Please try asking your question again, and I'll do my best to help you with your health and skincare needs." 
\ No newline at end of file
+        return _fallback_response(user_input, chat_history)
+    finally:
+        release_search_prefetch(initial_state["search_prefetch"])
+        close_turn(initial_state["turn_id"])
+
+async def arun_workflow(user_input: str, chat_history: List[Dict[str, str]] = None,
+                        conversation_id: Optional[str] = None, on_event: Optional[EventListener] = None) -> str:
+    """
+    Async variant of run_workflow. Sync nodes run in worker threads; the search node runs
+    natively, so cancelling this coroutine (client disconnect) abandons in-flight searches.
+    """
+    if chat_history is None:
+        chat_history = []
+
+    if turn_priority(user_input) == "crisis":
+        METRICS.increment('workflow.crisis_lane')
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            CRISIS_LANE, partial(run_workflow, user_input, chat_history, conversation_id, on_event))
+
+    initial_state = _initial_state(user_input, chat_history, conversation_id, on_event)
+
+    try:
+        METRICS.increment(f'workflow.turns.{GRAPH_MODE}')
+        with METRICS.timer(f'workflow.turn.{GRAPH_MODE}'), llm_priority(turn_priority(user_input)):
+            result = await app.ainvoke(initial_state)
+        print(f"⏱️ Node timings (ms): {result.get('branch_timings', {})}")
+        return result.get('final_response', 'Sorry, I could not process your request.')
+    except Exception as e:
+        print(f"Error in workflow: {e}")
+        return await asyncio.to_thread(_fallback_response, user_input, chat_history)
+    finally:
+        release_search_prefetch(initial_state["search_prefetch"])
+        close_turn(initial_state["turn_id"])
+
+def _fallback_response(user_input: str, chat_history: List[Dict[str, str]]) -> str:
+    """Fallback to a direct LLM response when the graph fails."""
+    if not llm_available():
+        # Don't add load to a model API that is already failing
+        return degraded_response('', user_input)
+    try:
+        fallback_context = f"""
+        You are Aara, an empathetic AI agent specializing in women's health and skincare.
+        
+        User input: {user_input}
+        Chat history: {chat_history}
+        
+        The user said: "{user_input}"
+        
+        Please provide an appropriate response. If this is:
+        - A casual greeting/conversation: Respond warmly and redirect to health/skincare topics
+        - A health/skincare question: Provide helpful guidance
+        - Something unclear: Ask for clarification in a supportive way
+        
+        Be empathetic and helpful.
+        """
+        
+        response_text = generate_text(llm, fallback_context, 'general')
+        
+        # Add disclaimer if it's health-related
+        if any(word in user_input.lower() for word in ['health', 'skin', 'period', 'symptom', 'pain', 'advice']):
+            if 'consult a doctor' not in response_text.lower():
+                response_text += "\n\n_Consult a doctor for medical advice._"
+        
+        return response_text
+    except Exception as fallback_error:
+        print(f"Fallback error: {fallback_error}")
+        return "I'm sorry, I'm having some technical difficulties. Please try asking your question again, and I'll do my best to help you with your health and skincare needs." 
\ No newline at end of file
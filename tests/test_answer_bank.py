@@ -0,0 +1,51 @@
+import os
+import sys
+import time
+
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.agent.answer_bank import AnswerBank, BANK_FORMAT, current_versions, output_key
+
+def _bank(**metadata):
+    base = {'format': BANK_FORMAT, 'built_at': time.time(), 'versions': current_versions()}
+    return AnswerBank(
+        answers={'what is pcos': {'answer': 'Verified PCOS answer', 'tool': 'health_advice_tool', 'trigger': 'pcos'}},
+        verified_outputs={output_key('Raw tool output'): 'Verified tool output'},
+        metadata=dict(base, **metadata),
+    )
+
+def test_lookup_normalizes_questions(tmp_path):
+    """Test that banked answers are found regardless of case and punctuation."""
+    path = str(tmp_path / 'bank.json')
+    _bank().save(path)
+    bank = AnswerBank.load(path)
+    assert bank.lookup('What is PCOS?')['answer'] == 'Verified PCOS answer'
+    assert bank.lookup('what is pcos and acne') is None
+    assert bank.verified('Raw tool output ') == 'Verified tool output'
+
+def test_bank_is_stale_when_sources_change(tmp_path):
+    """Test that a bank built against other prompt/rule versions is not served."""
+    path = str(tmp_path / 'bank.json')
+    _bank(versions=dict(current_versions(), prompts='outdated')).save(path)
+    bank = AnswerBank.load(path)
+    assert bank.lookup('what is pcos') is None
+    assert bank.stats()['stale'] == 'prompts changed'
+
+def test_bank_expires_after_max_age(tmp_path):
+    """Test the age limit of the staleness policy."""
+    path = str(tmp_path / 'bank.json')
+    _bank(built_at=time.time() - 40 * 86400).save(path)
+    assert AnswerBank.load(path, max_age_days=30).answers == {}
+    assert AnswerBank.load(path).answers
+
+def test_bank_is_stale_when_verifier_model_changes(tmp_path, monkeypatch):
+    """Test that answers verified by another model are not served."""
+    from src.agent.config import load_settings
+    path = str(tmp_path / 'bank.json')
+    _bank().save(path)
+    llm = load_settings()['llm']
+    roles = dict(llm.get('roles') or {}, verifier={'model': 'another-verifier'})
+    monkeypatch.setitem(load_settings(), 'llm', dict(llm, roles=roles))
+    assert AnswerBank.load(path).stats()['stale'] == 'verifier_model changed'
@@ -0,0 +1,61 @@
+import operator
+import os
+import sys
+import time
+from typing import Annotated, Any, Dict, List, TypedDict
+
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+try:
+    from langgraph.graph import StateGraph, START, END
+    from src.agent.branches import branch, merge_dicts
+except ImportError:
+    import pytest
+    pytest.skip("LangGraph not available", allow_module_level=True)
+
+class State(TypedDict, total=False):
+    user_input: str
+    intermediate_steps: Annotated[List[Dict[str, Any]], operator.add]
+    branch_timings: Annotated[Dict[str, float], merge_dicts]
+    intent: str
+    rules: str
+
+def slow_intent(state):
+    time.sleep(0.2)
+    state['intent'] = 'skincare'
+    state['intermediate_steps'].append({'reasoning': '1'})
+    return state
+
+def slow_rules(state):
+    time.sleep(0.2)
+    state['rules'] = 'none'
+    state['intermediate_steps'].append({'rules': 'checked'})
+    return state
+
+def test_branch_returns_only_changes():
+    """Test that a node's update holds just the keys it changed and its new steps."""
+    state = {'user_input': 'hi', 'intermediate_steps': [{'old': True}]}
+    update = branch('intent', slow_intent)(state)
+    assert update['intent'] == 'skincare'
+    assert update['intermediate_steps'] == [{'reasoning': '1'}]
+    assert 'user_input' not in update and 'intent' in update['branch_timings']
+    assert state['intermediate_steps'] == [{'old': True}]
+
+def test_parallel_branches_overlap():
+    """Test that entry branches run concurrently and both timings reach the final state."""
+    graph = StateGraph(State)
+    graph.add_node('intent', branch('intent', slow_intent))
+    graph.add_node('rules', branch('rules', slow_rules))
+    graph.add_edge(START, 'intent')
+    graph.add_edge(START, 'rules')
+    graph.add_edge(['intent', 'rules'], END)
+    app = graph.compile()
+
+    start = time.perf_counter()
+    result = app.invoke({'user_input': 'hi', 'intermediate_steps': []})
+    assert time.perf_counter() - start < 0.35
+    assert result['intent'] == 'skincare' and result['rules'] == 'none'
+    assert len(result['intermediate_steps']) == 2
+    assert set(result['branch_timings']) == {'intent', 'rules'}
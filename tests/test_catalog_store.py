@@ -0,0 +1,62 @@
+import os
+import sys
+
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+try:
+    from tools.catalog_store import ProductCatalogStore, parse_price_range
+except ImportError:
+    import pytest
+    pytest.skip("Catalog store dependencies not available", allow_module_level=True)
+
+AFFILIATE_CONFIG = os.path.join(project_root, 'config', 'affiliate_links.yaml')
+
+def _store():
+    store = ProductCatalogStore(':memory:')
+    store.import_yaml(AFFILIATE_CONFIG)
+    return store
+
+def test_import_yaml():
+    """Test that the YAML catalog imports with normalized keyword/audience lists."""
+    store = _store()
+    assert store.count() > 0
+    cleanser = store.get_products(subcategory='cleansers')[0]
+    assert cleanser.name == 'CeraVe Foaming Facial Cleanser'
+    assert cleanser.recommended_for == ['oily', 'acne-prone', 'combination']
+
+def test_get_products_filters():
+    """Test category and price filtering at query time."""
+    store = _store()
+    results = store.get_products(category='skincare', max_price=12)
+    assert results
+    assert all(product.category == 'skincare' for product in results)
+    assert all(parse_price_range(product.price_range)[0] <= 12 for product in results)
+
+def test_reimport_bumps_version():
+    """Test that re-importing changes the catalog version."""
+    store = _store()
+    version = store.version()
+    store.import_yaml(AFFILIATE_CONFIG)
+    assert store.version() != version
+
+def test_startup_keeps_a_catalog_imported_from_elsewhere(tmp_path, monkeypatch):
+    """Test that the YAML auto-import only replaces catalogs it built itself."""
+    import tools.catalog_store as catalog_store
+    from src.agent.config import load_settings
+    csv_path = tmp_path / 'products.csv'
+    csv_path.write_text('name,category,subcategory,keywords\nTest Serum,skincare,serums,acne;oil\n', encoding='utf-8')
+    db_path = str(tmp_path / 'catalog.db')
+    ProductCatalogStore(db_path).import_csv(str(csv_path))
+
+    monkeypatch.setitem(load_settings(), 'catalog', {'backend': 'sqlite', 'path': db_path, 'source': AFFILIATE_CONFIG})
+    monkeypatch.setattr(catalog_store, '_default_store', None)
+    assert catalog_store.get_catalog_store().count() == 1
+
+    # A catalog the auto-import built is refreshed when its YAML file changes
+    store = catalog_store.get_catalog_store()
+    store.import_yaml(AFFILIATE_CONFIG)
+    store.set_meta('source_mtime', '0')
+    monkeypatch.setattr(catalog_store, '_default_store', None)
+    assert catalog_store.get_catalog_store().get_meta('source_mtime') == str(os.path.getmtime(AFFILIATE_CONFIG))
@@ -0,0 +1,69 @@
+import os
+import sys
+import time
+
+import pytest
+
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.agent.circuit_breaker import CircuitBreaker, CircuitOpenError, CLOSED, HALF_OPEN, OPEN, get_breaker
+
+def _fail():
+    raise ConnectionError("upstream down")
+
+def test_breaker_opens_and_rejects_fast():
+    """Test that consecutive failures open the breaker and later calls never reach the upstream."""
+    breaker = CircuitBreaker('test', failure_threshold=2, recovery_seconds=60)
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            breaker.call(_fail)
+    assert breaker.state == OPEN
+    calls = []
+    with pytest.raises(CircuitOpenError):
+        breaker.call(calls.append, 'x')
+    assert calls == []
+
+def test_half_open_lets_one_probe_through():
+    """Test half-open probing: one call at a time, success closes, failure re-opens."""
+    breaker = CircuitBreaker('test', failure_threshold=1, recovery_seconds=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.state == HALF_OPEN and breaker.accepting_calls()
+    assert breaker.allow()
+    assert not breaker.allow() and not breaker.accepting_calls()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+    time.sleep(0.06)
+    assert breaker.call(lambda: 'ok') == 'ok'
+    assert breaker.state == CLOSED
+
+def test_caller_errors_do_not_trip_the_breaker():
+    """Test that errors classified as ours (not an outage) count as the upstream answering."""
+    breaker = CircuitBreaker('test', failure_threshold=1)
+    with pytest.raises(ValueError):
+        breaker.call(lambda: int('x'), is_failure=lambda e: not isinstance(e, ValueError))
+    assert breaker.state == CLOSED
+
+def test_degraded_mode_answers_without_the_llm():
+    """Test that an open LLM breaker routes on keywords and replies from local sources."""
+    from src.agent.reasoning import reasoning_node
+    from src.agent.response import CRISIS_RESOURCES, DEGRADED_MESSAGE, degraded_response
+
+    class NoLLM:
+        def invoke(self, *args, **kwargs):
+            raise AssertionError("LLM called in degraded mode")
+
+    breaker = get_breaker('llm')
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    try:
+        state = reasoning_node(NoLLM())({'user_input': 'my period is late', 'chat_history': [], 'intermediate_steps': []})
+        assert state['next_node'] == 'health_advice_tool'
+        assert degraded_response('crisis', 'I want to end it') == CRISIS_RESOURCES
+        assert degraded_response('', 'what causes acne') != DEGRADED_MESSAGE
+        assert degraded_response('', 'tell me a joke') == DEGRADED_MESSAGE
+    finally:
+        breaker.record_success()
@@ -0,0 +1,80 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.agent.concurrency_limit import AdaptiveLimiter, LimiterTimeout, llm_priority
+from rules.rules_engine import is_safety_concern
+
+def _queue_in_background(limiter: AdaptiveLimiter, priority: str, order: list):
+    def run():
+        with llm_priority(priority):
+            limiter.acquire()
+        order.append(priority)
+        limiter.release()
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+def test_queued_calls_run_by_priority():
+    """Test that over the limit, crisis calls go before safety and normal ones."""
+    limiter = AdaptiveLimiter('test', initial_limit=1)
+    limiter.acquire()
+    order = []
+    threads = []
+    for priority in ('normal', 'safety', 'crisis'):
+        threads.append(_queue_in_background(limiter, priority, order))
+        time.sleep(0.02)
+    assert limiter.stats()['queued'] == {'crisis': 1, 'safety': 1, 'normal': 1}
+    limiter.release()
+    for thread in threads:
+        thread.join(1)
+    assert order == ['crisis', 'safety', 'normal']
+    assert is_safety_concern('I have heavy bleeding') and not is_safety_concern('what is pcos')
+
+def test_limit_grows_when_saturated_and_backs_off_on_rate_limits():
+    """Test additive increase under stable latency and multiplicative decrease on a 429."""
+    limiter = AdaptiveLimiter('test', initial_limit=2, backoff=0.5, min_limit=1)
+    for _ in range(20):
+        limiter.acquire()
+        limiter.acquire()
+        limiter.release(0.1)
+        limiter.release(0.1)
+    grown = limiter.limit
+    assert grown > 2
+    limiter.acquire()
+    limiter.release(rate_limited=True)
+    assert limiter.limit == pytest.approx(grown * 0.5)
+
+def test_latency_rise_cuts_the_limit():
+    """Test that latency well above the long-run average lowers the limit."""
+    limiter = AdaptiveLimiter('test', initial_limit=10, latency_tolerance=2.0)
+    for latency in [0.01] * 20 + [0.2] * 3:
+        limiter.acquire()
+        limiter.release(latency)
+    assert limiter.limit < 10
+
+def test_async_waiters_time_out_and_cancel_cleanly():
+    """Test that async waiters get freed slots, give up after the queue timeout, and leak nothing."""
+    limiter = AdaptiveLimiter('test', initial_limit=1, queue_timeout_seconds=0.05)
+
+    async def run():
+        await limiter.aacquire()
+        with pytest.raises(LimiterTimeout):
+            await limiter.aacquire()
+        waiter = asyncio.ensure_future(limiter.aacquire())
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        limiter.release()
+        await limiter.aacquire()
+        limiter.release()
+
+    asyncio.run(run())
+    assert limiter.stats()['inflight'] == 0
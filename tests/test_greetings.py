@@ -0,0 +1,78 @@
+import os
+import sys
+
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+try:
+    from src.agent.greetings import GreetingPool
+except ImportError:
+    import pytest
+    pytest.skip("Greeting pool dependencies not available", allow_module_level=True)
+
+class FakeMessage:
+    def __init__(self, content):
+        self.content = content
+
+class FakeLLM:
+    """Counts calls; approves every verification request."""
+    def __init__(self):
+        self.calls = 0
+
+    def invoke(self, prompt, **kwargs):
+        self.calls += 1
+        if 'YOUR VERIFICATION' in prompt:
+            return FakeMessage('VERIFICATION: APPROVED')
+        seed = prompt.split("User's greeting:")[1].split('\n')[0].strip()
+        return FakeMessage(f'{seed.title()}! Variant {self.calls}')
+
+def test_empty_pool_defers_to_llm_path():
+    """Test that a disabled or empty pool returns None so the response node generates."""
+    assert GreetingPool(FakeLLM(), enabled=False).take('hi') is None
+
+def test_pool_matches_seed_and_rotates():
+    """Test that greetings are served by seed, rotating through the verified variants."""
+    llm = FakeLLM()
+    pool = GreetingPool(llm, seeds=['hi', 'good morning'], variants_per_seed=2)
+    assert pool.refresh() == 4
+    pool._thread = object()  # don't start the background loop in tests
+
+    calls = llm.calls
+    first, second, third = pool.take('hi!'), pool.take('hiii'), pool.take('hi')
+    assert first.startswith('Hi!') and first != second and third == first
+    assert pool.take('Good morning Aara').startswith('Good Morning!')
+    assert llm.calls == calls
+
+class RejectingLLM(FakeLLM):
+    """Rewrites every greeting it verifies."""
+    def invoke(self, prompt, **kwargs):
+        if 'YOUR VERIFICATION' in prompt:
+            return FakeMessage('VERIFICATION: NEEDS_IMPROVEMENT\nIMPROVED_RESPONSE: Hello.')
+        return super().invoke(prompt, **kwargs)
+
+def test_only_approved_variants_are_pooled():
+    """Test that greetings the verifier rewrote are left out of the pool."""
+    pool = GreetingPool(FakeLLM(), seeds=['hey'], variants_per_seed=2, verifier_llm=RejectingLLM())
+    assert pool.refresh() == 0
+    pool._thread = object()
+    assert pool.take('hey') is None
+
+def test_failed_refresh_retries_with_backoff(monkeypatch):
+    """Test that an empty refresh is retried after retry_seconds, doubling, not after refresh_seconds."""
+    import src.agent.greetings as greetings
+    pool = GreetingPool(FakeLLM(), refresh_seconds=3600, retry_seconds=5)
+    monkeypatch.setattr(pool, 'refresh', lambda: 0)
+    sleeps = []
+
+    def fake_sleep(seconds):
+        sleeps.append(seconds)
+        if len(sleeps) == 3:
+            raise SystemExit
+
+    monkeypatch.setattr(greetings.time, 'sleep', fake_sleep)
+    try:
+        pool._refresh_loop()
+    except SystemExit:
+        pass
+    assert sleeps == [5, 10, 20]
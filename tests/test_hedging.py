@@ -0,0 +1,94 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.agent.hedging import Hedger
+
+def _warmed(hedger: Hedger, seconds: float = 0.01) -> Hedger:
+    for _ in range(hedger.min_samples):
+        hedger.record_latency(seconds)
+    return hedger
+
+class SlowFirst:
+    """The first request stalls, any later one answers at once."""
+
+    def __init__(self, stall: float = 1.0):
+        self.stall = stall
+        self.calls = 0
+        self.cancelled = False
+        self._lock = threading.Lock()
+
+    def invoke(self, prompt):
+        with self._lock:
+            self.calls += 1
+            first = self.calls == 1
+        if first:
+            time.sleep(self.stall)
+            return 'slow'
+        return 'fast'
+
+    async def ainvoke(self, prompt):
+        self.calls += 1
+        if self.calls == 1:
+            try:
+                await asyncio.sleep(self.stall)
+            except asyncio.CancelledError:
+                self.cancelled = True
+                raise
+            return 'slow'
+        return 'fast'
+
+def test_slow_request_is_hedged_and_the_duplicate_wins():
+    """Test that a request slower than p95 gets a duplicate whose reply is used."""
+    hedger = _warmed(Hedger('test', enabled=True, min_samples=5, max_extra_load=1.0))
+    llm = SlowFirst()
+    start = time.perf_counter()
+    assert hedger.call(llm.invoke, 'prompt') == 'fast'
+    assert time.perf_counter() - start < 0.5
+    stats = hedger.stats()
+    assert stats['hedged'] == 1 and stats['hedge_won'] == 1
+    assert stats['win_rate'] == 1.0
+
+def test_async_loser_is_cancelled():
+    """Test that the losing async request is cancelled, not left running."""
+    hedger = _warmed(Hedger('test', enabled=True, min_samples=5, max_extra_load=1.0))
+    llm = SlowFirst()
+
+    async def run():
+        result = await hedger.acall(llm.ainvoke, 'prompt')
+        await asyncio.sleep(0)
+        return result
+
+    assert asyncio.run(run()) == 'fast'
+    assert llm.cancelled
+
+def test_hedges_stay_within_the_load_budget():
+    """Test that duplicates stop once they would exceed max_extra_load."""
+    hedger = _warmed(Hedger('test', enabled=True, percentile=50, max_extra_load=0.5), seconds=0.001)
+    slow = lambda: time.sleep(0.02) or 'ok'
+    for _ in range(4):
+        hedger.call(slow)
+    stats = hedger.stats()
+    assert stats['requests'] == 4
+    assert stats['hedged'] == 2 and stats['budget_denied'] == 2
+
+def test_no_hedging_until_latencies_are_known_or_when_disabled():
+    """Test that a cold or disabled hedger sends exactly one request."""
+    for hedger in (Hedger('test', enabled=True, min_samples=5), _warmed(Hedger('test', enabled=False, min_samples=5))):
+        llm = SlowFirst(stall=0.05)
+        assert hedger.call(llm.invoke, 'prompt') == 'slow'
+        assert llm.calls == 1
+
+def test_abandoned_call_is_not_hedged():
+    """Test that no duplicate is sent once the caller has stopped waiting for the result."""
+    hedger = _warmed(Hedger('test', enabled=True, min_samples=5, max_extra_load=1.0))
+    llm, abandoned = SlowFirst(stall=0.1), threading.Event()
+    abandoned.set()
+    assert hedger.call(llm.invoke, 'prompt', abandoned=abandoned) == 'slow'
+    assert llm.calls == 1 and hedger.stats()['hedged'] == 0
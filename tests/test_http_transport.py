@@ -0,0 +1,30 @@
+import os
+import sys
+
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.agent.http_transport import HTTPTransport
+
+def test_sessions_share_the_pool_but_not_headers():
+    """Test that requests consumers reuse one connection pool with their own headers."""
+    transport = HTTPTransport(per_host_connections=5)
+    tavily, google = transport.session(), transport.session()
+    tavily.headers['Authorization'] = 'Bearer tvly-secret'
+    assert tavily.get_adapter('https://api.tavily.com') is google.get_adapter('https://www.googleapis.com')
+    assert 'Authorization' not in google.headers
+
+def test_llm_clients_use_the_shared_http_clients():
+    """Test that every model tier is built on the transport's httpx clients."""
+    from src.agent.llm_factory import LLMFactory
+    transport = HTTPTransport()
+    factory = LLMFactory({'roles': {'router': {'model': 'gpt-4o-mini'}}}, api_key='test-key', transport=transport)
+    assert factory.get('router').http_client is transport.client
+    assert factory.get('generator').http_async_client is transport.async_client
+
+def test_warm_up_survives_unreachable_hosts():
+    """Test that a failed handshake is reported instead of raised."""
+    transport = HTTPTransport(warm_up_urls=['http://127.0.0.1:9'])
+    assert transport.warm_up()['http://127.0.0.1:9'].startswith('failed')
+    assert transport.stats()['http2'] is False
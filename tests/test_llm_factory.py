@@ -0,0 +1,44 @@
+import os
+import sys
+
+import pytest
+
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+try:
+    from src.agent.llm_factory import LLMFactory
+except ImportError as e:
+    pytest.skip(f"langchain_openai not available: {e}", allow_module_level=True)
+
+SETTINGS = {
+    'model_name': 'gpt-4o',
+    'roles': {
+        'router': {'model': 'gpt-4o-mini', 'timeout': 10, 'max_tokens': 5, 'temperature': 0},
+        'verifier': {'model': 'gpt-4o-mini', 'timeout': 10, 'max_tokens': 5, 'temperature': 0},
+        'generator': {'max_tokens': 1000, 'temperature': 0.7},
+    },
+}
+
+def test_roles_get_their_own_tier():
+    """Test that each role is built with its model, timeout, max_tokens and temperature."""
+    factory = LLMFactory(SETTINGS, api_key='test-key')
+    router = factory.get('router')
+    assert router.model_name == 'gpt-4o-mini'
+    assert router.max_tokens == 5 and router.temperature == 0 and router.request_timeout == 10
+    generator = factory.get('generator')
+    assert generator.model_name == 'gpt-4o' and generator.max_tokens == 1000
+    assert factory.describe()['summarizer'] == 'gpt-4o'
+
+def test_identical_tiers_share_a_client():
+    """Test that clients are shared per tier, not per role."""
+    factory = LLMFactory(SETTINGS, api_key='test-key')
+    assert factory.get('router') is factory.get('verifier')
+    assert factory.get('router') is not factory.get('generator')
+    assert factory.get('generator') is factory.get('generator')
+
+def test_unknown_role_is_rejected():
+    """Test that a typo in a role name fails loudly."""
+    with pytest.raises(ValueError):
+        LLMFactory(SETTINGS, api_key='test-key').get('planner')
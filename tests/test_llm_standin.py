@@ -0,0 +1,70 @@
+import os
+import sys
+
+import openai
+import pytest
+
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.agent.llm_factory import LLMFactory
+from src.agent.llm_standin import StandInChatModel, StandInProvider, serve_standin, standin_reply
+from src.agent.reasoning import _intent_prompt
+from src.agent.single_call import parse_single_call, single_call_prompt
+
+def test_replies_are_deterministic_per_prompt_type():
+    """Test intent numbers, verification verdicts and parseable single-call JSON."""
+    assert standin_reply(_intent_prompt('what is a good routine for oily skin', [])) == '1'
+    assert standin_reply(_intent_prompt('my period is late', [])) == '2'
+    assert standin_reply(_intent_prompt('tell me a joke', [])) == '5'
+    assert standin_reply('...\n**YOUR VERIFICATION**:\n') == 'VERIFICATION: APPROVED'
+    parsed = parse_single_call(standin_reply(single_call_prompt('how do I sleep better', []), json_mode=True))
+    assert parsed['intent'] == '5' and parsed['answer']
+    assert standin_reply('Tell me about sleep') == standin_reply('Tell me about sleep')
+
+def test_factory_builds_the_in_process_standin():
+    """Test that llm.backend selects the stand-in, with the tier's output budget."""
+    factory = LLMFactory({'backend': 'standin', 'roles': {'router': {'model': 'small', 'max_tokens': 5}}})
+    router = factory.get('router')
+    assert isinstance(router, StandInChatModel)
+    message = router.invoke('Write a long essay about hydration')
+    assert message.response_metadata['finish_reason'] == 'length'
+    assert len(message.content) <= 20
+
+def test_simulated_failures_raise_openai_errors(monkeypatch):
+    """Test that stand-in failures are the OpenAI client's error types."""
+    import src.agent.llm_standin as standin
+    monkeypatch.setattr(standin, '_provider', StandInProvider(rate_limit_rate=1.0))
+    with pytest.raises(openai.RateLimitError):
+        StandInChatModel().invoke('hello')
+    monkeypatch.setattr(standin, '_provider', StandInProvider(error_rate=1.0))
+    with pytest.raises(openai.InternalServerError):
+        StandInChatModel().invoke('hello')
+
+def test_latency_distribution_matches_its_settings():
+    """Test that the lognormal provider time has the configured median and p99."""
+    provider = StandInProvider(median_ms=100, p99_ms=1000, seed=1)
+    delays = sorted(provider.next_call()[0] for _ in range(5000))
+    assert delays[2500] == pytest.approx(0.1, rel=0.1)
+    assert delays[4950] == pytest.approx(1.0, rel=0.25)
+
+def test_http_standin_serves_the_openai_client(monkeypatch):
+    """Test the OpenAI-compatible server end to end with the real client the factory builds."""
+    from src.agent.config import load_settings
+    server = serve_standin(port=0)
+    try:
+        monkeypatch.setitem(load_settings(), 'standin', {'url': f'http://127.0.0.1:{server.server_address[1]}/v1'})
+        router = LLMFactory({'backend': 'standin_http'}).get('router')
+        assert router.invoke(_intent_prompt('suggest products for dry skin', [])).content == '4'
+    finally:
+        server.shutdown()
+
+def test_verifier_adds_the_disclaimer_to_medical_answers():
+    """Test that health and skincare answers without a disclaimer come back improved, others approved."""
+    def request(question, response):
+        return f'**USER\'S ORIGINAL QUESTION**: "{question}"\n\n**GENERATED RESPONSE**: "{response}"\n\n**YOUR VERIFICATION**:\n'
+    improved = standin_reply(request('I have missed my period', 'Track your cycle.'))
+    assert improved.startswith('VERIFICATION: NEEDS_IMPROVEMENT') and 'Consult a doctor' in improved
+    assert standin_reply(request('tell me a joke', 'Why did the serum...')) == 'VERIFICATION: APPROVED'
+    assert standin_reply(request('my period is late', 'Consult a doctor soon.')) == 'VERIFICATION: APPROVED'
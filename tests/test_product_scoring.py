@@ -0,0 +1,60 @@
+import os
+import sys
+
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+try:
+    from tools.catalog_store import Product
+    from tools.product_scoring import ProductFeatureIndex
+except ImportError:
+    import pytest
+    pytest.skip("Product scoring dependencies not available", allow_module_level=True)
+
+def _product(name, subcategory, keywords, recommended_for, price_range="$10-12"):
+    return Product(name=name, description="", category="skincare", subcategory=subcategory,
+                   price_range=price_range, affiliate_link="", keywords=keywords,
+                   recommended_for=recommended_for, why_recommended="")
+
+PRODUCTS = [
+    _product("Gel Cleanser", "cleansers", ["acne", "oily skin"], ["oily"]),
+    _product("Rich Cream", "moisturizers", ["dryness"], ["dry"], price_range="$30-40"),
+    _product("Oil Serum", "serums", ["acne", "pores"], ["oily", "combination"]),
+]
+
+def _context(**overrides):
+    context = {'skin_type': '', 'skin_concerns': [], 'health_concerns': [], 'mentioned_products': []}
+    context.update(overrides)
+    return context
+
+def test_weights_match_original_scoring():
+    """Test skin type (3), concern (2) and mentioned product (1) weights."""
+    index = ProductFeatureIndex(PRODUCTS)
+    scores = index.score(_context(skin_type='oily', skin_concerns=['oily_skin'], mentioned_products=['cleanser']))
+    assert list(scores) == [3 + 2 + 1, 0, 3]
+
+def test_top_k_ties_keep_catalog_order():
+    """Test that equal scores are returned in catalog order."""
+    index = ProductFeatureIndex(PRODUCTS)
+    ranked = index.top_k(_context(skin_concerns=['acne']), k=2)
+    assert [product.name for product, score in ranked] == ["Gel Cleanser", "Oil Serum"]
+
+def test_top_k_filters_and_batch():
+    """Test price filtering and that batch scoring matches single scoring."""
+    index = ProductFeatureIndex(PRODUCTS)
+    assert index.top_k(_context(skin_type='dry'), k=3, max_price=20) == []
+    contexts = [_context(skin_type='dry'), _context(skin_concerns=['acne'], mentioned_products=['serum'])]
+    batch = index.score_batch(contexts)
+    assert all((batch[i] == index.score(c)).all() for i, c in enumerate(contexts))
+
+def test_store_backed_index_loads_only_ranked_products():
+    """Test that an index built from store feature columns ranks the same and hydrates just the top k."""
+    from tools.catalog_store import ProductCatalogStore
+    store = ProductCatalogStore(':memory:')
+    store.import_products(PRODUCTS)
+    index = ProductFeatureIndex(store=store)
+    assert index.products is None
+    context = _context(skin_type='oily', skin_concerns=['acne'])
+    assert index.top_k(context, k=2) == ProductFeatureIndex(PRODUCTS).top_k(context, k=2)
+    assert [product.name for product, score in index.top_k(context, k=3, max_price=20)] == ["Gel Cleanser", "Oil Serum"]
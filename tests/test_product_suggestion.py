@@ -0,0 +1,44 @@
+import os
+import sys
+
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+try:
+    from tools.product_suggestion import product_suggestion_tool, should_suggest_products
+    from tools.user_profile import PROFILE_STORE
+except ImportError:
+    import pytest
+    pytest.skip("Product suggestion dependencies not available", allow_module_level=True)
+
+def _state(user_input, conversation_id='', chat_history=None):
+    return {'user_input': user_input, 'chat_history': chat_history or [], 'intermediate_steps': [],
+            'final_response': 'Tool answer.', 'conversation_id': conversation_id}
+
+def test_gate_skips_without_context():
+    """Test that informational turns without profile context skip the stage."""
+    assert not should_suggest_products(_state('how often should I wash my face?'))
+
+def test_gate_runs_on_purchase_intent():
+    """Test that explicit purchase intent always runs the stage."""
+    assert should_suggest_products(_state('what should I buy for my skin?'))
+
+def test_gate_cooldown_after_suggestion():
+    """Test that a conversation isn't offered products again until the cooldown passes."""
+    PROFILE_STORE.drop('gate-test')
+    state = _state('routine for oily skin with acne', conversation_id='gate-test')
+    assert should_suggest_products(state)
+    result = product_suggestion_tool(state)
+    assert 'Product Suggestions' in result['final_response']
+    history = [{'user': 'routine for oily skin with acne', 'Aara': result['final_response']}]
+    assert not should_suggest_products(_state('and at night?', 'gate-test', history))
+
+def test_entry_branch_extracts_context_without_ranking():
+    """Test that the product_context branch leaves ranking to the gated product_suggestion node."""
+    from tools.product_suggestion import SUGGESTION_CACHE, product_context_node
+    before = SUGGESTION_CACHE.stats()
+    state = product_context_node(_state('hi! my oily skin keeps breaking out with acne'))
+    assert state['product_context']['skin_type'] == 'oily'
+    after = SUGGESTION_CACHE.stats()
+    assert (after['hits'], after['misses']) == (before['hits'], before['misses'])
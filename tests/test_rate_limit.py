@@ -0,0 +1,87 @@
+import os
+import sys
+
+import pytest
+
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.agent.rate_limit import MemoryBucketStore, QuotaLimiter, RateLimitExceeded, SQLiteBucketStore, estimate_tokens
+
+def test_calls_are_shaped_to_the_token_quota():
+    """Test that calls within the bucket go at once and the next one waits for the refill."""
+    quota = QuotaLimiter('test', MemoryBucketStore(), requests_per_minute=600, tokens_per_minute=6000)
+    assert quota.reserve(4000) == 0
+    assert quota.reserve(1000) == 0
+    # 1000 tokens short at 100 tokens/second
+    assert quota.reserve(2000) == pytest.approx(10, abs=0.1)
+
+def test_long_waits_are_rejected_and_refunded():
+    """Test that a call over max_wait_seconds fails without using up quota."""
+    quota = QuotaLimiter('test', MemoryBucketStore(), requests_per_minute=60, max_wait_seconds=1.5)
+    for _ in range(60):
+        quota.reserve()
+    assert quota.reserve() == pytest.approx(1, abs=0.1)
+    with pytest.raises(RateLimitExceeded):
+        quota.reserve()
+    # the refund leaves the bucket where the previous call left it
+    quota.max_wait_seconds = 10
+    assert quota.reserve() == pytest.approx(2, abs=0.1)
+
+def test_actual_usage_settles_the_estimate():
+    """Test that tokens the estimate over-reserved are given back."""
+    quota = QuotaLimiter('test', MemoryBucketStore(), tokens_per_minute=6000)
+    quota.reserve(6000)
+    quota.settle(6000, 1000)
+    assert quota.reserve(5000) == pytest.approx(0, abs=0.1)
+
+def test_sqlite_buckets_are_shared_between_workers(tmp_path):
+    """Test that two stores on one file (two worker processes) draw from the same bucket."""
+    path = str(tmp_path / 'rate_limits.db')
+    first = QuotaLimiter('openai', SQLiteBucketStore(path), requests_per_minute=60)
+    second = QuotaLimiter('openai', SQLiteBucketStore(path), requests_per_minute=60)
+    for _ in range(60):
+        assert first.reserve() == 0
+    assert second.reserve() == pytest.approx(1, abs=0.1)
+
+def test_token_estimate_is_never_zero():
+    """Test that prompts get a positive estimate with or without tiktoken data."""
+    assert estimate_tokens('') >= 0
+    assert 0 < estimate_tokens('What helps with period cramps?') < 30
+
+def test_failed_and_queued_out_calls_refund_their_tokens(monkeypatch):
+    """Test that a limiter timeout or a failed call gives its reserved tokens back."""
+    import openai
+    import src.agent.llm_factory as llm_factory
+    import src.agent.llm_standin as standin
+    from src.agent.concurrency_limit import AdaptiveLimiter, LimiterTimeout
+    from src.agent.llm_standin import StandInProvider
+
+    quota = QuotaLimiter('openai', MemoryBucketStore(), tokens_per_minute=6000)
+    monkeypatch.setattr(llm_factory, 'get_quota', lambda upstream: quota)
+    model = llm_factory.LimitedStandInChatModel(max_tokens=2000)
+
+    limiter = AdaptiveLimiter('test', initial_limit=1, queue_timeout_seconds=0.01)
+    limiter.acquire()
+    monkeypatch.setattr(llm_factory, 'get_limiter', lambda model_name: limiter)
+    with pytest.raises(LimiterTimeout):
+        model.invoke('hello')
+    limiter.release()
+
+    monkeypatch.setattr(standin, '_provider', StandInProvider(error_rate=1.0))
+    with pytest.raises(openai.InternalServerError):
+        model.invoke('hello')
+    # Both 2000+ token reservations were refunded, so the whole bucket is still free
+    assert quota.reserve(6000) == pytest.approx(0, abs=0.1)
+
+def test_async_reservations_on_sqlite_run_off_the_event_loop(tmp_path, monkeypatch):
+    """Test that async callers reserve SQLite buckets in a worker thread."""
+    import asyncio
+    import threading
+    quota = QuotaLimiter('openai', SQLiteBucketStore(str(tmp_path / 'rate_limits.db')), requests_per_minute=60)
+    threads = []
+    reserve = quota.reserve
+    monkeypatch.setattr(quota, 'reserve', lambda tokens=0: threads.append(threading.current_thread()) or reserve(tokens))
+    asyncio.run(quota.aacquire())
+    assert threads and threads[0] is not threading.main_thread()
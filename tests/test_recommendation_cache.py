@@ -0,0 +1,59 @@
+import os
+import sys
+
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from tools.recommendation_cache import RecommendationCache, context_signature
+
+class FakeTool:
+    """Minimal stand-in for ProductSuggestionTool that counts lookups."""
+    def __init__(self):
+        self.catalog_version = ('test', 1)
+        self.lookups = 0
+
+    def get_relevant_products(self, context, max_suggestions=3, **filters):
+        self.lookups += 1
+        return [context['skin_type'] or 'any']
+
+    def build_suggestion_block(self, products, context):
+        return f"block:{products[0]}"
+
+def _context(**overrides):
+    context = {'skin_type': '', 'skin_concerns': [], 'health_concerns': [], 'mentioned_products': []}
+    context.update(overrides)
+    return context
+
+def test_signature_ignores_concern_order():
+    """Test that concern order does not change the cache key."""
+    a = context_signature(_context(skin_concerns=['acne', 'redness']), 3)
+    b = context_signature(_context(skin_concerns=['redness', 'acne']), 3)
+    assert a == b
+
+def test_repeat_context_is_a_hit():
+    """Test that a repeated context is served without another lookup."""
+    cache, tool = RecommendationCache(), FakeTool()
+    first = cache.recommend(tool, _context(skin_type='oily'))
+    second = cache.recommend(tool, _context(skin_type='oily'))
+    assert first == second == (['oily'], 'block:oily')
+    assert tool.lookups == 1
+    assert cache.stats()['hits'] == 1
+
+def test_catalog_version_change_invalidates():
+    """Test that a new catalog version drops cached entries."""
+    cache, tool = RecommendationCache(), FakeTool()
+    cache.recommend(tool, _context(skin_type='dry'))
+    tool.catalog_version = ('test', 2)
+    cache.recommend(tool, _context(skin_type='dry'))
+    assert tool.lookups == 2
+
+def test_yaml_catalog_hits_across_tool_instances(monkeypatch):
+    """Test that the YAML backend's catalog version is stable, so new tool instances hit the cache."""
+    from src.agent.config import load_settings
+    from tools.product_suggestion import ProductSuggestionTool
+    monkeypatch.setitem(load_settings(), 'catalog', {'backend': 'yaml'})
+    cache = RecommendationCache()
+    cache.recommend(ProductSuggestionTool(), _context(skin_type='oily'))
+    cache.recommend(ProductSuggestionTool(), _context(skin_type='oily'))
+    assert cache.stats()['hits'] == 1
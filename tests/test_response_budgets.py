@@ -0,0 +1,45 @@
+import os
+import sys
+
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from langchain_core.messages import AIMessage
+
+from src.agent.metrics import METRICS
+from src.agent.response import VERIFICATION_CACHE, generate_text, response_budget, trim_to_sentence, verify_response
+
+class BudgetedFake:
+    """Records the max_tokens it was called with and reports a cut-off reply when asked to."""
+
+    def __init__(self, content: str, finish_reason: str = 'stop'):
+        self.content = content
+        self.finish_reason = finish_reason
+        self.max_tokens = []
+
+    def invoke(self, prompt, **kwargs):
+        self.max_tokens.append(kwargs.get('max_tokens'))
+        return AIMessage(content=self.content, response_metadata={'finish_reason': self.finish_reason})
+
+def test_generation_uses_the_route_budget():
+    """Test that each response type's budget is passed as max_tokens."""
+    llm = BudgetedFake('Hi there! So good to see you.')
+    assert generate_text(llm, 'prompt', 'greeting') == 'Hi there! So good to see you.'
+    assert llm.max_tokens == [response_budget('greeting')]
+    assert response_budget('greeting') < response_budget('crisis')
+
+def test_truncated_reply_ends_on_a_full_sentence():
+    """Test that a reply cut at its budget is trimmed and counted."""
+    before = METRICS.counter('response_budget.general.truncated')
+    llm = BudgetedFake('Drink water regularly. Sleep at least seven hours. Try to keep a consistent sched', 'length')
+    assert generate_text(llm, 'prompt', 'general') == 'Drink water regularly. Sleep at least seven hours.'
+    assert METRICS.counter('response_budget.general.truncated') == before + 1
+    assert trim_to_sentence('A very long sentence with no end in sight that got cut').endswith('…')
+
+def test_truncated_improvement_keeps_the_original():
+    """Test that verification can't replace a response with a cut-off improvement."""
+    VERIFICATION_CACHE.clear()
+    llm = BudgetedFake('VERIFICATION: NEEDS_IMPROVEMENT\nIMPROVED_RESPONSE: An endless rewrite that', 'length')
+    assert verify_response(llm, 'what is pcos', 'PCOS answer') == 'PCOS answer'
+    assert llm.max_tokens == [response_budget('verification')]
@@ -6,7 +6,8 @@ project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, project_root)
 
 try:
-    from rules.rules_engine import rule_engine_node
+    from rules.rules_engine import rule_engine_node, rule_preempts_intent
+    from src.agent.turn_control import TurnControl
 except ImportError:
     import pytest
     pytest.skip("Rules engine dependencies not available", allow_module_level=True)
@@ -36,4 +37,80 @@ def test_no_rule_match():
     """Test that unmatched input passes through correctly."""
     state = {'user_input': 'hello there', 'intermediate_steps': []}
     result = rule_engine_node(state)
-    assert 'rules_checked' in str(result['intermediate_steps']) 
\ No newline at end of file
+    assert 'rules_checked' in str(result['intermediate_steps']) 
+
+def test_faq_rule_preempts_intent():
+    """Test that curated FAQ answers preempt intent classification."""
+    result = rule_engine_node({'user_input': 'who are you', 'intermediate_steps': []})
+    assert result['rule_category'] == 'agent_info'
+    assert rule_preempts_intent('who are you', result)
+
+def test_broad_trigger_only_preempts_short_messages():
+    """Test that broad triggers like 'help' don't hijack real questions."""
+    question = 'can you help me build a routine for oily skin?'
+    assert not rule_preempts_intent(question, rule_engine_node({'user_input': question, 'intermediate_steps': []}))
+    assert rule_preempts_intent('help', rule_engine_node({'user_input': 'help', 'intermediate_steps': []}))
+
+def test_faq_and_emergency_words_dont_hijack_questions():
+    """Test that FAQ triggers and single emergency words inside longer questions wait for intent classification."""
+    for question in ['what can you do about my acne?', 'Is substance abuse linked to skin problems?']:
+        assert not rule_preempts_intent(question, rule_engine_node({'user_input': question, 'intermediate_steps': []}))
+    message = 'I have chest pain and feel dizzy'
+    result = rule_engine_node({'user_input': message, 'intermediate_steps': []})
+    assert result['rule_category'] == 'emergencies' and rule_preempts_intent(message, result)
+
+def test_rule_engine_error_does_not_preempt(monkeypatch):
+    """Test that the rule engine's error fallback is tagged and never replaces the model's answer."""
+    import rules.rules_engine as rules_engine
+    def broken_rules():
+        raise OSError('rules missing')
+    monkeypatch.setattr(rules_engine, 'load_rules', broken_rules)
+    result = rule_engine_node({'user_input': 'hi there', 'intermediate_steps': []})
+    assert result['rule_category'] == 'error' and result['final_response']
+    assert not rule_preempts_intent('hi there', result)
+
+def test_turn_control_runs_late_callbacks():
+    """Test that a callback registered after preemption still fires."""
+    control, fired = TurnControl(), []
+    control.on_preempt(lambda: fired.append('early'))
+    control.preempt()
+    control.on_preempt(lambda: fired.append('late'))
+    assert fired == ['early', 'late'] and control.preempted
+
+def test_preempted_sync_intent_call_is_recorded_as_abandoned():
+    """Test that a running intent call the rule engine preempts is counted as abandoned, not cancelled."""
+    import threading
+    from src.agent.metrics import METRICS
+    from src.agent.reasoning import reasoning_node
+    from src.agent.turn_control import close_turn, get_turn, open_turn
+
+    started, release = threading.Event(), threading.Event()
+    class SlowLLM:
+        def invoke(self, prompt):
+            started.set()
+            release.wait(5)
+            return '1'
+
+    turn_id = open_turn()
+    threading.Thread(target=lambda: started.wait(5) and get_turn(turn_id).preempt()).start()
+    abandoned = METRICS.counter('reasoning.intent_abandoned')
+    try:
+        state = reasoning_node(SlowLLM())({'user_input': 'who are you', 'chat_history': [],
+                                           'intermediate_steps': [], 'turn_id': turn_id})
+    finally:
+        release.set()
+        close_turn(turn_id)
+    assert state['next_node'] == 'rule_engine'
+    assert METRICS.counter('reasoning.intent_abandoned') == abandoned + 1
+
+def test_crisis_preempts_and_emits_to_listeners():
+    """Test that crisis turns skip intent classification and can stream early events."""
+    message = 'I want to end it all'
+    result = rule_engine_node({'user_input': message, 'intermediate_steps': []})
+    assert result['rule_category'] == 'crisis' and result['response_type'] == 'crisis'
+    assert rule_preempts_intent(message, result)
+
+    control, received = TurnControl(), []
+    control.subscribe(lambda event, data: received.append(event))
+    control.emit('crisis_resources', '988')
+    assert received == ['crisis_resources']
@@ -0,0 +1,68 @@
+import os
+import sys
+import time
+
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+os.environ.setdefault('TAVILY_API_KEY', 'test-key')
+
+try:
+    import tools.search as search
+    from tools.knowledge_base import knowledge_base_answer
+    from tools.search_cache import SearchCache
+except ImportError:
+    import pytest
+    pytest.skip("Search dependencies not available", allow_module_level=True)
+
+def _fake_tavily(delays):
+    def fake_search(query, **kwargs):
+        time.sleep(delays.get(query, 0))
+        return {'answer': f'answer for {query}', 'results': [{'title': query, 'url': f'https://example.com/{len(query)}'}]}
+    return fake_search
+
+def test_reformulate_queries():
+    """Test that the original message comes first and reformulations are deduplicated."""
+    queries = search.reformulate_queries("Can you tell me the latest research on acne?")
+    assert queries[0] == "Can you tell me the latest research on acne?"
+    assert "latest research on acne" in queries
+    assert len(queries) == len(set(queries)) <= search.MAX_SEARCH_QUERIES
+
+def test_fan_out_merges_answers_and_sources(monkeypatch):
+    """Test that the primary answer leads and sources from every query are listed."""
+    monkeypatch.setattr(search.client, 'search', _fake_tavily({}))
+    monkeypatch.setattr(search, 'search_cache', SearchCache())
+    state = search.search_tool({'user_input': 'latest research on acne?'})
+    assert state['final_response'].startswith('answer for latest research on acne?')
+    assert '**Sources:**' in state['final_response']
+
+def test_deadline_falls_back_to_knowledge_base(monkeypatch):
+    """Test that a slow search returns local passages within the deadline."""
+    query = 'recent research on endometriosis'
+    monkeypatch.setattr(search.client, 'search', _fake_tavily({q: 1.0 for q in search.reformulate_queries(query)}))
+    monkeypatch.setattr(search, 'search_cache', SearchCache())
+    monkeypatch.setattr(search, 'SEARCH_DEADLINE_SECONDS', 0.05)
+
+    start = time.perf_counter()
+    state = search.search_tool({'user_input': query})
+    assert time.perf_counter() - start < 0.5
+    assert state['final_response'] == knowledge_base_answer(query)
+    assert 'ENDOMETRIOSIS' in state['final_response']
+
+def test_prefetch_is_claimed_by_search_node(monkeypatch):
+    """Test that the search node reuses in-flight prefetched queries instead of searching again."""
+    calls = []
+    def fake_search(query, **kwargs):
+        calls.append(query)
+        return {'answer': f'answer for {query}', 'results': []}
+    monkeypatch.setattr(search.client, 'search', fake_search)
+    monkeypatch.setattr(search, 'search_cache', SearchCache())
+
+    query = 'latest research on pcos'
+    token = search.start_search_prefetch(query)
+    state = search.search_tool({'user_input': query, 'search_prefetch': token})
+    assert state['final_response'].startswith('answer for latest research on pcos')
+    assert len(calls) == len(search.reformulate_queries(query))
+    # Claimed prefetches are gone; releasing afterwards is a no-op
+    search.release_search_prefetch(token)
+    assert token not in search._prefetches
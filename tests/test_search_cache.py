@@ -0,0 +1,50 @@
+import os
+import sys
+import time
+
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from tools.search_cache import SearchCache, normalize_query
+
+def test_normalize_query():
+    """Test that case, punctuation and spacing don't change the key."""
+    assert normalize_query("Latest  research on PCOS?") == normalize_query("latest research on pcos")
+
+def test_disk_tier_survives_restart(tmp_path):
+    """Test that entries persisted to SQLite are served by a new cache instance."""
+    db_path = str(tmp_path / 'search.db')
+    SearchCache(db_path=db_path).put('pcos research', {'answer': 'cached'})
+    value, state = SearchCache(db_path=db_path).get('PCOS research!')
+    assert state == 'fresh' and value == {'answer': 'cached'}
+
+def test_expired_rows_are_purged(tmp_path):
+    """Test that disk entries past their stale window are deleted at open and on put."""
+    import sqlite3
+    db_path = str(tmp_path / 'search.db')
+    cache = SearchCache(db_path=db_path, stale_seconds=60, purge_every=2)
+    cache.put('old', {'answer': 'gone'}, ttl_seconds=-120)
+    cache.put('stale', {'answer': 'kept'}, ttl_seconds=-30)
+    stored_keys = lambda: sqlite3.connect(db_path).execute('SELECT key FROM search_cache ORDER BY key').fetchall()
+    assert stored_keys() == [('stale',)]
+
+    cache.put('expiring', {'answer': 'gone'}, ttl_seconds=-120)
+    SearchCache(db_path=db_path, stale_seconds=60)
+    assert stored_keys() == [('stale',)]
+
+def test_stale_entry_served_while_refreshing():
+    """Test stale-while-revalidate: the stale value is returned and refreshed in the background."""
+    cache = SearchCache(ttl_seconds=0, stale_seconds=60)
+    cache.put('pcos', {'answer': 'old'})
+    fetched = []
+    def fetch(query):
+        fetched.append(query)
+        return {'answer': 'new'}
+    assert cache.get_or_fetch('pcos', fetch) == {'answer': 'old'}
+    for _ in range(100):
+        if cache.get('pcos')[0] == {'answer': 'new'}:
+            break
+        time.sleep(0.01)
+    assert fetched == ['pcos']
+    assert cache.get('pcos')[0] == {'answer': 'new'}
@@ -0,0 +1,88 @@
+import os
+import sys
+import time
+
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.agent.semantic_cache import SemanticCache
+
+NAMESPACE = ('general', 'v1', '')
+
+def test_paraphrase_hits_and_other_topic_misses():
+    """Test that a rephrased question reuses the answer and a different one does not."""
+    cache = SemanticCache(routes={'general': True})
+    cache.store(NAMESPACE, 'What is niacinamide?', 'Niacinamide answer')
+    assert cache.lookup(NAMESPACE, "what's niacinamide") == 'Niacinamide answer'
+    assert cache.lookup(NAMESPACE, 'tell me about hyaluronic acid') is None
+    assert cache.lookup(NAMESPACE, 'is retinol safe during pregnancy') is None
+
+def test_negations_and_numbers_must_match():
+    """Test that near-identical questions with opposite or different health facts miss."""
+    cache = SemanticCache(routes={'general': True})
+    cache.store(NAMESPACE, 'should I take ibuprofen for cramps', 'Take answer')
+    cache.store(NAMESPACE, 'I missed my period for 2 months', 'Two months answer')
+    assert cache.lookup(NAMESPACE, 'should I not take ibuprofen for cramps') is None
+    assert cache.lookup(NAMESPACE, 'I missed my period for 6 months') is None
+    assert cache.lookup(NAMESPACE, 'should i take ibuprofen for cramps?') == 'Take answer'
+
+def test_turns_with_chat_history_bypass_the_cache():
+    """Test that any chat history skips both lookup and store."""
+    from src.agent.response import cache_namespace
+    state = {'user_input': 'how do I sleep better', 'intermediate_steps': []}
+    assert cache_namespace(state, 'general', 'conversational_prompt.txt') is not None
+    state['chat_history'] = [{'user': 'hi', 'Aara': 'Hello!'}]
+    assert cache_namespace(state, 'general', 'conversational_prompt.txt') is None
+
+def test_namespaces_are_isolated():
+    """Test that answers don't leak across routes, prompt versions or skin types."""
+    cache = SemanticCache(routes={'general': True})
+    cache.store(NAMESPACE, 'best moisturizer', 'Generic answer')
+    assert cache.lookup(('general', 'v1', 'oily'), 'best moisturizer') is None
+    assert cache.lookup(('general', 'v2', ''), 'best moisturizer') is None
+    assert cache.lookup(NAMESPACE, 'best moisturizer') == 'Generic answer'
+
+def test_entries_expire_and_evict_least_recently_used():
+    """Test TTL expiry and LRU eviction."""
+    cache = SemanticCache(ttl_seconds=0.05)
+    cache.store(NAMESPACE, 'how do I sleep better', 'Sleep answer')
+    time.sleep(0.1)
+    assert cache.lookup(NAMESPACE, 'how do I sleep better') is None
+
+    cache = SemanticCache(max_entries=2)
+    cache.store(NAMESPACE, 'how do I sleep better', 'Sleep answer')
+    cache.store(NAMESPACE, 'how much water should I drink', 'Water answer')
+    cache.lookup(NAMESPACE, 'how do I sleep better')
+    cache.store(NAMESPACE, 'foods for glowing skin', 'Food answer')
+    assert cache.lookup(NAMESPACE, 'how much water should I drink') is None
+    assert cache.lookup(NAMESPACE, 'how can I sleep better') == 'Sleep answer'
+
+def test_routes_are_enabled_per_setting():
+    """Test per-route enablement; crisis replies are never cached."""
+    cache = SemanticCache(routes={'general': True, 'crisis': False})
+    assert cache.enabled_for('general')
+    assert not cache.enabled_for('crisis')
+    assert not cache.enabled_for('greeting')
+    assert not SemanticCache(routes={'general': True}, enabled=False).enabled_for('general')
+
+def test_stats_gauge_reports_hit_rate():
+    """Test that the cache gauge can be evaluated from a metrics snapshot."""
+    from src.agent.metrics import METRICS
+    cache = SemanticCache(routes={'general': True})
+    METRICS.register_gauge('semantic_cache_test', cache.stats)
+    cache.store(NAMESPACE, 'how do I sleep better', 'Sleep answer')
+    cache.lookup(NAMESPACE, 'how can I sleep better')
+    stats = METRICS.snapshot()['gauges']['semantic_cache_test']
+    assert stats['entries'] == 1 and stats['hits'] >= 1
+
+def test_namespace_matrix_tracks_stores_and_evictions():
+    """Test that rows stay aligned with entries as the matrix grows and evicted rows are refilled."""
+    cache = SemanticCache(max_entries=100)
+    for i in range(150):
+        cache.store(NAMESPACE, f'question about topic{i} number {i}', f'answer {i}')
+    matrix = cache._namespaces[NAMESPACE]
+    assert len(matrix.keys) == 100 and len(matrix.vectors) >= 100
+    assert cache.lookup(NAMESPACE, 'question about topic10 number 10') is None
+    assert cache.lookup(NAMESPACE, 'question about topic120 number 120') == 'answer 120'
+    assert all(matrix.rows[key] == row for row, key in enumerate(matrix.keys))
@@ -0,0 +1,46 @@
+import os
+import sys
+
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.agent.single_call import parse_single_call, single_call_prompt
+
+def test_parse_structured_reply():
+    """Test parsing of the intent, draft answer and self-check flag."""
+    parsed = parse_single_call('{"intent": 5, "answer": "Hey! Mornings are lovely.", "self_check": "pass"}')
+    assert parsed == {'intent': '5', 'answer': 'Hey! Mornings are lovely.', 'self_check': True}
+    # Code fences and surrounding text are tolerated
+    parsed = parse_single_call('```json\n{"intent": "2", "answer": "", "self_check": "FAIL"}\n```')
+    assert parsed == {'intent': '2', 'answer': '', 'self_check': False}
+
+def test_unusable_replies_fall_back():
+    """Test that malformed or incomplete replies return None (multi-call fallback)."""
+    assert parse_single_call('5') is None
+    assert parse_single_call('{"intent": 7, "answer": "x", "self_check": "pass"}') is None
+    assert parse_single_call('{"intent": 5, "answer": "", "self_check": "pass"}') is None
+    assert parse_single_call('{"intent": 5, "answer": "x", "self_check": "maybe"}') is None
+    assert parse_single_call('{"intent": 5, "answer": "x",') is None
+
+def test_prompt_carries_message_and_contract():
+    """Test that the single call includes the conversation style, JSON contract and message."""
+    prompt = single_call_prompt('how was your day', [])
+    assert 'how was your day' in prompt
+    assert '"self_check"' in prompt
+    assert 'Aara' in prompt
+
+def test_usage_tracker_counts_calls_and_tokens():
+    """Test the per-mode cost counters used to compare graph modes."""
+    from langchain_core.messages import AIMessage
+    from langchain_core.outputs import ChatGeneration, LLMResult
+    from src.agent.llm_usage import LLMUsageTracker, usage_per_turn
+    from src.agent.metrics import METRICS
+
+    message = AIMessage(content='ok', usage_metadata={'input_tokens': 100, 'output_tokens': 20, 'total_tokens': 120})
+    tracker = LLMUsageTracker('test_mode')
+    tracker.on_llm_end(LLMResult(generations=[[ChatGeneration(message=message)]]))
+    tracker.on_llm_end(LLMResult(generations=[[ChatGeneration(message=message)]]))
+    assert METRICS.counter('llm.test_mode.calls') == 2
+    assert usage_per_turn('test_mode', 2) == {
+        'turns': 2, 'calls_per_turn': 1.0, 'input_tokens_per_turn': 100.0, 'output_tokens_per_turn': 20.0}
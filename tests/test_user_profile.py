@@ -0,0 +1,39 @@
+import os
+import sys
+
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from tools.user_profile import ProfileStore, UserProfile
+
+HISTORY = [
+    {"user": "I get acne on my chin", "Aara": "It sounds like your skin type is **combination** with breakouts in the T-zone."},
+    {"user": "I want an affordable cleanser", "Aara": "A gentle cleanser twice daily works well."},
+]
+
+def test_profile_from_history():
+    """Test that user messages and Aara's replies both feed the profile."""
+    profile = UserProfile.from_history(HISTORY)
+    assert profile.skin_type == 'combination'
+    assert profile.skin_concerns == ['acne', 'combination_tzone']
+    assert 'cleanser' in profile.mentioned_products and 'gentle_cleanser' in profile.mentioned_products
+    assert profile.budget_indicators == ['affordable']
+
+def test_context_prefers_current_message():
+    """Test that a skin type in the current message overrides the profile."""
+    context = UserProfile.from_history(HISTORY).context_for("actually my skin is dry and has redness")
+    assert context['skin_type'] == 'dry'
+    assert context['skin_concerns'][0] == 'redness'
+
+def test_store_processes_only_new_exchanges():
+    """Test that syncing a grown or sliding history only folds in unseen exchanges."""
+    store = ProfileStore()
+    profile = store.sync('c1', HISTORY[:1])
+    assert profile.exchanges_seen == 1
+    profile = store.sync('c1', HISTORY)
+    assert profile.exchanges_seen == 2
+    window = HISTORY[1:] + [{"user": "I also have PCOS", "Aara": "Thanks for sharing."}]
+    profile = store.sync('c1', window)
+    assert profile.exchanges_seen == 3
+    assert profile.health_concerns == ['pcos']
@@ -0,0 +1,49 @@
+import os
+import sys
+
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.agent.verification_audit import VerificationAuditor
+from src.agent.verification_cache import APPROVED
+
+def test_approved_audit_reports_verified_text():
+    """Test that an approved reply is handed to on_verified unchanged."""
+    auditor = VerificationAuditor(lambda question, response: APPROVED, on_disagreement='flag')
+    verified = []
+    auditor.submit('conv1', 'skincare_tool', 'oily skin routine', 'Use a gel cleanser.', verified.append)
+    auditor.join()
+    assert verified == ['Use a gel cleanser.']
+    assert auditor.flagged() == []
+
+def test_disagreement_is_flagged_and_corrected_once():
+    """Test the flag and correct actions for a reply the audit disagrees with."""
+    auditor = VerificationAuditor(lambda question, response: 'Improved routine', on_disagreement='correct')
+    auditor.submit('conv1', 'skincare_tool', 'oily skin routine', 'Bad routine')
+    auditor.submit('', 'skincare_tool', 'dry skin routine', 'Bad routine')
+    auditor.join()
+    flagged = auditor.flagged()
+    assert [flag['conversation_id'] for flag in flagged] == ['conv1']
+    assert flagged[0]['improved_response'] == 'Improved routine'
+    assert auditor.take_correction('conv1') == 'Improved routine'
+    assert auditor.take_correction('conv1') is None
+
+def test_log_mode_only_logs():
+    """Test that the default action neither flags nor corrects."""
+    auditor = VerificationAuditor(lambda question, response: 'Improved routine')
+    auditor.submit('conv1', 'skincare_tool', 'oily skin routine', 'Bad routine')
+    auditor.join()
+    assert auditor.flagged() == []
+    assert auditor.take_correction('conv1') is None
+
+def test_routes_pick_their_verification_mode():
+    """Test the route labels the response node uses to choose inline or async verification."""
+    from src.agent.response import verification_route, verification_mode
+    assert verification_route({'use_llm': True, 'response_type': 'crisis'}) == 'crisis'
+    assert verification_route({'final_response': 'x', 'next_node': 'skincare_tool'}) == 'skincare_tool'
+    assert verification_route({'final_response': 'x', 'next_node': 'rule_engine', 'route_to': 'health_advice_tool'}) == 'health_advice_tool'
+    assert verification_route({}) == 'general'
+    assert verification_mode('crisis') == 'inline'
+    assert verification_mode('skincare_tool') == 'async'
+    assert verification_mode('unknown_route') == 'inline'
@@ -0,0 +1,52 @@
+import os
+import sys
+
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.agent.verification_cache import VerificationCache, verification_key
+
+class FakeVerifier:
+    def __init__(self, verdict: str):
+        self.verdict = verdict
+        self.calls = 0
+
+    def invoke(self, prompt, **kwargs):
+        self.calls += 1
+        return self.verdict
+
+def test_repeat_verifications_skip_the_llm():
+    """Test that identical (question, response) pairs are verified once."""
+    from src.agent.response import VERIFICATION_CACHE, verify_response
+    VERIFICATION_CACHE.clear()
+    llm = FakeVerifier('VERIFICATION: APPROVED')
+    assert verify_response(llm, 'what is pcos', 'PCOS is a hormonal condition.') == 'PCOS is a hormonal condition.'
+    assert verify_response(llm, 'what is pcos', 'PCOS is a hormonal condition.') == 'PCOS is a hormonal condition.'
+    assert llm.calls == 1
+
+    improver = FakeVerifier('VERIFICATION: NEEDS_IMPROVEMENT\nIMPROVED_RESPONSE: Better answer')
+    assert verify_response(improver, 'what is acne', 'Acne.') == 'Better answer'
+    assert verify_response(improver, 'what is acne', 'Acne.') == 'Better answer'
+    assert improver.calls == 1
+
+def test_unparseable_verdicts_are_not_cached():
+    """Test that only definite outcomes are remembered."""
+    from src.agent.response import VERIFICATION_CACHE, verify_response
+    VERIFICATION_CACHE.clear()
+    llm = FakeVerifier('something unexpected')
+    verify_response(llm, 'what is pcos', 'PCOS answer')
+    verify_response(llm, 'what is pcos', 'PCOS answer')
+    assert llm.calls == 2
+
+def test_key_covers_prompt_version_and_cache_is_bounded():
+    """Test that a prompt change misses and the cache evicts least recently used."""
+    assert verification_key('prompt v1', 'q', 'r') != verification_key('prompt v2', 'q', 'r')
+    cache = VerificationCache(maxsize=2)
+    cache.put('a', 'APPROVED')
+    cache.put('b', 'APPROVED')
+    cache.get('a')
+    cache.put('c', 'APPROVED')
+    assert cache.get('b') is None
+    assert cache.get('a') == 'APPROVED'
+    assert cache.stats()['entries'] == 2
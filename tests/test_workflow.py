@@ -6,6 +6,9 @@ project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, project_root)
 sys.path.insert(0, os.path.join(project_root, 'src'))
 
+# Run the graph against the deterministic stand-in LLM unless a backend is chosen explicitly
+os.environ.setdefault('LLM_BACKEND', 'standin')
+
 try:
     from agent.workflow import run_workflow
 except ImportError:
@@ -29,12 +32,14 @@ def test_health_query():
             raise
 
 def test_skincare_query():
-    """Test that skincare queries return appropriate responses."""
+    """Test that skincare queries carry the disclaimer even before their async verification finishes."""
     try:
-        response = run_workflow('What is a good routine for oily skin?', [])
-        assert isinstance(response, str)
-        assert len(response) > 0
-        assert 'consult a doctor' in response.lower()
+        # The second turn may be answered with the cached verdict; both carry the disclaimer once
+        for _ in range(2):
+            response = run_workflow('What is a good routine for oily skin?', [])
+            assert isinstance(response, str)
+            assert len(response) > 0
+            assert response.lower().count('consult a doctor') == 1
     except Exception as e:
         # Skip test if API keys are not configured
         if "OPENAI_API_KEY" in str(e):
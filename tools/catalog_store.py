@@ -0,0 +1,375 @@
+import csv
+import os
+import re
+import sqlite3
+import threading
+import time
+import yaml
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Iterable, Iterator, Tuple
+
+@dataclass
+class Product:
+    name: str
+    description: str
+    category: str
+    subcategory: str
+    price_range: str
+    affiliate_link: str
+    keywords: List[str]
+    recommended_for: List[str]
+    why_recommended: str
+
+# What the feature index needs from a product: (id, category, subcategory, price_min, keywords, recommended_for)
+ProductFeatures = Tuple[int, str, str, Optional[float], List[str], List[str]]
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS catalog_meta (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL
+    );
+
+    CREATE TABLE IF NOT EXISTS products (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        description TEXT NOT NULL DEFAULT '',
+        category TEXT NOT NULL,
+        subcategory TEXT NOT NULL,
+        price_range TEXT NOT NULL DEFAULT '',
+        price_min REAL,
+        price_max REAL,
+        affiliate_link TEXT NOT NULL DEFAULT '',
+        why_recommended TEXT NOT NULL DEFAULT ''
+    );
+    CREATE INDEX IF NOT EXISTS idx_products_category ON products (category, subcategory);
+    CREATE INDEX IF NOT EXISTS idx_products_subcategory ON products (subcategory);
+    CREATE INDEX IF NOT EXISTS idx_products_price ON products (price_min, price_max);
+
+    CREATE TABLE IF NOT EXISTS product_keywords (
+        keyword TEXT NOT NULL,
+        product_id INTEGER NOT NULL REFERENCES products (id) ON DELETE CASCADE,
+        position INTEGER NOT NULL,
+        PRIMARY KEY (keyword, product_id)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_product_keywords_product ON product_keywords (product_id, position);
+
+    CREATE TABLE IF NOT EXISTS product_recommended_for (
+        audience TEXT NOT NULL,
+        product_id INTEGER NOT NULL REFERENCES products (id) ON DELETE CASCADE,
+        position INTEGER NOT NULL,
+        PRIMARY KEY (audience, product_id)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_product_recommended_for_product ON product_recommended_for (product_id, position);
+
+    -- Full-text index of earlier versions; nothing queries it any more
+    DROP TABLE IF EXISTS products_fts;
+'''
+
+CSV_LIST_SEPARATOR = ';'
+
+def parse_price_range(price_range: str) -> Tuple[Optional[float], Optional[float]]:
+    """Parse a price string such as "$12-15" into (min, max)."""
+    numbers = [float(n) for n in re.findall(r'\d+(?:\.\d+)?', price_range or '')]
+    if not numbers:
+        return None, None
+    return min(numbers), max(numbers)
+
+def load_products_from_yaml(path: str) -> List[Product]:
+    """Parse the nested category/subcategory product layout of affiliate_links.yaml."""
+    with open(path, 'r', encoding='utf-8') as f:
+        config = yaml.safe_load(f) or {}
+
+    products = []
+    for category, subcategories in (config.get('products') or {}).items():
+        for subcategory, items in (subcategories or {}).items():
+            for item in items or []:
+                products.append(Product(
+                    name=item['name'],
+                    description=item.get('description', ''),
+                    category=category,
+                    subcategory=subcategory,
+                    price_range=item.get('price_range', ''),
+                    affiliate_link=item.get('affiliate_link', ''),
+                    keywords=list(item.get('keywords', [])),
+                    recommended_for=list(item.get('recommended_for', [])),
+                    why_recommended=item.get('why_recommended', '')
+                ))
+    return products
+
+def load_products_from_csv(path: str) -> Iterator[Product]:
+    """Stream products from a CSV file; list columns are separated with ';'."""
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        for row in csv.DictReader(f):
+            yield Product(
+                name=row['name'],
+                description=row.get('description', ''),
+                category=row['category'],
+                subcategory=row['subcategory'],
+                price_range=row.get('price_range', ''),
+                affiliate_link=row.get('affiliate_link', ''),
+                keywords=_split_list(row.get('keywords', '')),
+                recommended_for=_split_list(row.get('recommended_for', '')),
+                why_recommended=row.get('why_recommended', '')
+            )
+
+def _split_list(value: str) -> List[str]:
+    return [part.strip() for part in (value or '').split(CSV_LIST_SEPARATOR) if part.strip()]
+
+class ProductCatalogStore:
+    """SQLite-backed product catalog with normalized audience/keyword tables."""
+
+    def __init__(self, db_path: str = ':memory:'):
+        self.db_path = db_path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA foreign_keys = ON')
+        if db_path != ':memory:':
+            self._conn.execute('PRAGMA journal_mode = WAL')
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # ------------------------------------------------------------------
+    # Import
+    # ------------------------------------------------------------------
+    def import_products(self, products: Iterable[Product], replace: bool = False, batch_size: int = 5000,
+                        source: Optional[str] = None) -> int:
+        """
+        Bulk-insert products in a single transaction and bump the catalog version.
+        A replacing import from a file records that file and its mtime as the catalog
+        source; anything else (appends, products from code) clears it.
+        """
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute('BEGIN')
+            try:
+                if replace:
+                    for table in ('product_keywords', 'product_recommended_for', 'products'):
+                        cursor.execute(f'DELETE FROM {table}')
+                next_id = cursor.execute('SELECT COALESCE(MAX(id), 0) + 1 FROM products').fetchone()[0]
+
+                count = 0
+                batch: List[Product] = []
+                for product in products:
+                    batch.append(product)
+                    if len(batch) >= batch_size:
+                        self._insert_batch(cursor, batch, next_id + count)
+                        count += len(batch)
+                        batch = []
+                if batch:
+                    self._insert_batch(cursor, batch, next_id + count)
+                    count += len(batch)
+
+                source_path = os.path.abspath(source) if source and replace else ''
+                source_mtime = str(os.path.getmtime(source_path)) if source_path else ''
+                cursor.executemany(
+                    'INSERT OR REPLACE INTO catalog_meta (key, value) VALUES (?, ?)',
+                    [('version', str(time.time_ns())), ('source', source_path), ('source_mtime', source_mtime)]
+                )
+                cursor.execute('COMMIT')
+            except Exception:
+                cursor.execute('ROLLBACK')
+                raise
+            return count
+
+    def _insert_batch(self, cursor: sqlite3.Cursor, batch: List[Product], first_id: int):
+        product_rows, keyword_rows, audience_rows = [], [], []
+        for offset, product in enumerate(batch):
+            product_id = first_id + offset
+            price_min, price_max = parse_price_range(product.price_range)
+            product_rows.append((
+                product_id, product.name, product.description, product.category, product.subcategory,
+                product.price_range, price_min, price_max, product.affiliate_link, product.why_recommended
+            ))
+            keyword_rows.extend(
+                (keyword, product_id, position) for position, keyword in enumerate(dict.fromkeys(product.keywords))
+            )
+            audience_rows.extend(
+                (audience, product_id, position) for position, audience in enumerate(dict.fromkeys(product.recommended_for))
+            )
+
+        cursor.executemany('INSERT INTO products VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', product_rows)
+        cursor.executemany('INSERT INTO product_keywords VALUES (?, ?, ?)', keyword_rows)
+        cursor.executemany('INSERT INTO product_recommended_for VALUES (?, ?, ?)', audience_rows)
+
+    def import_yaml(self, path: str, replace: bool = True) -> int:
+        return self.import_products(load_products_from_yaml(path), replace=replace, source=path)
+
+    def import_csv(self, path: str, replace: bool = True) -> int:
+        return self.import_products(load_products_from_csv(path), replace=replace, source=path)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM products').fetchone()[0]
+
+    def version(self) -> str:
+        """Opaque version string that changes whenever the catalog is re-imported."""
+        return self.get_meta('version')
+
+    def get_meta(self, key: str, default: str = '') -> str:
+        with self._lock:
+            row = self._conn.execute('SELECT value FROM catalog_meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key: str, value: str):
+        with self._lock:
+            self._conn.execute('INSERT OR REPLACE INTO catalog_meta (key, value) VALUES (?, ?)', (key, value))
+
+    def get_products(self, category: str = None, subcategory: str = None,
+                     min_price: float = None, max_price: float = None,
+                     limit: int = None) -> List[Product]:
+        """Return products matching the category/subcategory/price filters, in catalog order."""
+        where, params = self._filter_clause(category, subcategory, min_price, max_price)
+        sql = f'SELECT * FROM products p {where} ORDER BY p.id'
+        if limit:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+            return self._hydrate(rows)
+
+    def iter_products(self, batch_size: int = 10000) -> Iterator[Product]:
+        """Stream every product in catalog order without holding the whole table in memory."""
+        last_id = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    'SELECT * FROM products WHERE id > ? ORDER BY id LIMIT ?', (last_id, batch_size)
+                ).fetchall()
+                if not rows:
+                    return
+                products = self._hydrate(rows)
+            last_id = rows[-1][0]
+            yield from products
+
+    def iter_features(self, batch_size: int = 10000) -> Iterator[ProductFeatures]:
+        """Stream the scoring columns of every product in catalog order, without descriptions or links."""
+        last_id = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    'SELECT id, category, subcategory, price_min FROM products WHERE id > ? ORDER BY id LIMIT ?',
+                    (last_id, batch_size)
+                ).fetchall()
+                if not rows:
+                    return
+                keywords, audiences = self._feature_lists([row[0] for row in rows])
+            last_id = rows[-1][0]
+            for product_id, category, subcategory, price_min in rows:
+                yield product_id, category, subcategory, price_min, keywords[product_id], audiences[product_id]
+
+    def get_products_by_ids(self, ids: List[int]) -> List[Product]:
+        """Load products by id, in the order given."""
+        if not ids:
+            return []
+        placeholders = ', '.join('?' for _ in ids)
+        with self._lock:
+            rows = self._conn.execute(f'SELECT * FROM products WHERE id IN ({placeholders})', ids).fetchall()
+            by_id = {row[0]: product for row, product in zip(rows, self._hydrate(rows))}
+        return [by_id[product_id] for product_id in ids if product_id in by_id]
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _filter_clause(category, subcategory, min_price, max_price) -> Tuple[str, list]:
+        conditions, params = [], []
+        if category:
+            conditions.append('p.category = ?')
+            params.append(category)
+        if subcategory:
+            conditions.append('p.subcategory = ?')
+            params.append(subcategory)
+        if min_price is not None:
+            conditions.append('p.price_max >= ?')
+            params.append(min_price)
+        if max_price is not None:
+            conditions.append('p.price_min <= ?')
+            params.append(max_price)
+        return ('WHERE ' + ' AND '.join(conditions)) if conditions else '', params
+
+    def _hydrate(self, rows: List[tuple]) -> List[Product]:
+        """Turn product rows into Product objects, fetching keyword/audience lists in bulk."""
+        if not rows:
+            return []
+        keywords, audiences = self._feature_lists([row[0] for row in rows])
+
+        return [
+            Product(
+                name=row[1],
+                description=row[2],
+                category=row[3],
+                subcategory=row[4],
+                price_range=row[5],
+                affiliate_link=row[8],
+                keywords=keywords[row[0]],
+                recommended_for=audiences[row[0]],
+                why_recommended=row[9]
+            )
+            for row in rows
+        ]
+
+    def _feature_lists(self, ids: List[int]) -> Tuple[Dict[int, List[str]], Dict[int, List[str]]]:
+        """Keyword and audience lists for the given product ids, fetched in bulk."""
+        keywords: Dict[int, List[str]] = {product_id: [] for product_id in ids}
+        audiences: Dict[int, List[str]] = {product_id: [] for product_id in ids}
+
+        for start in range(0, len(ids), 900):
+            chunk = ids[start:start + 900]
+            placeholders = ', '.join('?' for _ in chunk)
+            for product_id, keyword in self._conn.execute(
+                f'SELECT product_id, keyword FROM product_keywords WHERE product_id IN ({placeholders}) '
+                f'ORDER BY product_id, position', chunk
+            ):
+                keywords[product_id].append(keyword)
+            for product_id, audience in self._conn.execute(
+                f'SELECT product_id, audience FROM product_recommended_for WHERE product_id IN ({placeholders}) '
+                f'ORDER BY product_id, position', chunk
+            ):
+                audiences[product_id].append(audience)
+        return keywords, audiences
+
+_default_store: Optional[ProductCatalogStore] = None
+_default_store_lock = threading.Lock()
+
+def get_catalog_store() -> Optional[ProductCatalogStore]:
+    """
+    Return the shared catalog store configured under `catalog` in settings.yaml.
+    The database is built from the YAML source when it is empty, and rebuilt when the
+    last import came from that same file and it has changed since; catalogs imported
+    from anywhere else (scripts/import_catalog.py) are left alone. Returns None when
+    the YAML backend is selected.
+    """
+    global _default_store
+    from src.agent.config import get_section, resolve_path
+
+    catalog_settings = get_section('catalog')
+    if catalog_settings.get('backend', 'sqlite') != 'sqlite':
+        return None
+
+    with _default_store_lock:
+        if _default_store is not None:
+            return _default_store
+
+        db_path = resolve_path(catalog_settings.get('path', 'data/catalog.db'))
+        source_path = resolve_path(catalog_settings.get('source', 'config/affiliate_links.yaml'))
+
+        if db_path != ':memory:':
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        store = ProductCatalogStore(db_path)
+
+        source_mtime = str(os.path.getmtime(source_path)) if os.path.exists(source_path) else ''
+        # Databases from before the source was recorded only had source_mtime set by this auto-import
+        last_source = store.get_meta('source', os.path.abspath(source_path) if store.get_meta('source_mtime') else '')
+        source_changed = (last_source == os.path.abspath(source_path)
+                          and source_mtime and store.get_meta('source_mtime') != source_mtime)
+        if store.count() == 0 or source_changed:
+            count = store.import_yaml(source_path)
+            print(f"📦 Imported {count} products into catalog store: {db_path}")
+        _default_store = store
+        return _default_store
@@ -0,0 +1,83 @@
+import math
+import os
+import re
+import threading
+from collections import Counter
+from typing import List, Optional, Tuple
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'health_data')
+
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'about', 'as', 'at', 'be', 'by', 'can', 'do', 'does', 'for', 'from', 'how',
+    'i', 'in', 'is', 'it', 'latest', 'me', 'my', 'of', 'on', 'or', 'recent', 'research', 'search', 'should',
+    'tell', 'that', 'the', 'this', 'to', 'what', 'when', 'which', 'with', 'you', 'your'
+}
+
+def _tokens(text: str) -> List[str]:
+    return [t for t in re.findall(r'[a-z0-9]+', text.lower()) if t not in STOPWORDS and len(t) > 1]
+
+class KnowledgeBase:
+    """Small lexical (BM25) retriever over the local health and skincare guides."""
+
+    def __init__(self, data_dir: str = DATA_DIR):
+        self.passages: List[str] = []
+        for fname in sorted(os.listdir(data_dir)) if os.path.isdir(data_dir) else []:
+            with open(os.path.join(data_dir, fname), 'r', encoding='utf-8') as f:
+                self.passages.extend(self._split(f.read()))
+
+        self._term_counts = [Counter(_tokens(p)) for p in self.passages]
+        self._lengths = [sum(c.values()) for c in self._term_counts]
+        self._avg_length = (sum(self._lengths) / len(self._lengths)) if self._lengths else 0
+        document_frequency = Counter(term for counts in self._term_counts for term in counts)
+        n = len(self.passages)
+        self._idf = {term: math.log(1 + (n - df + 0.5) / (df + 0.5)) for term, df in document_frequency.items()}
+
+    @staticmethod
+    def _split(text: str) -> List[str]:
+        """Split a guide into blank-line separated blocks, prefixed with their === SECTION === title."""
+        passages, section = [], ''
+        for block in re.split(r'\n\s*\n', text):
+            block = block.strip()
+            heading = re.match(r'^===\s*(.+?)\s*===$', block)
+            if heading:
+                section = heading.group(1).title()
+                continue
+            if len(block) > 40:
+                passages.append(f"{section}: {block}" if section else block)
+        return passages
+
+    def retrieve(self, query: str, k: int = 2) -> List[Tuple[str, float]]:
+        terms = _tokens(query)
+        if not terms or not self.passages:
+            return []
+        k1, b = 1.5, 0.75
+        scored = []
+        for i, counts in enumerate(self._term_counts):
+            score = 0.0
+            for term in terms:
+                tf = counts.get(term)
+                if tf:
+                    norm = k1 * (1 - b + b * self._lengths[i] / self._avg_length)
+                    score += self._idf[term] * tf * (k1 + 1) / (tf + norm)
+            if score > 0:
+                scored.append((self.passages[i], score))
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return scored[:k]
+
+_knowledge_base: Optional[KnowledgeBase] = None
+_knowledge_base_lock = threading.Lock()
+
+def get_knowledge_base() -> KnowledgeBase:
+    global _knowledge_base
+    with _knowledge_base_lock:
+        if _knowledge_base is None:
+            _knowledge_base = KnowledgeBase()
+        return _knowledge_base
+
+def knowledge_base_answer(query: str, k: int = 2) -> Optional[str]:
+    """Format the best local passages as a response, or None if nothing relevant is found."""
+    passages = get_knowledge_base().retrieve(query, k=k)
+    if not passages:
+        return None
+    body = "\n\n".join(passage for passage, score in passages)
+    return f"Here's what I can share from my health and skincare library:\n\n{body}"
@@ -0,0 +1,163 @@
+from collections import defaultdict
+from typing import Dict, Any, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from tools.catalog_store import Product, ProductCatalogStore, ProductFeatures, parse_price_range
+
+# Relevance weights (same as the original per-product loop)
+SKIN_TYPE_WEIGHT = 3
+CONCERN_WEIGHT = 2
+MENTION_WEIGHT = 1
+
+def _normalize_keyword(keyword: str) -> str:
+    return keyword.replace(' ', '_')
+
+class ProductFeatureIndex:
+    """
+    Sparse product × feature matrix used to score a whole catalog at once.
+
+    Features are audience tags (`for:oily`), normalized keywords (`kw:oily_skin`)
+    and subcategories (`sub:serums`). The matrix is stored column-wise as posting
+    lists, so scoring a context is a sparse matrix-vector product that only
+    touches the products hit by the context's active features.
+
+    Built from a list of products, or from a catalog store's feature columns only;
+    the store-backed index loads just the ranked products from the store.
+    """
+
+    def __init__(self, products: Optional[Sequence[Product]] = None, store: Optional[ProductCatalogStore] = None):
+        self.products = list(products) if products is not None else None
+        self.store = store
+        if self.products is not None:
+            features = ((i, p.category, p.subcategory, parse_price_range(p.price_range)[0], p.keywords, p.recommended_for)
+                        for i, p in enumerate(self.products))
+        else:
+            features = store.iter_features()
+        self._build(features)
+
+    def _build(self, features: Iterable[ProductFeatures]):
+        product_ids, categories, subcategories, prices = [], [], [], []
+        postings: Dict[str, List[int]] = defaultdict(list)
+        for i, (product_id, category, subcategory, price_min, keywords, recommended_for) in enumerate(features):
+            product_ids.append(product_id)
+            categories.append(category)
+            subcategories.append(subcategory)
+            prices.append(price_min)
+            for audience in dict.fromkeys(recommended_for):
+                postings[f'for:{audience}'].append(i)
+            for keyword in dict.fromkeys(_normalize_keyword(k) for k in keywords):
+                postings[f'kw:{keyword}'].append(i)
+            for keyword in dict.fromkeys(keywords):
+                postings[f'raw:{keyword}'].append(i)
+            postings[f'sub:{subcategory}'].append(i)
+        self.size = len(product_ids)
+        self.product_ids = np.array(product_ids, dtype=np.int64)
+
+        self.feature_ids: Dict[str, int] = {name: fid for fid, name in enumerate(postings)}
+        lengths = np.fromiter((len(rows) for rows in postings.values()), dtype=np.int64, count=len(postings))
+        self.indptr = np.zeros(len(postings) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=self.indptr[1:])
+        self.indices = (np.fromiter((i for rows in postings.values() for i in rows), dtype=np.int32,
+                                    count=int(self.indptr[-1]))
+                        if self.indptr[-1] else np.zeros(0, dtype=np.int32))
+
+        # Column attributes for query-time filtering
+        self._category_codes, self.categories = self._encode(categories)
+        self._subcategory_codes, self.subcategories = self._encode(subcategories)
+        self.price_min = np.array([np.nan if price is None else price for price in prices], dtype=np.float64)
+
+        self._mention_cache: Dict[str, np.ndarray] = {}
+        # Tie-break key: equal scores keep catalog order
+        self._order = np.arange(self.size - 1, -1, -1, dtype=np.int64)
+
+    @staticmethod
+    def _encode(values: List[str]) -> Tuple[np.ndarray, Dict[str, int]]:
+        vocabulary: Dict[str, int] = {}
+        codes = np.fromiter((vocabulary.setdefault(v, len(vocabulary)) for v in values), dtype=np.int32, count=len(values))
+        return codes, vocabulary
+
+    def _column(self, feature: str) -> Optional[np.ndarray]:
+        fid = self.feature_ids.get(feature)
+        if fid is None:
+            return None
+        return self.indices[self.indptr[fid]:self.indptr[fid + 1]]
+
+    def _mention_column(self, mentioned: str) -> np.ndarray:
+        """Products whose subcategory contains the term or whose keywords include it."""
+        column = self._mention_cache.get(mentioned)
+        if column is None:
+            parts = [self._column(f'raw:{mentioned}')]
+            parts += [self._column(f'sub:{sub}') for sub in self.subcategories if mentioned in sub]
+            parts = [part for part in parts if part is not None and len(part)]
+            column = np.unique(np.concatenate(parts)) if parts else np.zeros(0, dtype=np.int32)
+            self._mention_cache[mentioned] = column
+        return column
+
+    def context_vector(self, context: Dict[str, Any]) -> List[Tuple[np.ndarray, int]]:
+        """Encode a conversation context as (feature column, weight) pairs."""
+        vector = []
+        if context.get('skin_type'):
+            column = self._column(f"for:{context['skin_type']}")
+            if column is not None:
+                vector.append((column, SKIN_TYPE_WEIGHT))
+        for concern in list(context.get('skin_concerns', [])) + list(context.get('health_concerns', [])):
+            column = self._column(f'kw:{_normalize_keyword(concern)}')
+            if column is not None:
+                vector.append((column, CONCERN_WEIGHT))
+        for mentioned in context.get('mentioned_products', []):
+            vector.append((self._mention_column(mentioned), MENTION_WEIGHT))
+        return vector
+
+    def filter_mask(self, category: str = None, subcategory: str = None,
+                    max_price: float = None) -> Optional[np.ndarray]:
+        mask = None
+        if category:
+            code = self.categories.get(category, -1)
+            mask = self._category_codes == code
+        if subcategory:
+            code = self.subcategories.get(subcategory, -1)
+            sub_mask = self._subcategory_codes == code
+            mask = sub_mask if mask is None else mask & sub_mask
+        if max_price is not None:
+            price_mask = self.price_min <= max_price
+            mask = price_mask if mask is None else mask & price_mask
+        return mask
+
+    def score(self, context: Dict[str, Any]) -> np.ndarray:
+        """Relevance score of every product for one context."""
+        scores = np.zeros(self.size, dtype=np.int32)
+        for column, weight in self.context_vector(context):
+            scores[column] += weight
+        return scores
+
+    def score_batch(self, contexts: Sequence[Dict[str, Any]]) -> np.ndarray:
+        """Score many contexts at once; returns a (len(contexts), products) matrix."""
+        scores = np.zeros((len(contexts), self.size), dtype=np.int32)
+        for row, context in enumerate(contexts):
+            for column, weight in self.context_vector(context):
+                scores[row, column] += weight
+        return scores
+
+    def top_k(self, context: Dict[str, Any], k: int = 3, category: str = None,
+              subcategory: str = None, max_price: float = None) -> List[Tuple[Product, int]]:
+        """Highest-scoring products (score > 0), ties broken by catalog order."""
+        return self.select_top_k(self.score(context), k, self.filter_mask(category, subcategory, max_price))
+
+    def select_top_k(self, scores: np.ndarray, k: int,
+                     mask: Optional[np.ndarray] = None) -> List[Tuple[Product, int]]:
+        if mask is not None:
+            scores = np.where(mask, scores, 0)
+        candidates = np.flatnonzero(scores > 0)
+        if not len(candidates) or k <= 0:
+            return []
+        keys = scores[candidates].astype(np.int64) * self.size + self._order[candidates]
+        if len(candidates) > k:
+            top = np.argpartition(-keys, k - 1)[:k]
+            candidates, keys = candidates[top], keys[top]
+        ranked = candidates[np.argsort(-keys, kind='stable')]
+        if self.products is not None:
+            products = [self.products[i] for i in ranked]
+        else:
+            products = self.store.get_products_by_ids([int(product_id) for product_id in self.product_ids[ranked]])
+        return [(product, int(scores[i])) for product, i in zip(products, ranked)]
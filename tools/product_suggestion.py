@@ -2,23 +2,84 @@ from typing import Dict, Any, List, Optional
 import json
 import os
 import yaml
-from dataclasses import dataclass
 
-@dataclass
-class Product:
-    name: str
-    description: str
-    category: str
-    subcategory: str
-    price_range: str
-    affiliate_link: str
-    keywords: List[str]
-    recommended_for: List[str]
-    why_recommended: str
+from tools.catalog_store import Product, ProductCatalogStore, get_catalog_store, load_products_from_yaml
+from tools.product_scoring import ProductFeatureIndex
+from tools.recommendation_cache import RecommendationCache
+from tools.user_profile import UserProfile, SKIN_TYPES, SKIN_CONCERNS, HEALTH_CONCERNS, profile_from_state
+from src.agent.metrics import METRICS
+from src.agent.reasoning import PRODUCT_REQUEST_KEYWORDS
+
+EMERGENCY_KEYWORDS = ['emergency', 'crisis', 'severe pain', 'heavy bleeding', 'suicide', 'self harm']
+OPT_OUT_PHRASES = ['no products', 'no recommendations', 'no shopping']
+
+DEFAULT_DISCLAIMER = "Please note: These are affiliate links. I may earn a small commission if you purchase through these links, at no extra cost to you. Always patch test new skincare products and consult healthcare providers for supplements."
+
+# Feature indexes keyed by (database path, catalog version)
+_index_cache: Dict[tuple, ProductFeatureIndex] = {}
+
+# Ranked products and rendered suggestion blocks keyed by context signature
+SUGGESTION_CACHE = RecommendationCache()
+
+_affiliate_settings: Optional[Dict[str, Any]] = None
+
+def _load_affiliate_settings() -> Dict[str, Any]:
+    """Read `affiliate_settings` once from affiliate_links.yaml."""
+    global _affiliate_settings
+    if _affiliate_settings is None:
+        try:
+            config_path = os.path.join(
+                os.path.dirname(os.path.dirname(__file__)), 
+                'config', 
+                'affiliate_links.yaml'
+            )
+            with open(config_path, 'r', encoding='utf-8') as f:
+                config = yaml.safe_load(f)
+            _affiliate_settings = config.get('affiliate_settings', {}) or {}
+        except Exception:
+            _affiliate_settings = {'disclaimer_text': DEFAULT_DISCLAIMER}
+    return _affiliate_settings
+
+def _load_disclaimer() -> str:
+    return _load_affiliate_settings().get('disclaimer_text', '')
 
 class ProductSuggestionTool:
-    def __init__(self):
-        self.products = self._load_product_database()
+    def __init__(self, store: Optional[ProductCatalogStore] = None):
+        # Use the shared SQLite catalog unless the YAML backend is configured
+        self.store = store if store is not None else get_catalog_store()
+        self._yaml_version = None
+        self._products = None if self.store is not None else self._load_product_database()
+        self._index = None
+    
+    @property
+    def products(self) -> List[Product]:
+        """All catalog products (loads the whole catalog from the store; scoring doesn't need this)."""
+        if self._products is None:
+            self._products = list(self.store.iter_products())
+        return self._products
+    
+    @property
+    def index(self) -> ProductFeatureIndex:
+        """Feature index for the current catalog, shared across tool instances."""
+        if self.store is None:
+            if self._index is None:
+                self._index = ProductFeatureIndex(self._products)
+            return self._index
+        
+        key = (self.store.db_path, self.store.version())
+        index = _index_cache.get(key)
+        if index is None:
+            index = ProductFeatureIndex(store=self.store)
+            _index_cache.clear()
+            _index_cache[key] = index
+        return index
+    
+    @property
+    def catalog_version(self) -> tuple:
+        """Identifies the catalog contents; changes whenever the catalog is re-imported."""
+        if self.store is None:
+            return ('yaml', self._yaml_version)
+        return (self.store.db_path, self.store.version())
     
     def _load_product_database(self) -> List[Product]:
         """Load product database from YAML configuration file."""
@@ -30,34 +91,13 @@ class ProductSuggestionTool:
                 'affiliate_links.yaml'
             )
             
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config = yaml.safe_load(f)
-            
-            products = []
-            
-            # Parse products from YAML structure
-            products_data = config.get('products', {})
-            
-            for category, subcategories in products_data.items():
-                for subcategory, items in subcategories.items():
-                    for item in items:
-                        product = Product(
-                            name=item['name'],
-                            description=item['description'],
-                            category=category,
-                            subcategory=subcategory,
-                            price_range=item['price_range'],
-                            affiliate_link=item['affiliate_link'],
-                            keywords=item['keywords'],
-                            recommended_for=item['recommended_for'],
-                            why_recommended=item['why_recommended']
-                        )
-                        products.append(product)
-            
-            return products
+            # The file's mtime versions the catalog, so the recommendation cache survives new tool instances
+            self._yaml_version = os.path.getmtime(config_path)
+            return load_products_from_yaml(config_path)
             
         except Exception as e:
             print(f"Error loading affiliate config: {e}")
+            self._yaml_version = 'fallback'
             # Fallback to minimal hardcoded products
             return [
                 Product(
@@ -73,221 +113,33 @@ class ProductSuggestionTool:
                 )
             ]
     
-    def analyze_conversation_context(self, user_input: str, chat_history: List[Dict[str, str]]) -> Dict[str, Any]:
+    def analyze_conversation_context(self, user_input: str, chat_history: List[Dict[str, str]],
+                                     profile: Optional[UserProfile] = None) -> Dict[str, Any]:
         """Analyze the conversation to extract context for product suggestions."""
-        user_input_lower = user_input.lower()
-        
-        context = {
-            'skin_type': '',
-            'skin_concerns': [],
-            'health_concerns': [],
-            'mentioned_products': [],
-            'budget_indicators': [],
-            'age_mentioned': False,
-            'lifestyle_factors': []
-        }
-        
-        # Extract from current user input
-        # Skin type detection
-        skin_types = ['oily', 'dry', 'combination', 'sensitive', 'normal', 'acne-prone']
-        for skin_type in skin_types:
-            if skin_type in user_input_lower:
-                context['skin_type'] = skin_type
-                break
-        
-        # Skin concerns from current input
-        skin_concerns = ['acne', 'wrinkles', 'fine lines', 'dark spots', 'blackheads', 'enlarged pores', 'redness', 'dryness', 'oiliness', 'sensitivity']
-        for concern in skin_concerns:
-            if concern in user_input_lower:
-                context['skin_concerns'].append(concern.replace(' ', '_'))
+        # Without a persisted conversation profile, derive one from the recent exchanges
+        if profile is None:
+            profile = UserProfile.from_history(chat_history[-5:])
         
-        # Extract health concerns
-        health_concerns = ['pcos', 'irregular periods', 'heavy periods', 'cramps', 'pms', 'iron deficiency', 'fatigue', 'hormonal imbalance']
-        for concern in health_concerns:
-            if concern in user_input_lower:
-                context['health_concerns'].append(concern.replace(' ', '_'))
+        context = profile.context_for(user_input)
         
-        # ENHANCED: Analyze chat history for additional context (INCLUDING Aara'S RESPONSES)
-        for exchange in chat_history[-5:]:  # Look at last 5 exchanges
-            
-            # Extract from user messages
-            if 'user' in exchange and exchange['user']:
-                user_msg = exchange['user'].lower()
-                
-                # Look for skin type mentions
-                for skin_type in skin_types:
-                    if skin_type in user_msg and not context['skin_type']:
-                        context['skin_type'] = skin_type
-                
-                # Look for product mentions
-                product_keywords = ['cleanser', 'moisturizer', 'serum', 'sunscreen', 'supplement', 'vitamin', 'toner', 'exfoliant']
-                for keyword in product_keywords:
-                    if keyword in user_msg and keyword not in context['mentioned_products']:
-                        context['mentioned_products'].append(keyword)
-                
-                # Look for budget indicators
-                budget_keywords = ['affordable', 'cheap', 'expensive', 'budget', 'drugstore', 'high-end']
-                for keyword in budget_keywords:
-                    if keyword in user_msg and keyword not in context['budget_indicators']:
-                        context['budget_indicators'].append(keyword)
-            
-            # ENHANCED: Extract from Aara's responses (this is the key fix!)
-            if 'Aara' in exchange and exchange['Aara']:
-                Aara_msg = exchange['Aara'].lower()
-                Aara_msg_original = exchange['Aara']  # Keep original for debugging
-                
-                print(f"📋 ANALYZING Aara'S RESPONSE: {Aara_msg_original[:100]}...")
-                
-                # Look for skin type determinations in Aara's responses
-                skin_type_patterns = [
-                    'your skin type is',
-                    'skin type is',
-                    'sounds like your skin type is',
-                    'it sounds like your skin type is',
-                    'determined skin type',
-                    'skin type: combination',
-                    'skin type: oily',
-                    'skin type: dry',
-                    'skin type: sensitive',
-                    'skin type: normal'
-                ]
-                
-                for pattern in skin_type_patterns:
-                    if pattern in Aara_msg:
-                        print(f"📋 FOUND PATTERN: '{pattern}' in message")
-                        
-                        # Extract the skin type that follows the pattern with better handling
-                        pattern_start = Aara_msg.find(pattern) + len(pattern)
-                        text_after_pattern = Aara_msg[pattern_start:pattern_start + 100]
-                        print(f"📋 TEXT AFTER PATTERN: '{text_after_pattern}'")
-                        
-                        # Look for skin types, handling markdown and variations
-                        for skin_type in skin_types:
-                            # Check for the skin type in various formats
-                            skin_type_variations = [
-                                skin_type,
-                                f"**{skin_type}**",
-                                f"*{skin_type}*",
-                                skin_type.title(),
-                                f"**{skin_type.title()}**",
-                                f"*{skin_type.title()}*"
-                            ]
-                            
-                            for variation in skin_type_variations:
-                                if variation.lower() in text_after_pattern:
-                                    if not context['skin_type']:  # Only set if not already found
-                                        context['skin_type'] = skin_type
-                                        print(f"📋 ✅ EXTRACTED SKIN TYPE: {skin_type} (found as '{variation}')")
-                                    break
-                            
-                            if context['skin_type']:  # Break outer loop if found
-                                break
-                        
-                        if context['skin_type']:  # Break pattern loop if found
-                            break
-                
-                # If no pattern matched, try a more aggressive search
-                if not context['skin_type']:
-                    print(f"📋 NO PATTERN MATCHED - TRYING AGGRESSIVE SEARCH")
-                    
-                    # Look for skin types mentioned anywhere with markdown
-                    for skin_type in skin_types:
-                        aggressive_patterns = [
-                            f"**{skin_type}**",
-                            f"*{skin_type}*", 
-                            f"**{skin_type.title()}**",
-                            f"*{skin_type.title()}*",
-                            skin_type,
-                            skin_type.title()
-                        ]
-                        
-                        for pattern in aggressive_patterns:
-                            if pattern.lower() in Aara_msg:
-                                context['skin_type'] = skin_type
-                                print(f"📋 ✅ AGGRESSIVE MATCH FOUND: {skin_type} (pattern: '{pattern}')")
-                                break
-                        
-                        if context['skin_type']:
-                            break
-                
-                # Extract skin concerns mentioned in Aara's analysis
-                concern_patterns = [
-                    'breakouts in the t-zone',
-                    'shiny primarily in the t-zone',
-                    'comfortable and balanced',
-                    'normal-sized pores',
-                    'tolerates new products'
-                ]
-                
-                for pattern in concern_patterns:
-                    if pattern in Aara_msg:
-                        if 't-zone' in pattern and 'combination_tzone' not in context['skin_concerns']:
-                            context['skin_concerns'].append('combination_tzone')
-                        elif 'balanced' in pattern and 'balanced_skin' not in context['skin_concerns']:
-                            context['skin_concerns'].append('balanced_skin')
-                
-                # Look for routine recommendations in Aara's responses to understand needs
-                routine_keywords = ['morning routine', 'evening routine', 'gentle cleanser', 'lightweight moisturizer', 'oil-free', 'broad-spectrum spf']
-                for keyword in routine_keywords:
-                    if keyword in Aara_msg and keyword.replace(' ', '_') not in context['mentioned_products']:
-                        context['mentioned_products'].append(keyword.replace(' ', '_'))
-        
-        print(f"📋 FINAL EXTRACTED CONTEXT:")
-        print(f"  Skin Type: {context['skin_type']}")
-        print(f"  Skin Concerns: {context['skin_concerns']}")
-        print(f"  Health Concerns: {context['health_concerns']}")
-        print(f"  Mentioned Products: {context['mentioned_products']}")
+        print(f"📋 EXTRACTED CONTEXT: skin type '{context['skin_type']}', "
+              f"skin concerns {context['skin_concerns']}, health concerns {context['health_concerns']}, "
+              f"mentioned products {context['mentioned_products']}")
         
         return context
     
-    def get_relevant_products(self, context: Dict[str, Any], max_suggestions: int = 3) -> List[Product]:
+    def get_relevant_products(self, context: Dict[str, Any], max_suggestions: int = 3,
+                              category: str = None, subcategory: str = None,
+                              max_price: float = None) -> List[Product]:
         """Get relevant products based on conversation context."""
-        relevant_products = []
-        
-        print(f"📋 SEARCHING FOR PRODUCTS:")
-        print(f"  Target skin type: '{context['skin_type']}'")
-        print(f"  Available products: {len(self.products)}")
-        
-        for product in self.products:
-            relevance_score = 0
-            
-            print(f"📋 Checking product: {product.name}")
-            print(f"  Recommended for: {product.recommended_for}")
-            
-            # Score based on skin type match
-            if context['skin_type'] and context['skin_type'] in product.recommended_for:
-                relevance_score += 3
-                print(f"  ✅ SKIN TYPE MATCH! Score +3 (total: {relevance_score})")
-            
-            # Score based on skin concerns
-            for concern in context['skin_concerns']:
-                if concern in product.keywords or concern.replace('_', ' ') in product.keywords:
-                    relevance_score += 2
-                    print(f"  ✅ CONCERN MATCH: {concern} - Score +2 (total: {relevance_score})")
-            
-            # Score based on health concerns  
-            for concern in context['health_concerns']:
-                if concern in product.keywords or concern.replace('_', ' ') in product.keywords:
-                    relevance_score += 2
-                    print(f"  ✅ HEALTH CONCERN MATCH: {concern} - Score +2 (total: {relevance_score})")
-            
-            # Score based on mentioned products
-            for mentioned in context['mentioned_products']:
-                if mentioned in product.subcategory or mentioned in product.keywords:
-                    relevance_score += 1
-                    print(f"  ✅ MENTIONED PRODUCT MATCH: {mentioned} - Score +1 (total: {relevance_score})")
-            
-            if relevance_score > 0:
-                relevant_products.append((product, relevance_score))
-                print(f"  ✅ PRODUCT ADDED with score: {relevance_score}")
-            else:
-                print(f"  ❌ PRODUCT SKIPPED (score: 0)")
+        # Vectorized scoring over the whole catalog (skin type 3, concerns 2, mentions 1)
+        ranked = self.index.top_k(
+            context, k=max_suggestions,
+            category=category, subcategory=subcategory, max_price=max_price
+        )
+        print(f"📋 FOUND {len(ranked)} RELEVANT PRODUCTS (target skin type: '{context['skin_type']}')")
         
-        # Sort by relevance score and return top suggestions
-        relevant_products.sort(key=lambda x: x[1], reverse=True)
-        print(f"📋 FOUND {len(relevant_products)} RELEVANT PRODUCTS")
-        
-        return [product for product, score in relevant_products[:max_suggestions]]
+        return [product for product, score in ranked]
     
     def format_product_suggestions(self, products: List[Product], context: Dict[str, Any]) -> str:
         """Format product suggestions into a natural response."""
@@ -303,20 +155,98 @@ class ProductSuggestionTool:
             suggestions += f"[Shop Here 🛒]({product.affiliate_link})\n\n"
         
         # Add disclaimer from config
-        try:
-            config_path = os.path.join(
-                os.path.dirname(os.path.dirname(__file__)), 
-                'config', 
-                'affiliate_links.yaml'
-            )
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config = yaml.safe_load(f)
-            disclaimer = config.get('affiliate_settings', {}).get('disclaimer_text', '')
-            suggestions += f"*{disclaimer}*"
-        except:
-            suggestions += "*Please note: These are affiliate links. I may earn a small commission if you purchase through these links, at no extra cost to you. Always patch test new skincare products and consult healthcare providers for supplements.*"
+        suggestions += f"*{_load_disclaimer()}*"
         
         return suggestions
+    
+    def build_suggestion_block(self, products: List[Product], context: Dict[str, Any]) -> str:
+        """Personalized intro plus formatted product suggestions."""
+        response_intro = "Based on our conversation"
+        
+        if context['skin_type']:
+            response_intro += f" and your **{context['skin_type']} skin type**"
+        
+        if context['skin_concerns']:
+            concerns_text = ", ".join([concern.replace('_', ' ') for concern in context['skin_concerns']])
+            response_intro += f" and concerns about {concerns_text}"
+            
+        response_intro += ", here are my personalized product recommendations:\n\n"
+        
+        return response_intro + self.format_product_suggestions(products, context)
+
+def should_suggest_products(state: Dict[str, Any]) -> bool:
+    """
+    Cheap gate run after a tool answer: suggest products on explicit purchase intent,
+    or when the profile has enough context and the conversation's cooldown has passed.
+    """
+    user_input = state.get('user_input', '').lower()
+    settings = _load_affiliate_settings()
+    
+    if not settings.get('enable_product_suggestions', True):
+        reason = 'disabled'
+    elif any(keyword in user_input for keyword in EMERGENCY_KEYWORDS + OPT_OUT_PHRASES):
+        reason = 'opted_out'
+    elif any(keyword in user_input for keyword in PRODUCT_REQUEST_KEYWORDS):
+        METRICS.increment('product_suggestion.gate.run.purchase_intent')
+        return True
+    else:
+        profile = profile_from_state(state)
+        cooldown = settings.get('suggestion_cooldown_turns', 3)
+        context = profile.context_for(user_input)
+        if not (context['skin_type'] or context['skin_concerns'] or context['health_concerns']):
+            reason = 'insufficient_context'
+        elif profile.last_suggestion_turn is not None and profile.exchanges_seen - profile.last_suggestion_turn < cooldown:
+            reason = 'cooldown'
+        else:
+            METRICS.increment('product_suggestion.gate.run.profile_context')
+            return True
+    
+    METRICS.increment(f'product_suggestion.gate.skipped.{reason}')
+    return False
+
+def _gate_stats() -> Dict[str, Any]:
+    snapshot = METRICS.counters('product_suggestion.gate.')
+    ran = sum(v for k, v in snapshot.items() if k.startswith('product_suggestion.gate.run.'))
+    skipped = sum(v for k, v in snapshot.items() if k.startswith('product_suggestion.gate.skipped.'))
+    total = ran + skipped
+    return {'ran': ran, 'skipped': skipped, 'skip_rate': round(skipped / total, 4) if total else 0.0}
+
+METRICS.register_gauge('product_suggestion.gate', _gate_stats)
+METRICS.register_gauge('product_suggestion.cache', SUGGESTION_CACHE.stats)
+
+def prewarm_recommendation_cache(max_suggestions: int = 3) -> int:
+    """
+    Fill the suggestion cache for common single-signal contexts: every skin type,
+    every concern, and each skin type paired with each skin concern.
+    """
+    tool = ProductSuggestionTool()
+    empty = {'skin_type': '', 'skin_concerns': [], 'health_concerns': [], 'mentioned_products': []}
+    
+    contexts = [dict(empty, skin_type=skin_type) for skin_type in SKIN_TYPES]
+    contexts += [dict(empty, skin_concerns=[c.replace(' ', '_')]) for c in SKIN_CONCERNS]
+    contexts += [dict(empty, health_concerns=[c.replace(' ', '_')]) for c in HEALTH_CONCERNS]
+    contexts += [
+        dict(empty, skin_type=skin_type, skin_concerns=[c.replace(' ', '_')])
+        for skin_type in SKIN_TYPES for c in SKIN_CONCERNS
+    ]
+    
+    for context in contexts:
+        SUGGESTION_CACHE.recommend(tool, context, max_suggestions)
+    
+    print(f"📦 Prewarmed recommendation cache with {len(contexts)} contexts")
+    return len(contexts)
+
+def product_context_node(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Graph-entry branch: sync the conversation profile and extract the product context while
+    intent classification runs. Ranking is left to the product_suggestion node, which only
+    runs when should_suggest_products() lets it.
+    """
+    user_input = state.get('user_input', '').lower()
+    tool = ProductSuggestionTool()
+    state['product_context'] = tool.analyze_conversation_context(user_input, state.get('chat_history', []),
+                                                                 profile=profile_from_state(state))
+    return state
 
 def product_suggestion_tool(state: Dict[str, Any]) -> Dict[str, Any]:
     """Tool that analyzes conversation and suggests relevant products with affiliate links."""
@@ -326,18 +256,18 @@ def product_suggestion_tool(state: Dict[str, Any]) -> Dict[str, Any]:
     chat_history = state.get('chat_history', [])
     
     # Don't suggest products for emergencies or crisis situations
-    emergency_keywords = ['emergency', 'crisis', 'severe pain', 'heavy bleeding', 'suicide', 'self harm']
-    if any(keyword in user_input for keyword in emergency_keywords):
+    if any(keyword in user_input for keyword in EMERGENCY_KEYWORDS):
         return state
     
     # Don't suggest products if user explicitly asks not to
-    if any(phrase in user_input for phrase in ['no products', 'no recommendations', 'no shopping']):
+    if any(phrase in user_input for phrase in OPT_OUT_PHRASES):
         return state
     
     tool = ProductSuggestionTool()
     
-    # Analyze conversation context
-    context = tool.analyze_conversation_context(user_input, chat_history)
+    # Context extracted by the graph-entry branch, or from the incrementally maintained profile
+    context = state.get('product_context') or tool.analyze_conversation_context(
+        user_input, chat_history, profile=profile_from_state(state))
     
     # ENHANCED: Check if we have sufficient context for recommendations
     has_context = (context['skin_type'] or context['skin_concerns'] or 
@@ -346,25 +276,10 @@ def product_suggestion_tool(state: Dict[str, Any]) -> Dict[str, Any]:
     if has_context:
         print(f"📋 SUFFICIENT CONTEXT FOUND - PROVIDING RECOMMENDATIONS")
         
-        # Get relevant products
-        relevant_products = tool.get_relevant_products(context, max_suggestions=3)
+        # Get relevant products and the rendered block (cached per context signature)
+        relevant_products, product_suggestions = SUGGESTION_CACHE.recommend(tool, context, max_suggestions=3)
         
         if relevant_products:
-            # Create a personalized response based on context
-            response_intro = "Based on our conversation"
-            
-            if context['skin_type']:
-                response_intro += f" and your **{context['skin_type']} skin type**"
-            
-            if context['skin_concerns']:
-                concerns_text = ", ".join([concern.replace('_', ' ') for concern in context['skin_concerns']])
-                response_intro += f" and concerns about {concerns_text}"
-                
-            response_intro += ", here are my personalized product recommendations:\n\n"
-            
-            # Format suggestions with personalized intro
-            product_suggestions = response_intro + tool.format_product_suggestions(relevant_products, context)
-            
             # Add to existing response or create new one
             if state.get('final_response'):
                 state['final_response'] += "\n\n" + product_suggestions
@@ -378,6 +293,13 @@ def product_suggestion_tool(state: Dict[str, Any]) -> Dict[str, Any]:
                 'products_suggested': [p.name for p in relevant_products],
                 'suggestion_reason': 'conversation_context_match'
             })
+            
+            # Start the per-conversation cooldown
+            profile = profile_from_state(state)
+            profile.last_suggestion_turn = profile.exchanges_seen
+        elif state.get('final_response'):
+            # A tool already answered; don't replace its answer with a "no match" note
+            pass
         else:
             # Have context but no matching products
             response = f"I understand you're looking for product recommendations"
@@ -0,0 +1,87 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+def context_signature(context: Dict[str, Any], max_suggestions: int, **filters) -> Tuple:
+    """
+    Canonical, hashable form of the parts of a context that affect recommendations.
+    Concern and mention lists are order-insensitive, so they are sorted and de-duplicated.
+    """
+    return (
+        context.get('skin_type') or '',
+        tuple(sorted(set(context.get('skin_concerns', [])))),
+        tuple(sorted(set(context.get('health_concerns', [])))),
+        tuple(sorted(set(context.get('mentioned_products', [])))),
+        max_suggestions,
+        tuple(sorted((k, v) for k, v in filters.items() if v is not None)),
+    )
+
+def canonical_context(signature: Tuple) -> Dict[str, Any]:
+    """Rebuild a context dict from a signature (used to render cached blocks)."""
+    skin_type, skin_concerns, health_concerns, mentioned_products = signature[:4]
+    return {
+        'skin_type': skin_type,
+        'skin_concerns': list(skin_concerns),
+        'health_concerns': list(health_concerns),
+        'mentioned_products': list(mentioned_products),
+    }
+
+class RecommendationCache:
+    """
+    LRU cache of ranked products and rendered suggestion blocks keyed by context signature.
+    Entries belong to one catalog version; a version change drops the whole cache.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Tuple, Tuple[list, str]]" = OrderedDict()
+        self._catalog_version: Optional[Tuple] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _check_version(self, catalog_version: Tuple):
+        if catalog_version != self._catalog_version:
+            self._entries.clear()
+            self._catalog_version = catalog_version
+
+    def recommend(self, tool, context: Dict[str, Any], max_suggestions: int = 3, **filters) -> Tuple[List, str]:
+        """Return (products, suggestion block) for a context, computing them on a miss."""
+        signature = context_signature(context, max_suggestions, **filters)
+        catalog_version = tool.catalog_version
+
+        with self._lock:
+            self._check_version(catalog_version)
+            entry = self._entries.get(signature)
+            if entry is not None:
+                self._entries.move_to_end(signature)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        canonical = canonical_context(signature)
+        products = tool.get_relevant_products(canonical, max_suggestions=max_suggestions, **filters)
+        block = tool.build_suggestion_block(products, canonical) if products else ""
+        entry = (products, block)
+
+        with self._lock:
+            if catalog_version == self._catalog_version:
+                self._entries[signature] = entry
+                if len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+            self._catalog_version = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / total, 4) if total else 0.0,
+            }
@@ -1,18 +1,209 @@
+import asyncio
 import os
+import re
+import threading
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
 from tavily import TavilyClient
 from dotenv import load_dotenv
 
+from src.agent.circuit_breaker import get_breaker
+from src.agent.config import get_section, resolve_path
+from src.agent.http_transport import get_transport
+from src.agent.metrics import METRICS
+from src.agent.rate_limit import RateLimitExceeded, get_quota
+from tools.knowledge_base import knowledge_base_answer
+from tools.search_cache import SearchCache, normalize_query
+
 load_dotenv()
 TAVILY_API_KEY = os.getenv('TAVILY_API_KEY')
 
-client = TavilyClient(api_key=TAVILY_API_KEY)
+TAVILY_BREAKER = get_breaker('tavily')
+TAVILY_QUOTA = get_quota('tavily')
+
+# Own session (Tavily sets its auth headers on it) over the shared connection pool
+client = TavilyClient(api_key=TAVILY_API_KEY, session=get_transport().session())
+
+SEARCH_SETTINGS = get_section('search')
+SEARCH_DEADLINE_SECONDS = SEARCH_SETTINGS.get('deadline_seconds', 8)
+MAX_SEARCH_QUERIES = SEARCH_SETTINGS.get('max_queries', 3)
+MAX_SOURCES = 3
+
+# Dedicated pool so abandoned fetches never block asyncio.run()'s default-executor shutdown
+SEARCH_EXECUTOR = ThreadPoolExecutor(max_workers=SEARCH_SETTINGS.get('max_workers', 16), thread_name_prefix='search')
+
+# Conversational filler stripped when reformulating a message into a search query
+FILLER_PATTERN = re.compile(
+    r"\b(can you|could you|please|tell me|i want to know|i'd like to know|search for|search|"
+    r"look up|what does the|what is the|what's the|what are the|about)\b"
+)
+WOMENS_HEALTH_TERMS = ['women', 'woman', 'female', 'menstrual', 'period', 'pcos', 'pregnan']
+
+NO_RESULTS_MESSAGE = "Sorry, I couldn't fetch real-time data right now."
+
+def _build_search_cache() -> SearchCache:
+    cache_settings = SEARCH_SETTINGS.get('cache', {}) or {}
+    db_path = None
+    if cache_settings.get('path'):
+        db_path = resolve_path(cache_settings['path'])
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    return SearchCache(
+        db_path=db_path,
+        memory_entries=cache_settings.get('memory_entries', 256),
+        ttl_seconds=cache_settings.get('ttl_seconds', 6 * 3600),
+        stale_seconds=cache_settings.get('stale_seconds', 24 * 3600),
+        purge_every=cache_settings.get('purge_every', 100),
+    )
+
+search_cache = _build_search_cache()
+METRICS.register_gauge('search.cache', search_cache.stats)
+
+def _tavily_search(query: str):
+    with METRICS.timer('search.tavily'):
+        # Tavily's own timeout keeps abandoned worker threads from outliving the deadline by much;
+        # while the breaker is open, cache misses fail at once instead of waiting on Tavily
+        return TAVILY_BREAKER.call(_tavily_request, query, is_failure=lambda e: not isinstance(e, RateLimitExceeded))
+
+def _tavily_request(query: str):
+    # Shaped to the Tavily plan's requests per minute instead of running into its 429s
+    TAVILY_QUOTA.acquire()
+    return client.search(query, include_answer=True, timeout=SEARCH_DEADLINE_SECONDS)
+
+def reformulate_queries(user_input: str, max_queries: int = MAX_SEARCH_QUERIES) -> List[str]:
+    """The original message plus keyword-style reformulations, deduplicated by cache key."""
+    queries = [user_input.strip()]
+    core = ' '.join(FILLER_PATTERN.sub(' ', user_input.lower()).replace('?', ' ').split())
+    core = re.sub(r'^(the|a|an) ', '', core)
+    if core:
+        queries.append(core)
+        if not any(term in core for term in WOMENS_HEALTH_TERMS):
+            queries.append(f"{core} women's health")
+
+    unique, seen = [], set()
+    for query in queries:
+        key = normalize_query(query)
+        if key and key not in seen:
+            seen.add(key)
+            unique.append(query)
+    return unique[:max_queries]
+
+def merge_search_results(results: List[Dict[str, Any]]) -> str:
+    """Lead with the first answer (results are in query order) and list distinct sources."""
+    answer = next((r.get('answer') for r in results if r.get('answer')), None)
+    if not answer:
+        return ''
+
+    sources, seen_urls = [], set()
+    for result in results:
+        for item in result.get('results') or []:
+            url = item.get('url')
+            if url and url not in seen_urls:
+                seen_urls.add(url)
+                sources.append(f"- {item.get('title') or url} ({url})")
+    if sources:
+        answer += "\n\n**Sources:**\n" + "\n".join(sources[:MAX_SOURCES])
+    return answer
+
+def _fallback_response(user_input: str, reason: str) -> str:
+    METRICS.increment(f'search.fallback.{reason}')
+    local_answer = knowledge_base_answer(user_input)
+    if local_answer:
+        METRICS.increment('search.fallback.knowledge_base')
+        return local_answer
+    return NO_RESULTS_MESSAGE
+
+def _submit_queries(user_input: str) -> List[Future]:
+    return [
+        SEARCH_EXECUTOR.submit(search_cache.get_or_fetch, query, _tavily_search)
+        for query in reformulate_queries(user_input)
+    ]
+
+# Speculative searches started before routing finishes, keyed by a token carried in the state
+_prefetches: Dict[str, Tuple[str, List[Future]]] = {}
+_prefetch_lock = threading.Lock()
+
+def start_search_prefetch(user_input: str) -> str:
+    """Start the fan-out in the background and return a token for the search node to claim."""
+    token = uuid.uuid4().hex
+    with _prefetch_lock:
+        _prefetches[token] = (user_input, _submit_queries(user_input))
+    METRICS.increment('search.prefetch.started')
+    return token
+
+def claim_search_prefetch(token: Optional[str], user_input: str) -> Optional[List[Future]]:
+    if not token:
+        return None
+    with _prefetch_lock:
+        entry = _prefetches.pop(token, None)
+    if entry is None or entry[0] != user_input:
+        return None
+    METRICS.increment('search.prefetch.used')
+    return entry[1]
+
+def release_search_prefetch(token: Optional[str]):
+    """
+    Drop an unclaimed prefetch once the turn is over. Queries still queued are cancelled;
+    ones already running finish in the background and only populate the search cache.
+    """
+    if not token:
+        return
+    with _prefetch_lock:
+        entry = _prefetches.pop(token, None)
+    if entry is not None:
+        METRICS.increment('search.prefetch.discarded')
+        for future in entry[1]:
+            future.cancel()
+
+async def search_answer(user_input: str, deadline: float = None, futures: List[Future] = None) -> str:
+    """
+    Fan the reformulated queries out concurrently and merge whatever finishes before the
+    deadline. Cancelling the caller (e.g. on client disconnect) stops waiting immediately.
+    `futures` are in-flight queries from a speculative prefetch.
+    """
+    deadline = SEARCH_DEADLINE_SECONDS if deadline is None else deadline
+    tasks = [asyncio.wrap_future(future) for future in (futures or _submit_queries(user_input))]
+    try:
+        with METRICS.timer('search.total'):
+            done, pending = await asyncio.wait(tasks, timeout=deadline)
+    finally:
+        # Threads can't be interrupted, but late results still land in the search cache
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+    if pending:
+        METRICS.increment('search.deadline_exceeded')
+        print(f"⏱️ Search deadline: {len(done)}/{len(tasks)} queries finished in {deadline}s")
+
+    results = []
+    for task in tasks:
+        if task in done and not task.cancelled():
+            if task.exception() is not None:
+                print(f"Search query failed: {task.exception()}")
+                METRICS.increment('search.query_failed')
+            else:
+                results.append(task.result())
+
+    merged = merge_search_results(results)
+    if merged:
+        return merged
+    reason = 'circuit_open' if TAVILY_BREAKER.is_open() else 'timeout' if pending else 'no_results'
+    return _fallback_response(user_input, reason)
+
+async def async_search_tool(state):
+    futures = claim_search_prefetch(state.get('search_prefetch'), state['user_input'])
+    state['final_response'] = await search_answer(state['user_input'], futures=futures)
+    return state
 
 def search_tool(state):
-    user_input = state['user_input']
-    # Use Tavily to search the web
+    """Synchronous entry point for callers without an event loop (e.g. app.invoke)."""
+    coro = async_search_tool(state)
     try:
-        result = client.search(user_input)
-        state['final_response'] = result['answer']
-    except Exception as e:
-        state['final_response'] = f"Sorry, I couldn't fetch real-time data right now. ({e})"
-    return state 
\ No newline at end of file
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    # Called from inside a running loop: run on a private loop in a helper thread
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
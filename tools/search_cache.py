@@ -0,0 +1,161 @@
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Callable, Optional, Tuple
+
+from src.agent.metrics import METRICS
+
+def normalize_query(query: str) -> str:
+    """Cache key for a search query: lowercase, punctuation stripped, whitespace collapsed."""
+    return ' '.join(re.sub(r'[^\w\s]', ' ', query.lower()).split())
+
+class SearchCache:
+    """
+    Two-tier search result cache: an in-memory LRU in front of a SQLite table that
+    survives restarts. Entries are fresh for their TTL; after that they are served
+    stale for `stale_seconds` while a background refresh fetches a new result.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, memory_entries: int = 256,
+                 ttl_seconds: float = 6 * 3600, stale_seconds: float = 24 * 3600,
+                 name: str = 'search.cache', purge_every: int = 100):
+        self.memory_entries = memory_entries
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.name = name
+        self.purge_every = purge_every
+        self._puts = 0
+        self._memory: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._refreshing = set()
+
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+            self._db.execute('PRAGMA journal_mode = WAL')
+            self._db.execute('''
+                CREATE TABLE IF NOT EXISTS search_cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            ''')
+            self._db.execute('CREATE INDEX IF NOT EXISTS idx_search_cache_expires ON search_cache (expires_at)')
+            self.purge_expired()
+
+    # ------------------------------------------------------------------
+    # Tiers
+    # ------------------------------------------------------------------
+    def _read(self, key: str) -> Optional[Tuple[Any, float]]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                METRICS.increment(f'{self.name}.memory_hit')
+                return entry
+            if self._db is None:
+                return None
+            row = self._db.execute('SELECT value, expires_at FROM search_cache WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            entry = (json.loads(row[0]), row[1])
+            self._remember(key, entry)
+            METRICS.increment(f'{self.name}.disk_hit')
+            return entry
+
+    def _remember(self, key: str, entry: Tuple[Any, float]):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def put(self, query: str, value: Any, ttl_seconds: float = None):
+        key = normalize_query(query)
+        expires_at = time.time() + (self.ttl_seconds if ttl_seconds is None else ttl_seconds)
+        with self._lock:
+            self._remember(key, (value, expires_at))
+            if self._db is not None:
+                self._db.execute(
+                    'INSERT OR REPLACE INTO search_cache (key, value, expires_at) VALUES (?, ?, ?)',
+                    (key, json.dumps(value), expires_at)
+                )
+                self._puts += 1
+                if self._puts % self.purge_every == 0:
+                    self._purge_locked()
+
+    def purge_expired(self) -> int:
+        """Delete disk entries that are past their stale window; returns the number removed."""
+        with self._lock:
+            return self._purge_locked()
+
+    def _purge_locked(self) -> int:
+        if self._db is None:
+            return 0
+        removed = self._db.execute(
+            'DELETE FROM search_cache WHERE expires_at < ?', (time.time() - self.stale_seconds,)
+        ).rowcount
+        if removed:
+            METRICS.increment(f'{self.name}.purged', removed)
+        return removed
+
+    def get(self, query: str) -> Tuple[Optional[Any], str]:
+        """Return (value, state) where state is 'fresh', 'stale' or 'miss'."""
+        entry = self._read(normalize_query(query))
+        if entry is None:
+            return None, 'miss'
+        value, expires_at = entry
+        now = time.time()
+        if now < expires_at:
+            return value, 'fresh'
+        if now < expires_at + self.stale_seconds:
+            return value, 'stale'
+        return None, 'miss'
+
+    # ------------------------------------------------------------------
+    # Read-through
+    # ------------------------------------------------------------------
+    def get_or_fetch(self, query: str, fetch: Callable[[str], Any]) -> Any:
+        """Serve from cache, refreshing stale entries in the background; fetch on a miss."""
+        value, state = self.get(query)
+        METRICS.increment(f'{self.name}.{state}')
+        if state == 'fresh':
+            return value
+        if state == 'stale':
+            self._refresh_in_background(query, fetch)
+            return value
+
+        value = fetch(query)
+        self.put(query, value)
+        return value
+
+    def _refresh_in_background(self, query: str, fetch: Callable[[str], Any]):
+        key = normalize_query(query)
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                self.put(query, fetch(query))
+                METRICS.increment(f'{self.name}.refreshed')
+            except Exception as e:
+                print(f"Search cache refresh failed: {e}")
+                METRICS.increment(f'{self.name}.refresh_failed')
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    def stats(self) -> Dict[str, Any]:
+        counters = {state: METRICS.counter(f'{self.name}.{state}') for state in ('fresh', 'stale', 'miss')}
+        lookups = sum(counters.values())
+        served = counters['fresh'] + counters['stale']
+        with self._lock:
+            entries = len(self._memory)
+        return dict(counters, memory_entries=entries,
+                    hit_rate=round(served / lookups, 4) if lookups else 0.0)
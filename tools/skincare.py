@@ -1,15 +1,16 @@
 from typing import Dict, Any
 
+from tools.user_profile import UserProfile, profile_from_state
+
 def skincare_tool(state: Dict[str, Any]) -> Dict[str, Any]:
     """
     Advanced skincare tool that provides personalized recommendations
     based on skin type, concerns, and user context.
     """
     user_input = state['user_input'].lower()
-    chat_history = state.get('chat_history', [])
     
-    # Extract context from chat history
-    user_context = _extract_user_context(chat_history)
+    # Conversation profile shared with the product suggestion tool
+    user_context = _extract_user_context(profile_from_state(state))
     
     # Define comprehensive skin routines with personalization
     skin_routines = {
@@ -68,25 +69,15 @@ def skincare_tool(state: Dict[str, Any]) -> Dict[str, Any]:
     
     return state
 
-def _extract_user_context(chat_history):
-    """Extract user context from chat history."""
-    context = {
-        'mentioned_products': [],
-        'mentioned_concerns': [],
+def _extract_user_context(profile: UserProfile):
+    """Skincare view of the incrementally maintained conversation profile."""
+    return {
+        'skin_type': profile.skin_type,
+        'mentioned_products': list(profile.mentioned_products),
+        'mentioned_concerns': list(profile.skin_concerns),
         'age_mentioned': False,
         'lifestyle_factors': []
     }
-    
-    for exchange in chat_history:
-        if 'user' in exchange:
-            user_msg = exchange['user'].lower()
-            # Extract mentioned products, concerns, etc.
-            if any(word in user_msg for word in ['cleanser', 'moisturizer', 'serum', 'sunscreen']):
-                context['mentioned_products'].append(user_msg)
-            if any(word in user_msg for word in ['acne', 'wrinkles', 'dark spots', 'redness']):
-                context['mentioned_concerns'].append(user_msg)
-    
-    return context
 
 def _identify_skin_type(user_input):
     """Identify skin type from user input."""
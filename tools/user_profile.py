@@ -0,0 +1,195 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional
+
+# Vocabularies shared by the product suggestion and skincare tools
+SKIN_TYPES = ['oily', 'dry', 'combination', 'sensitive', 'normal', 'acne-prone']
+SKIN_CONCERNS = ['acne', 'wrinkles', 'fine lines', 'dark spots', 'blackheads', 'enlarged pores', 'redness', 'dryness', 'oiliness', 'sensitivity']
+HEALTH_CONCERNS = ['pcos', 'irregular periods', 'heavy periods', 'cramps', 'pms', 'iron deficiency', 'fatigue', 'hormonal imbalance']
+PRODUCT_KEYWORDS = ['cleanser', 'moisturizer', 'serum', 'sunscreen', 'supplement', 'vitamin', 'toner', 'exfoliant']
+BUDGET_KEYWORDS = ['affordable', 'cheap', 'expensive', 'budget', 'drugstore', 'high-end']
+
+# Phrases in Aara's replies that introduce a skin type determination
+SKIN_TYPE_PATTERNS = [
+    'your skin type is',
+    'skin type is',
+    'sounds like your skin type is',
+    'it sounds like your skin type is',
+    'determined skin type',
+    'skin type: combination',
+    'skin type: oily',
+    'skin type: dry',
+    'skin type: sensitive',
+    'skin type: normal'
+]
+CONCERN_PATTERNS = {
+    'breakouts in the t-zone': 'combination_tzone',
+    'shiny primarily in the t-zone': 'combination_tzone',
+    'comfortable and balanced': 'balanced_skin',
+    'normal-sized pores': 'balanced_skin',
+}
+ROUTINE_KEYWORDS = ['morning routine', 'evening routine', 'gentle cleanser', 'lightweight moisturizer', 'oil-free', 'broad-spectrum spf']
+
+def _append_unique(items: List[str], value: str):
+    if value not in items:
+        items.append(value)
+
+def _exchange_fingerprint(exchange: Dict[str, str]) -> str:
+    text = f"{exchange.get('user', '')}\x00{exchange.get('Aara', '')}"
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+@dataclass
+class UserProfile:
+    """Per-conversation user state, updated one exchange at a time."""
+    skin_type: str = ''
+    skin_concerns: List[str] = field(default_factory=list)
+    health_concerns: List[str] = field(default_factory=list)
+    mentioned_products: List[str] = field(default_factory=list)
+    budget_indicators: List[str] = field(default_factory=list)
+    exchanges_seen: int = 0
+    last_fingerprint: str = ''
+    last_suggestion_turn: Optional[int] = None
+
+    @classmethod
+    def from_history(cls, chat_history: List[Dict[str, str]]) -> 'UserProfile':
+        profile = cls()
+        for exchange in chat_history:
+            profile.update(exchange)
+        return profile
+
+    def update(self, exchange: Dict[str, str]):
+        """Fold one completed exchange (user message + Aara reply) into the profile."""
+        user_msg = (exchange.get('user') or '').lower()
+        if user_msg:
+            for skin_type in SKIN_TYPES:
+                if skin_type in user_msg:
+                    # The user's own statement wins over earlier inferences
+                    self.skin_type = skin_type
+                    break
+            self._add_concerns(user_msg)
+            for keyword in PRODUCT_KEYWORDS:
+                if keyword in user_msg:
+                    _append_unique(self.mentioned_products, keyword)
+            for keyword in BUDGET_KEYWORDS:
+                if keyword in user_msg:
+                    _append_unique(self.budget_indicators, keyword)
+
+        aara_msg = (exchange.get('Aara') or '').lower()
+        if aara_msg:
+            if not self.skin_type:
+                self.skin_type = _skin_type_from_reply(aara_msg)
+            for pattern, concern in CONCERN_PATTERNS.items():
+                if pattern in aara_msg:
+                    _append_unique(self.skin_concerns, concern)
+            for keyword in ROUTINE_KEYWORDS:
+                if keyword in aara_msg:
+                    _append_unique(self.mentioned_products, keyword.replace(' ', '_'))
+
+        self.exchanges_seen += 1
+        self.last_fingerprint = _exchange_fingerprint(exchange)
+
+    def _add_concerns(self, text: str):
+        for concern in SKIN_CONCERNS:
+            if concern in text:
+                _append_unique(self.skin_concerns, concern.replace(' ', '_'))
+        for concern in HEALTH_CONCERNS:
+            if concern in text:
+                _append_unique(self.health_concerns, concern.replace(' ', '_'))
+
+    def context_for(self, user_input: str) -> Dict[str, Any]:
+        """Product-suggestion context for the current turn: the current message first, then the profile."""
+        user_input_lower = user_input.lower()
+        current = UserProfile()
+        current._add_concerns(user_input_lower)
+
+        skin_type = next((t for t in SKIN_TYPES if t in user_input_lower), '') or self.skin_type
+        return {
+            'skin_type': skin_type,
+            'skin_concerns': current.skin_concerns + [c for c in self.skin_concerns if c not in current.skin_concerns],
+            'health_concerns': current.health_concerns + [c for c in self.health_concerns if c not in current.health_concerns],
+            'mentioned_products': list(self.mentioned_products),
+            'budget_indicators': list(self.budget_indicators),
+            'age_mentioned': False,
+            'lifestyle_factors': []
+        }
+
+    def has_context(self) -> bool:
+        return bool(self.skin_type or self.skin_concerns or self.health_concerns or self.mentioned_products)
+
+def _skin_type_from_reply(aara_msg: str) -> str:
+    """Skin type stated in one of Aara's replies, preferring explicit determinations."""
+    for pattern in SKIN_TYPE_PATTERNS:
+        if pattern in aara_msg:
+            start = aara_msg.find(pattern) + len(pattern)
+            window = aara_msg[start:start + 100]
+            for skin_type in SKIN_TYPES:
+                if skin_type in window:
+                    return skin_type
+    # No explicit determination - fall back to any skin type mentioned in the reply
+    for skin_type in SKIN_TYPES:
+        if skin_type in aara_msg:
+            return skin_type
+    return ''
+
+class ProfileStore:
+    """Bounded LRU of conversation profiles that only processes exchanges it hasn't seen."""
+
+    def __init__(self, max_conversations: int = 10000):
+        self.max_conversations = max_conversations
+        self._profiles: "OrderedDict[str, UserProfile]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def sync(self, conversation_id: Optional[str], chat_history: List[Dict[str, str]]) -> UserProfile:
+        """Return the conversation's profile, updated with any new exchanges in chat_history."""
+        if not conversation_id:
+            return UserProfile.from_history(chat_history)
+
+        with self._lock:
+            profile = self._profiles.get(conversation_id)
+            if profile is None:
+                profile = UserProfile()
+                self._profiles[conversation_id] = profile
+                if len(self._profiles) > self.max_conversations:
+                    self._profiles.popitem(last=False)
+            else:
+                self._profiles.move_to_end(conversation_id)
+
+            new_exchanges = self._unseen(profile, chat_history)
+            if new_exchanges is None:
+                # History no longer lines up with what we've seen: rebuild once
+                profile = UserProfile.from_history(chat_history)
+                self._profiles[conversation_id] = profile
+            else:
+                for exchange in new_exchanges:
+                    profile.update(exchange)
+            return profile
+
+    @staticmethod
+    def _unseen(profile: UserProfile, chat_history: List[Dict[str, str]]) -> Optional[List[Dict[str, str]]]:
+        if profile.exchanges_seen == 0:
+            return chat_history
+        # Fast path: history grew by appending
+        seen = profile.exchanges_seen
+        if seen <= len(chat_history) and _exchange_fingerprint(chat_history[seen - 1]) == profile.last_fingerprint:
+            return chat_history[seen:]
+        # Clients may send a sliding window; find the last exchange we processed
+        for i in range(len(chat_history) - 1, -1, -1):
+            if _exchange_fingerprint(chat_history[i]) == profile.last_fingerprint:
+                return chat_history[i + 1:]
+        return None
+
+    def drop(self, conversation_id: str):
+        with self._lock:
+            self._profiles.pop(conversation_id, None)
+
+PROFILE_STORE = ProfileStore()
+
+def profile_from_state(state: Dict[str, Any]) -> UserProfile:
+    """The user profile for this turn, synced once and shared by every tool."""
+    profile = state.get('user_profile')
+    if profile is None:
+        profile = PROFILE_STORE.sync(state.get('conversation_id'), state.get('chat_history', []))
+        state['user_profile'] = profile
+    return profile